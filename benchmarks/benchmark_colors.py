@@ -0,0 +1,45 @@
+# Copyright (C) 2024 twyleg
+"""
+Benchmark for transforming the colors of an image: creating the color index, transforming the distinct colors
+(with and without NumPy) and applying the results to all color uses.
+
+Usage: python benchmarks/benchmark_colors.py [LAYERS] [OBJECTS_PER_LAYER] [DISTINCT_COLORS]
+"""
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from inkscape_layer_utils.image import Image  # noqa: E402
+from inkscape_layer_utils.palette import ColorTransform, numpy, transform_colors  # noqa: E402
+from synthetic_image import generate_synthetic_svg  # noqa: E402
+
+
+def main() -> None:
+    layer_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    objects_per_layer = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    distinct_color_count = int(sys.argv[3]) if len(sys.argv) > 3 else 100000
+
+    image = Image(ET.ElementTree(ET.fromstring(generate_synthetic_svg(layer_count, objects_per_layer))))
+    print(f"Transform colors of {layer_count} layers with {objects_per_layer} objects each:")
+
+    start = time.perf_counter()
+    color_index = image.create_color_index()
+    print(f"  {'create index':<24} {time.perf_counter() - start:6.2f} s")
+
+    start = time.perf_counter()
+    changed_count = color_index.transform(ColorTransform(hue_shift=30.0, lightness=-0.1))
+    print(f"  {'transform and apply':<24} {time.perf_counter() - start:6.2f} s ({changed_count} color uses)")
+
+    colors = [f"#{(i * 2654435761) & 0xFFFFFF:06x}" for i in range(distinct_color_count)]
+    for use_numpy in (False, True) if numpy is not None else (False,):
+        start = time.perf_counter()
+        transform_colors(colors, ColorTransform(hue_shift=30.0, lightness=-0.1), use_numpy=use_numpy)
+        name = f"{distinct_color_count} colors ({'numpy' if use_numpy else 'python'})"
+        print(f"  {name:<24} {time.perf_counter() - start:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
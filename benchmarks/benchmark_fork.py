@@ -0,0 +1,57 @@
+# Copyright (C) 2024 twyleg
+"""
+Memory benchmark for deriving many recolored variants of one image with Image.fork() versus copy.deepcopy().
+
+Usage: python benchmarks/benchmark_fork.py [VARIANTS] [LAYERS] [OBJECTS_PER_LAYER]
+"""
+import copy
+import gc
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from inkscape_layer_utils.image import Image  # noqa: E402
+from synthetic_image import generate_synthetic_svg  # noqa: E402
+
+
+def derive_variants(image: Image, variant_count: int, derive: Callable[[Image], Image]) -> List[Image]:
+    layer_paths = image.get_all_layer_paths()[1:]
+    variants = []
+    for i in range(variant_count):
+        variant = derive(image)
+        variant.get_layer_by_path(layer_paths[i % len(layer_paths)]).fill_all_objects(f"#{i:06x}")
+        variants.append(variant)
+    return variants
+
+
+def measure(image: Image, variant_count: int, derive: Callable[[Image], Image]) -> None:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    variants = derive_variants(image, variant_count, derive)
+    duration = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {current / 2**20:8.2f} MiB, {duration:6.2f} s for {len(variants)} variants")
+
+
+def main() -> None:
+    variant_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    layer_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    objects_per_layer = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    image = Image(ET.ElementTree(ET.fromstring(generate_synthetic_svg(layer_count, objects_per_layer))))
+
+    print("Image.fork():")
+    measure(image, variant_count, lambda img: img.fork())
+    print("copy.deepcopy():")
+    measure(image, variant_count, copy.deepcopy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Copyright (C) 2024 twyleg
+"""
+Memory benchmark for the wrapper object tree (Object, Group, Layer) that is built on top of the ElementTree.
+
+When a git revision is given, the wrapper tree of that revision's image.py is measured as baseline, e.g. the
+revision before an optimization. The baseline module is loaded from git, the working tree is not touched.
+
+Usage: python benchmarks/benchmark_memory.py [LAYERS] [OBJECTS_PER_LAYER] [BASELINE_REVISION]
+"""
+import gc
+import importlib.util
+import subprocess
+import sys
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Callable
+
+REPOSITORY_PATH = Path(__file__).parents[1]
+
+sys.path.insert(0, str(REPOSITORY_PATH))
+
+from inkscape_layer_utils.image import Image  # noqa: E402
+from synthetic_image import generate_synthetic_svg  # noqa: E402
+
+
+def load_baseline_image_class(revision: str) -> Any:
+    module_path = f"{revision}:inkscape_layer_utils/image.py"
+    source = subprocess.run(["git", "show", module_path], cwd=REPOSITORY_PATH, check=True, capture_output=True).stdout
+    spec = importlib.util.spec_from_loader("baseline_image", loader=None)
+    assert spec is not None
+    module = importlib.util.module_from_spec(spec)
+    exec(compile(source, module_path, "exec"), module.__dict__)
+    return module.Image
+
+
+def measure(build: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> None:
+    layer_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    objects_per_layer = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    baseline_revision = sys.argv[3] if len(sys.argv) > 3 else None
+
+    svg = generate_synthetic_svg(layer_count, objects_per_layer)
+    element_tree = ET.ElementTree(ET.fromstring(svg))
+    element_count = sum(1 for _ in element_tree.iter())
+
+    wrapper_bytes = measure(lambda: Image(element_tree))
+
+    print(f"Elements:              {element_count}")
+    print(f"Wrapper tree:          {wrapper_bytes / 2**20:8.2f} MiB ({wrapper_bytes / element_count:6.1f} B/element)")
+    if baseline_revision is not None:
+        baseline_image_class = load_baseline_image_class(baseline_revision)
+        baseline_bytes = measure(lambda: baseline_image_class(element_tree))
+        print(f"Baseline ({baseline_revision}):".ljust(23) + f"{baseline_bytes / 2**20:8.2f} MiB ({baseline_bytes / element_count:6.1f} B/element)")
+        print(f"Savings:               {100.0 * (1.0 - wrapper_bytes / baseline_bytes):8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Copyright (C) 2024 twyleg
+"""
+Startup benchmark for the inkscape_layer_utils console script.
+
+Measures the import time of the CLI entry module and the wall time of complete CLI invocations on a small file,
+relative to a bare interpreter start. Exits with 1 if the CLI overhead exceeds the startup budget.
+
+Usage: python benchmarks/benchmark_startup.py [RUNS]
+"""
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+REPO_DIR = Path(__file__).parents[1]
+TEST_IMAGE_PATH = REPO_DIR / "resources/test_images/test_image_layer_extraction_0.svg"
+
+# Budget for the CLI overhead on top of a bare interpreter start (python -c pass) in milliseconds. Most of it is
+# spent importing xml.etree, logging and pathlib. Measured with bytecode caching enabled (~65 ms on a CI runner).
+STARTUP_BUDGET_MS = 75.0
+
+
+def measure_invocation_ms(command: List[str], runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_DIR, check=True, stdout=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    return 1000.0 * sorted(durations)[len(durations) // 2]
+
+
+def measure_import_time_ms(module: str) -> float:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=REPO_DIR, check=True, capture_output=True, text=True)
+    cumulative_us = [int(match.group(1)) for match in re.finditer(rf"\|\s*(\d+) \| {re.escape(module)}$", result.stderr, re.MULTILINE)]
+    return cumulative_us[-1] / 1000.0
+
+
+def main() -> int:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    interpreter_ms = measure_invocation_ms([sys.executable, "-c", "pass"], runs)
+    list_layers_ms = measure_invocation_ms([sys.executable, "-m", "inkscape_layer_utils", "-q", "list_layers", "--print", str(TEST_IMAGE_PATH)], runs)
+    version_ms = measure_invocation_ms([sys.executable, "-m", "inkscape_layer_utils", "--version"], runs)
+    overhead_ms = list_layers_ms - interpreter_ms
+
+    print(f"import inkscape_layer_utils.main:       {measure_import_time_ms('inkscape_layer_utils.main'):7.1f} ms")
+    print(f"import inkscape_layer_utils.image:      {measure_import_time_ms('inkscape_layer_utils.image'):7.1f} ms")
+    print(f"python -c pass (median):                {interpreter_ms:7.1f} ms")
+    print(f"inkscape_layer_utils --version (median): {version_ms:6.1f} ms")
+    print(f"-q list_layers --print (median):        {list_layers_ms:7.1f} ms")
+    print(f"CLI overhead:                           {overhead_ms:7.1f} ms (budget {STARTUP_BUDGET_MS:.1f} ms)")
+
+    return 0 if overhead_ms <= STARTUP_BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# Copyright (C) 2024 twyleg
+"""
+Benchmark for extracting all layers of one image with threads sharing a frozen image versus worker processes
+that parse the image once each. Threads only scale on free-threaded Python builds (e.g. python3.13t).
+
+Usage: python benchmarks/benchmark_threads.py [WORKERS] [LAYERS] [OBJECTS_PER_LAYER]
+"""
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from inkscape_layer_utils.image import Image  # noqa: E402
+from synthetic_image import generate_synthetic_svg  # noqa: E402
+
+_worker_image: Optional[Image] = None
+
+
+def _init_worker(svg: str) -> None:
+    global _worker_image
+    _worker_image = Image(ET.ElementTree(ET.fromstring(svg)))
+
+
+def _extract_layers_in_worker(output_dir: Path, layer_paths: List[str]) -> None:
+    assert _worker_image is not None
+    _worker_image.extract_layers_to_file(output_dir, "image", layer_paths)
+
+
+def extract_with_processes(svg: str, output_dir: Path, workers: int) -> None:
+    layer_paths = Image(ET.ElementTree(ET.fromstring(svg))).get_all_layer_paths()
+    chunks = [layer_paths[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(svg,)) as executor:
+        list(executor.map(_extract_layers_in_worker, [output_dir] * workers, chunks))
+
+
+def extract_with_threads(svg: str, output_dir: Path, workers: int) -> None:
+    image = Image(ET.ElementTree(ET.fromstring(svg))).freeze()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda layer_path: image.extract_layers_to_file(output_dir, "image", [layer_path]), image.get_all_layer_paths()))
+
+
+def measure(name: str, extract: Callable[[str, Path, int], None], svg: str, workers: int) -> None:
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        extract(svg, Path(output_dir), workers)
+        duration = time.perf_counter() - start
+    print(f"  {name:<20} {duration:6.2f} s")
+
+
+def main() -> None:
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    layer_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    objects_per_layer = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    svg = generate_synthetic_svg(layer_count, objects_per_layer)
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Extract {layer_count} layers with {workers} workers (GIL {'enabled' if gil_enabled else 'disabled'}):")
+    measure("sequential", lambda svg, output_dir, _: extract_with_threads(svg, output_dir, 1), svg, workers)
+    measure("threads (frozen)", extract_with_threads, svg, workers)
+    measure("processes", extract_with_processes, svg, workers)
+
+
+if __name__ == "__main__":
+    main()
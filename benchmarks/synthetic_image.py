@@ -0,0 +1,42 @@
+# Copyright (C) 2024 twyleg
+import xml.etree.ElementTree as ET
+
+import inkscape_layer_utils  # noqa: F401 - registers the SVG namespaces
+
+SVG_NS = "http://www.w3.org/2000/svg"
+INKSCAPE_NS = "http://www.inkscape.org/namespaces/inkscape"
+
+
+def generate_synthetic_svg(layer_count: int, objects_per_layer: int, sublayers_per_layer: int = 2) -> str:
+    """
+    Generate an Inkscape-like SVG with a nested layer structure and many leaf paths for benchmarking.
+    Every layer holds one group with half of its objects, the rest are direct children of the layer.
+    """
+    root = ET.Element(f"{{{SVG_NS}}}svg", {"id": "svg1", "width": "100", "height": "100"})
+    pending = [root]
+    created_layers = 0
+    next_id = 0
+
+    while pending and created_layers < layer_count:
+        parent = pending.pop(0)
+        for _ in range(sublayers_per_layer if parent is not root else max(1, sublayers_per_layer)):
+            if created_layers >= layer_count:
+                break
+            layer = ET.SubElement(
+                parent,
+                f"{{{SVG_NS}}}g",
+                {"id": f"layer{created_layers}", f"{{{INKSCAPE_NS}}}groupmode": "layer", f"{{{INKSCAPE_NS}}}label": f"layer{created_layers}"},
+            )
+            group = ET.SubElement(layer, f"{{{SVG_NS}}}g", {"id": f"g{created_layers}"})
+            for i in range(objects_per_layer):
+                container = group if i % 2 else layer
+                ET.SubElement(
+                    container,
+                    f"{{{SVG_NS}}}path",
+                    {"id": f"path{next_id}", "d": "m 0,0 h 10 v 10 z", "style": "fill:#ff0000;stroke:#000000;stroke-width:1"},
+                )
+                next_id += 1
+            created_layers += 1
+            pending.append(layer)
+
+    return ET.tostring(root, encoding="unicode")
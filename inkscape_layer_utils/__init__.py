@@ -1,15 +1,29 @@
 # Copyright (C) 2023 twyleg
 import xml.etree.ElementTree as ET
+from typing import Any
 
-from . import _version
+# Prefixes of the namespaces of Inkscape SVGs by namespace URI
+NAMESPACE_PREFIXES = {
+    "http://www.w3.org/2000/svg": "",
+    "http://purl.org/dc/elements/1.1/": "dc",
+    "http://creativecommons.org/ns#": "cc",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#": "rdf",
+    "http://www.w3.org/1999/xlink": "xlink",
+    "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd": "sodipodi",
+    "http://www.inkscape.org/namespaces/inkscape": "inkscape",
+}
 
-ET.register_namespace("", "http://www.w3.org/2000/svg")
-ET.register_namespace("dc", "http://purl.org/dc/elements/1.1/")
-ET.register_namespace("cc", "http://creativecommons.org/ns#")
-ET.register_namespace("rdf", "http://www.w3.org/1999/02/22-rdf-syntax-ns#")
-ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
-ET.register_namespace("sodipodi", "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd")
-ET.register_namespace("inkscape", "http://www.inkscape.org/namespaces/inkscape")
+for uri, prefix in NAMESPACE_PREFIXES.items():
+    ET.register_namespace(prefix, uri)
 
 
-__version__ = _version.get_versions()["version"]
+def __getattr__(name: str) -> Any:
+    # The version is resolved lazily, since versioneer calls git when running from a source checkout.
+    # Installed packages contain a static version file written at build time.
+    if name == "__version__":
+        from . import _version
+
+        version = _version.get_versions()["version"]
+        globals()["__version__"] = version
+        return version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
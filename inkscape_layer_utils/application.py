@@ -0,0 +1,31 @@
+# Copyright (C) 2024 twyleg
+import argparse
+from pathlib import Path
+
+from simple_python_app.subcommand_application import SubcommandApplication
+
+from inkscape_layer_utils import __version__
+from inkscape_layer_utils.commands import SUBCOMMANDS
+
+FILE_DIR = Path(__file__).parent
+
+
+class InkscapeLayerUtils(SubcommandApplication):
+    def __init__(self):
+        super().__init__(
+            application_name="inkscape_layer_utils",
+            version=__version__,
+            application_config_init_enabled=False,
+            logging_init_custom_logging_enabled=False,
+            logging_logfile_output_dir=FILE_DIR / "logs/",
+        )
+
+    def add_arguments(self, argparser: argparse.ArgumentParser) -> None:
+        for command_name, subcommand in SUBCOMMANDS.items():
+            command = self.add_subcommand(
+                command=command_name,
+                help=subcommand.help,
+                description=subcommand.description,
+                handler=subcommand.handler,
+            )
+            subcommand.add_arguments(command.parser)
@@ -0,0 +1,186 @@
+# Copyright (C) 2024 twyleg
+import gzip
+import io
+import logging
+import tarfile
+import zipfile
+from pathlib import Path
+from types import ModuleType
+from typing import IO, TYPE_CHECKING, Any, BinaryIO, List, Optional
+
+from inkscape_layer_utils.image import unlink_stored_output
+
+if TYPE_CHECKING:
+    from inkscape_layer_utils.image import Image
+
+ARCHIVE_FORMATS = ["tar", "tar.gz", "tar.zst", "zip"]
+
+_ARCHIVE_FORMATS_BY_SUFFIX = {
+    ".tar": "tar",
+    ".tar.gz": "tar.gz",
+    ".tgz": "tar.gz",
+    ".tar.zst": "tar.zst",
+    ".tzst": "tar.zst",
+    ".zip": "zip",
+}
+
+# Fixed timestamp of zip members (the earliest date a zip file can store), tar members get 0
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def get_archive_format(file_path: Path) -> str:
+    """
+    Determine the archive format from a file name, e.g. "tar.gz" for "layers.tgz".
+
+    Raises
+    ------
+    ArchiveError
+        If the format can't be determined from the file name.
+    """
+    name = Path(file_path).name.lower()
+    for suffix, archive_format in _ARCHIVE_FORMATS_BY_SUFFIX.items():
+        if name.endswith(suffix):
+            return archive_format
+    raise ArchiveError(f'Unable to determine archive format of "{file_path}", supported formats: {", ".join(ARCHIVE_FORMATS)}')
+
+
+def _import_zstandard() -> ModuleType:
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        raise ArchiveError('Archive format "tar.zst" requires the "zstandard" package')
+    return zstandard
+
+
+class LayerArchive:
+    """
+    Archive sink for extracted layers. Every image is serialized directly into the archive as one member, no
+    temporary files are written. Tar archives are written as stream (also to non-seekable files like stdout),
+    which requires each member to be serialized into memory first to determine its size. Zip members are
+    streamed without such a buffer. Archives are reproducible: members have a fixed timestamp and the gzip
+    header of tar.gz archives has neither file name nor timestamp.
+
+    Use as context manager or call close() to finish the archive.
+
+    Attributes
+    ----------
+    archive_format: str
+        One of ARCHIVE_FORMATS.
+    member_names: List[str]
+        Names of the members written so far.
+
+    """
+
+    logm = logging.getLogger(f"{__name__}.arc")
+
+    def __init__(self, file: Path | BinaryIO, archive_format: Optional[str] = None) -> None:
+        """
+        Parameters
+        ----------
+        file: Path | BinaryIO
+            Path of the archive file or binary file object to write the archive to. Like with Image.save(), an
+            existing file that links a stored object of a ContentStore is replaced.
+        archive_format: Optional[str]
+            One of ARCHIVE_FORMATS. Determined from the file name if not provided.
+        """
+        if archive_format is None:
+            if not isinstance(file, (str, Path)):
+                raise ArchiveError("Archive format required when writing to a file object")
+            archive_format = get_archive_format(Path(file))
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ArchiveError(f'Unknown archive format "{archive_format}", supported formats: {", ".join(ARCHIVE_FORMATS)}')
+
+        # Fail before creating the archive file
+        zstandard = _import_zstandard() if archive_format == "tar.zst" else None
+
+        self.archive_format = archive_format
+        self.member_names: List[str] = []
+        self._owned_file: Optional[IO[bytes]] = None
+        self._compressor: Optional[BinaryIO] = None
+
+        if isinstance(file, (str, Path)):
+            self.logm.debug('Create %s archive "%s"', archive_format, file)
+            Path(file).parent.mkdir(parents=True, exist_ok=True)
+            unlink_stored_output(Path(file))
+            self._owned_file = open(file, "wb")
+            file_object: BinaryIO = self._owned_file  # type: ignore[assignment]
+        else:
+            file_object = file
+
+        self._zip_file: Optional[zipfile.ZipFile] = None
+        self._tar_file: Optional[tarfile.TarFile] = None
+        try:
+            if archive_format == "zip":
+                self._zip_file = zipfile.ZipFile(file_object, "w", compression=zipfile.ZIP_DEFLATED)
+            elif archive_format == "tar.zst":
+                assert zstandard is not None
+                self._compressor = zstandard.ZstdCompressor().stream_writer(file_object, closefd=False)
+                self._tar_file = tarfile.open(fileobj=self._compressor, mode="w|")
+            elif archive_format == "tar.gz":
+                # The stream compressor of tarfile writes the current time into the gzip header
+                self._compressor = gzip.GzipFile(filename="", mode="wb", fileobj=file_object, mtime=0)  # type: ignore[assignment]
+                self._tar_file = tarfile.open(fileobj=self._compressor, mode="w|")
+            else:
+                self._tar_file = tarfile.open(fileobj=file_object, mode="w|")
+        except BaseException:
+            if self._owned_file is not None:
+                self._owned_file.close()
+            raise
+
+    def __enter__(self) -> "LayerArchive":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def add_image(self, member_name: str, image: "Image", minify=False) -> None:
+        """
+        Serialize an image into the archive.
+
+        Parameters
+        ----------
+        member_name: str
+            Name of the archive member.
+        image: Image
+            Image to write.
+        minify: bool
+            Write the image minified, see Image.save().
+        """
+        self.logm.debug('Add archive member "%s"', member_name)
+        if self._zip_file is not None:
+            zip_info = zipfile.ZipInfo(member_name, date_time=ZIP_DATE_TIME)
+            zip_info.compress_type = zipfile.ZIP_DEFLATED
+            with self._zip_file.open(zip_info, "w") as member_file:
+                image.save_to_file_object(member_file, minify=minify)  # type: ignore[arg-type]
+        else:
+            assert self._tar_file is not None
+            buffer = io.BytesIO()
+            image.save_to_file_object(buffer, minify=minify)
+            tar_info = tarfile.TarInfo(member_name)
+            tar_info.size = buffer.tell()
+            tar_info.mtime = 0
+            tar_info.mode = 0o644
+            buffer.seek(0)
+            self._tar_file.addfile(tar_info, buffer)
+        self.member_names.append(member_name)
+
+    def close(self) -> None:
+        """
+        Finish the archive. Closes the archive file, but not a file object passed by the caller.
+        """
+        if self._zip_file is not None:
+            self._zip_file.close()
+            self._zip_file = None
+        if self._tar_file is not None:
+            self._tar_file.close()
+            self._tar_file = None
+        if self._compressor is not None:
+            self._compressor.close()
+            self._compressor = None
+        if self._owned_file is not None:
+            self._owned_file.close()
+            self._owned_file = None
@@ -0,0 +1,248 @@
+# Copyright (C) 2024 twyleg
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from inkscape_layer_utils.image import Image
+
+logm = logging.getLogger(__name__)
+
+
+class BatchError(Exception):
+    pass
+
+
+class Job(NamedTuple):
+    """
+    Single operation on a source file of a batch manifest.
+
+    Attributes
+    ----------
+    name: str
+        Name of the job, used in the report.
+    source: Path
+        SVG file the job operates on.
+    operation: str
+        Name of the operation (see OPERATIONS).
+    options: Dict[str, Any]
+        Options of the operation, with all paths resolved.
+    """
+
+    name: str
+    source: Path
+    operation: str
+    options: Dict[str, Any]
+
+
+class JobResult(NamedTuple):
+    name: str
+    source: Path
+    operation: str
+    duration: float
+    error: Optional[str] = None
+
+
+class SourceResult(NamedTuple):
+    source: Path
+    parse_duration: float
+    job_results: List[JobResult]
+    error: Optional[str] = None
+
+
+def _save(image: Image, output_file_path: Path) -> None:
+    output_file_path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(output_file_path)
+
+
+def _run_extract_layers(image: Image, options: Dict[str, Any]) -> None:
+    # extract_layers() silently drops unknown paths, which is most likely a typo in a manifest
+    for layer_path in options["layers"]:
+        image.get_layer_by_path(layer_path)
+    _save(image.extract_layers(options["layers"], options.get("preserve_layer_paths", True)), options["output"])
+
+
+def _run_extract_all_layers(image: Image, options: Dict[str, Any]) -> None:
+    options["output"].mkdir(parents=True, exist_ok=True)
+    image.extract_all_layers_to_file(options["output"], options["base_name"])
+
+
+def _run_recolor(image: Image, options: Dict[str, Any]) -> None:
+    image = image.fork()
+    for layer_path in options.get("layers", ["/"]):
+        layer = image.get_layer_by_path(layer_path)
+        if options.get("fill") is not None:
+            layer.fill_all_objects(options["fill"], force=options.get("force", False), recursive=options.get("recursive", False))
+        if options.get("stroke") is not None:
+            layer.stroke_paint_all_objects(options["stroke"], force=options.get("force", False), recursive=options.get("recursive", False))
+        if options.get("swap") is not None:
+            layer.swap_colors(options["swap"])
+        if options.get("transform") is not None:
+            layer.transform_colors(**options["transform"])
+    _save(image, options["output"])
+
+
+def _run_set_visibility(image: Image, options: Dict[str, Any]) -> None:
+    image = image.fork()
+    for layer_path, visibility in options["layers"].items():
+        image.get_layer_by_path(layer_path).set_visibility(visibility, recursive=options.get("recursive", False))
+    _save(image, options["output"])
+
+
+class Operation(NamedTuple):
+    run: Callable[[Image, Dict[str, Any]], None]
+    required_options: List[str]
+    path_options: List[str]
+
+
+# fmt: off
+OPERATIONS: Dict[str, Operation] = {
+    "extract_layers": Operation(run=_run_extract_layers, required_options=["layers", "output"], path_options=["output"]),
+    "extract_all_layers": Operation(run=_run_extract_all_layers, required_options=["output"], path_options=["output"]),
+    "recolor": Operation(run=_run_recolor, required_options=["output"], path_options=["output"]),
+    "set_visibility": Operation(run=_run_set_visibility, required_options=["layers", "output"], path_options=["output"]),
+}
+# fmt: on
+
+
+def _read_manifest_file(manifest_path: Path) -> Dict[str, Any]:
+    if manifest_path.suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            raise BatchError("TOML manifests require Python 3.11 or newer, use a JSON manifest instead")
+        with open(manifest_path, "rb") as manifest_file:
+            return tomllib.load(manifest_file)
+    with open(manifest_path) as manifest_file:
+        return json.load(manifest_file)
+
+
+def load_manifest(manifest_path: Path) -> List[Job]:
+    """
+    Load the jobs of a batch manifest (JSON, or TOML on Python 3.11+). Relative paths are resolved against the
+    directory of the manifest.
+
+    Example (JSON)::
+
+        {
+            "jobs": [
+                {"source": "image.svg", "operation": "extract_layers", "layers": ["/face"],
+                 "preserve_layer_paths": false, "output": "output/face.svg"},
+                {"source": "image.svg", "operation": "extract_all_layers", "output": "output/layers"},
+                {"source": "image.svg", "operation": "recolor", "layers": ["/face"], "fill": "#ff0000",
+                 "recursive": true, "output": "output/red_face.svg"},
+                {"source": "image.svg", "operation": "recolor", "swap": {"#ff0000": "#00aa00", "#333": "#111"},
+                 "output": "output/green.svg"},
+                {"source": "image.svg", "operation": "recolor", "transform": {"hue_shift": 30, "lightness": -0.1},
+                 "output": "output/dark.svg"},
+                {"source": "image.svg", "operation": "set_visibility", "layers": {"/outline": false},
+                 "output": "output/no_outline.svg"}
+            ]
+        }
+
+    Parameters
+    ----------
+    manifest_path: Path
+        Path of the manifest file.
+
+    Returns
+    -------
+    List[Job]
+        Jobs of the manifest in the given order.
+
+    Raises
+    ------
+    BatchError
+        If the manifest is invalid.
+    """
+    manifest_path = Path(manifest_path)
+    manifest = _read_manifest_file(manifest_path)
+    base_dir = manifest_path.parent
+
+    jobs: List[Job] = []
+    for job_number, job_description in enumerate(manifest.get("jobs", []), start=1):
+        options = dict(job_description)
+        name = str(options.pop("name", f"job{job_number}"))
+        try:
+            source = base_dir / options.pop("source")
+            operation_name = options.pop("operation")
+        except KeyError as e:
+            raise BatchError(f'Job "{name}": missing key {e}')
+
+        operation = OPERATIONS.get(operation_name)
+        if operation is None:
+            raise BatchError(f'Job "{name}": unknown operation "{operation_name}", valid operations: {", ".join(OPERATIONS)}')
+        missing_options = [option for option in operation.required_options if option not in options]
+        if missing_options:
+            raise BatchError(f'Job "{name}": missing option(s) {", ".join(missing_options)} for operation "{operation_name}"')
+
+        for path_option in operation.path_options:
+            options[path_option] = base_dir / options[path_option]
+        if operation_name == "extract_all_layers":
+            options.setdefault("base_name", source.stem)
+        jobs.append(Job(name, source, operation_name, options))
+    return jobs
+
+
+def group_jobs_by_source(jobs: List[Job]) -> Dict[Path, List[Job]]:
+    """
+    Group jobs by their source file, keeping the order of the jobs per source.
+    """
+    jobs_by_source: Dict[Path, List[Job]] = {}
+    for job in jobs:
+        jobs_by_source.setdefault(job.source, []).append(job)
+    return jobs_by_source
+
+
+def run_source_jobs(source: Path, jobs: List[Job]) -> SourceResult:
+    """
+    Parse a source file once and run all of its jobs on it. Failing jobs don't affect the other jobs.
+    """
+    start = time.perf_counter()
+    try:
+        image = Image.load_from_file(source)
+    except Exception as e:
+        return SourceResult(source, time.perf_counter() - start, [], f"{type(e).__name__}: {e}")
+    parse_duration = time.perf_counter() - start
+
+    job_results: List[JobResult] = []
+    for job in jobs:
+        start = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            OPERATIONS[job.operation].run(image, job.options)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        job_results.append(JobResult(job.name, job.source, job.operation, time.perf_counter() - start, error))
+    return SourceResult(source, parse_duration, job_results)
+
+
+def run_jobs(jobs: List[Job], workers: Optional[int] = None) -> List[SourceResult]:
+    """
+    Run jobs with every source file parsed only once. The sources are distributed across a pool of worker
+    processes, all jobs of a source run in the same worker.
+
+    Parameters
+    ----------
+    jobs: List[Job]
+        Jobs to run.
+    workers: Optional[int]
+        Number of worker processes. Defaults to the number of CPUs, 1 runs all jobs in the calling process.
+
+    Returns
+    -------
+    List[SourceResult]
+        Results per source file, in the order of the sources' first occurrence in the jobs.
+    """
+    jobs_by_source = group_jobs_by_source(jobs)
+    workers = min(workers or os.cpu_count() or 1, len(jobs_by_source))
+    logm.debug("Run %d jobs on %d sources with %d worker(s)", len(jobs), len(jobs_by_source), workers)
+
+    if workers <= 1:
+        return [run_source_jobs(source, source_jobs) for source, source_jobs in jobs_by_source.items()]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_source_jobs, jobs_by_source.keys(), jobs_by_source.values()))
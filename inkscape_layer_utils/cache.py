@@ -0,0 +1,282 @@
+# Copyright (C) 2024 twyleg
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from xml.etree.ElementTree import Element
+
+import inkscape_layer_utils
+from inkscape_layer_utils.image import Image, parse_svg
+from inkscape_layer_utils.index import DocumentIndex
+from inkscape_layer_utils.inventory import estimate_svg_size
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Measured memory footprint of a loaded image (ElementTree and wrapper tree) relative to its estimated SVG size is ~6-9.
+DEFAULT_MEMORY_FACTOR = 8.0
+DEFAULT_IMAGE_CACHE_SIZE = 512 * 1024 * 1024
+
+
+def file_digest(file_path: Path) -> str:
+    """
+    Calculate the SHA-256 digest of a file's content.
+
+    Parameters
+    ----------
+    file_path: Path
+        Path of the file.
+
+    Returns
+    -------
+    str
+        Hex digest of the file's content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_root_element(file_path: Path) -> Element:
+    # Newer typeshed versions type the root element of an ElementTree as optional, parsed trees always have one
+    root_element: Optional[Element] = parse_svg(file_path).getroot()
+    assert root_element is not None
+    return root_element
+
+
+class SnapshotCache:
+    """
+    On-disk cache of document indices. Loading the layer/object index from a snapshot is considerably faster than
+    parsing the XML and building the wrapper tree again, which makes it a good fit for repeated queries like listing
+    the layers of unchanged files.
+
+    There is one snapshot per source file, keyed by the file's resolved path. Every snapshot carries a header with the
+    digest of the source file, the snapshot format and the library version. Snapshots of changed files or written by
+    another version are rebuilt automatically and replace the stale snapshot.
+    Snapshots are pickle files, so the cache directory must only be writable by trusted users.
+
+    Attributes
+    ----------
+    cache_dir: Path
+        Directory the snapshots are stored in.
+
+    """
+
+    logm = logging.getLogger(f"{__name__}.snp")
+
+    def __init__(self, cache_dir: Path) -> None:
+        """
+        Parameters
+        ----------
+        cache_dir: Path
+            Directory to store the snapshots in. Will be created if not existing.
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def get_snapshot_path(self, file_path: Path) -> Path:
+        """
+        Get the path of the snapshot of a source file.
+        """
+        return self.cache_dir / f"{hashlib.sha256(str(Path(file_path).resolve()).encode()).hexdigest()}.pickle"
+
+    @staticmethod
+    def __snapshot_header(digest: str) -> Dict[str, Any]:
+        return {"format": SNAPSHOT_FORMAT_VERSION, "version": inkscape_layer_utils.__version__, "digest": digest}
+
+    def __read_snapshot(self, snapshot_path: Path, expected_header: Dict[str, Any]) -> Optional[DocumentIndex]:
+        try:
+            with open(snapshot_path, "rb") as snapshot_file:
+                header = pickle.load(snapshot_file)
+                if header == expected_header:
+                    return pickle.load(snapshot_file)
+                self.logm.debug('Snapshot "%s" outdated: %s', snapshot_path, header)
+        except FileNotFoundError:
+            self.logm.debug('Snapshot "%s" not yet existing', snapshot_path)
+        except Exception as e:
+            # Unpickling a damaged file may raise almost anything (e.g. ValueError, TypeError, IndexError)
+            self.logm.warning('Ignoring corrupt snapshot "%s": %s', snapshot_path, e)
+        return None
+
+    def __write_snapshot(self, snapshot_path: Path, header: Dict[str, Any], index: DocumentIndex) -> None:
+        self.logm.debug('Write snapshot "%s"', snapshot_path)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                pickle.dump(header, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(index, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, snapshot_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load_index(self, file_path: Path, include_element_tree=False) -> DocumentIndex:
+        """
+        Load the document index of an image from its snapshot or create the index and the snapshot.
+
+        Parameters
+        ----------
+        file_path: Path
+            Path of the SVG file to load.
+        include_element_tree: bool
+            When True, the file is parsed as well and the elements are attached to the index (see
+            DocumentIndex.attach_elements()). Restoring ElementTree Elements from a pickle is slower than parsing
+            the XML, so the elements themselves are never part of the snapshot.
+
+        Returns
+        -------
+        DocumentIndex
+            Document index of the image.
+        """
+        file_path = Path(file_path)
+        digest = file_digest(file_path)
+        snapshot_path = self.get_snapshot_path(file_path)
+        header = self.__snapshot_header(digest)
+
+        index = self.__read_snapshot(snapshot_path, header)
+        if index is None:
+            self.logm.debug('Create index of "%s"', file_path)
+            index = DocumentIndex(_parse_root_element(file_path))
+            self.__write_snapshot(snapshot_path, header, index)
+            if not include_element_tree:
+                index.elements = []
+        else:
+            self.logm.debug('Loaded index of "%s" from snapshot "%s"', file_path, snapshot_path)
+            if include_element_tree:
+                index.attach_elements(_parse_root_element(file_path))
+        return index
+
+    def clear(self) -> None:
+        """
+        Remove all snapshots from the cache directory.
+        """
+        self.logm.debug('Clear snapshot cache "%s"', self.cache_dir)
+        for snapshot_path in self.cache_dir.glob("*.pickle"):
+            snapshot_path.unlink()
+
+
+class ImageCache:
+    """
+    In-process LRU cache of loaded images for long-running services that load the same files over and over.
+
+    Entries are keyed by the resolved file path and validated by the file's modification time and size. The cache is
+    bounded by the approximate memory footprint of the cached images, which is estimated from their uncompressed SVG
+    size (see estimate_svg_size()), so compressed files (.svgz) aren't underestimated.
+    The cached images are never handed out directly, callers always get a copy-on-write fork (see Image.fork())
+    they are free to modify.
+    The cache is safe to use from multiple threads.
+
+    Attributes
+    ----------
+    max_bytes: int
+        Upper bound of the approximate memory footprint of all cached images.
+    memory_factor: float
+        Factor to estimate an image's memory footprint from its uncompressed SVG size.
+
+    """
+
+    logm = logging.getLogger(f"{__name__}.img")
+
+    def __init__(self, max_bytes: int = DEFAULT_IMAGE_CACHE_SIZE, memory_factor: float = DEFAULT_MEMORY_FACTOR) -> None:
+        """
+        Parameters
+        ----------
+        max_bytes: int
+            Upper bound of the approximate memory footprint of all cached images.
+        memory_factor: float
+            Factor to estimate an image's memory footprint from its uncompressed SVG size.
+        """
+        self.max_bytes = max_bytes
+        self.memory_factor = memory_factor
+        self._entries: OrderedDict[str, Tuple[Tuple[int, int], int, Image]] = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        Approximate memory footprint of all cached images.
+        """
+        return self._size_bytes
+
+    @staticmethod
+    def _copy(image: Image) -> Image:
+        return image.fork()
+
+    def __evict(self) -> None:
+        while self._size_bytes > self.max_bytes and self._entries:
+            key, (_, size_bytes, _) = self._entries.popitem(last=False)
+            self._size_bytes -= size_bytes
+            self.logm.debug('Evict image "%s" (%d bytes)', key, size_bytes)
+
+    def load(self, file_path: Path) -> Image:
+        """
+        Load an image from the cache or from file if it is not cached or the file changed.
+
+        Parameters
+        ----------
+        file_path: Path
+            Path of the SVG file to load.
+
+        Returns
+        -------
+        Image
+            Fork of the cached image.
+        """
+        key = str(Path(file_path).resolve())
+        stat = os.stat(key)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.logm.debug('Cache hit: "%s"', key)
+                self._entries.move_to_end(key)
+                return self._copy(entry[2])
+
+        self.logm.debug('Cache miss: "%s"', key)
+        image = Image.load_from_file(Path(key))
+        size_bytes = int(estimate_svg_size(image.layer_element) * self.memory_factor)
+        if size_bytes > self.max_bytes:
+            self.logm.debug('Image "%s" exceeds cache size, not cached', key)
+            return image
+
+        with self._lock:
+            previous_entry = self._entries.pop(key, None)
+            if previous_entry is not None:
+                self._size_bytes -= previous_entry[1]
+            self._entries[key] = (version, size_bytes, image)
+            self._size_bytes += size_bytes
+            self.__evict()
+        return self._copy(image)
+
+    def invalidate(self, file_path: Path) -> None:
+        """
+        Remove an image from the cache.
+
+        Parameters
+        ----------
+        file_path: Path
+            Path of the SVG file to remove.
+        """
+        with self._lock:
+            entry = self._entries.pop(str(Path(file_path).resolve()), None)
+            if entry is not None:
+                self._size_bytes -= entry[1]
+
+    def clear(self) -> None:
+        """
+        Remove all images from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
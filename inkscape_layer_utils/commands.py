@@ -0,0 +1,731 @@
+# Copyright (C) 2024 twyleg
+import argparse
+import logging
+import sys
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional
+
+from inkscape_layer_utils.image import Image
+from inkscape_layer_utils.selector import LayerSelector, SelectorError
+
+if TYPE_CHECKING:
+    from inkscape_layer_utils.store import ContentStore
+
+logm = logging.getLogger("inkscape_layer_utils")
+
+# Path argument value that stands for stdin (input files) or stdout (output)
+STDIO_PATH = "-"
+STDIN_BASE_NAME = "stdin"
+
+
+def _log_line(fmt: str, *args) -> None:
+    logm.info(fmt, *args)
+
+
+def _log_error(fmt: str, *args) -> None:
+    logm.error(fmt, *args)
+
+
+def _flush_stdout() -> None:
+    sys.stdout.flush()
+
+
+class CommandContext(NamedTuple):
+    """
+    Environment the subcommand handlers run in. The server mode uses it to load images from its cache and to
+    send the output (including error messages) back to the client instead of the server's stdout/log.
+    """
+
+    load_image: Callable[[Path], Image] = Image.load_from_file
+    print_line: Callable[[str], None] = print
+    log_line: Callable[..., None] = _log_line
+    log_error: Callable[..., None] = _log_error
+    flush_output: Callable[[], None] = _flush_stdout
+
+
+DEFAULT_CONTEXT = CommandContext()
+
+
+def _load_svg_file(svg_file_path: str, context: CommandContext) -> Image:
+    if svg_file_path == STDIO_PATH:
+        return Image.load_from_file_object(sys.stdin.buffer)
+    return context.load_image(Path(svg_file_path))
+
+
+def _get_base_name(svg_file_path: str) -> str:
+    return STDIN_BASE_NAME if svg_file_path == STDIO_PATH else Path(svg_file_path).stem
+
+
+def _check_stdin_usage(svg_file_paths: List[str], context: CommandContext) -> bool:
+    if svg_file_paths.count(STDIO_PATH) > 1:
+        context.log_error('stdin ("%s") can only be used once as input file!', STDIO_PATH)
+        return False
+    return True
+
+
+class Subcommand(NamedTuple):
+    help: str
+    description: str
+    add_arguments: Callable[[argparse.ArgumentParser], None]
+    handler: Callable[..., int]
+
+
+def add_svg_files_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "svg_files",
+        metavar="svg_files",
+        type=str,
+        nargs="+",
+        help=f'SVG image file(s) to extract the layers from. "{STDIO_PATH}" reads from stdin.',
+    )
+
+
+def add_extract_layers_arguments(parser: argparse.ArgumentParser) -> None:
+    # fmt: off
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        default="output",
+        help='Output directory for extracted layers. Default="./output"',
+    )
+
+    parser.add_argument(
+        "-w",
+        "--watch",
+        help="Keep running and re-extract the changed layers whenever an input file changes.",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Interval in seconds to check the input files for changes when inotify is not available. Default=1.0",
+    )
+
+    parser.add_argument(
+        "--depfile",
+        help="Write a Make style dependency file listing the extracted layer files of every input file.",
+    )
+
+    parser.add_argument(
+        "--ninja",
+        help="Write a Ninja build file with a build statement per input file listing its extracted layer files.",
+    )
+
+    parser.add_argument(
+        "-z",
+        "--compress",
+        help="Write gzip compressed layer files (.svgz).",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        choices=range(1, 10),
+        default=9,
+        metavar="{1..9}",
+        help="Compression level from 1 (fastest) to 9 (smallest) for --compress. Default=9",
+    )
+
+    parser.add_argument(
+        "-m",
+        "--minify",
+        help="Write minified, web-optimized layer files without Inkscape/Sodipodi data, metadata, whitespace "
+             "between elements and empty groups.",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        default=1,
+        help="Number of threads extracting the layers of a file, sharing one read-only parsed image. Most effective "
+             "on free-threaded Python builds. Default=1",
+    )
+
+    parser.add_argument(
+        "-a",
+        "--archive",
+        help=f'Write all extracted layers into a single archive file instead of the output directory. "{STDIO_PATH}" '
+             f'writes the archive to stdout.',
+    )
+
+    parser.add_argument(
+        "--archive-format",
+        choices=["tar", "tar.gz", "tar.zst", "zip"],
+        help="Format of the archive. Default=determined from the archive file name, tar for stdout",
+    )
+
+    parser.add_argument(
+        "--store",
+        help="Content-addressed store directory. Every distinct layer file is written to the store only once and "
+             "hard-linked into the output directory.",
+    )
+
+    parser.add_argument(
+        "--store-manifest",
+        help="Write a JSON manifest with the stored object of every output file (requires --store).",
+    )
+
+    parser.add_argument(
+        "--sprite",
+        help="Write all layers as <symbol> elements into a single SVG sprite sheet instead of the output directory.",
+    )
+
+    parser.add_argument(
+        "--sprite-index",
+        help="JSON file mapping the layer paths to the symbol ids of the sprite sheet. Default=sprite sheet file "
+             "name with .json extension",
+    )
+
+    parser.add_argument(
+        "-s",
+        "--select",
+        action="append",
+        help='Only extract the selected layers. Layer path glob ("/face/**", "/*/eyes/*"), regular expression '
+             'searched in the layer name ("re:^icon_\\d+$") or negation of one of them ("!/face/nose"). Can be given '
+             "multiple times.",
+    )
+
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        help="Only determine the extracted layer files (from a scan of the layer structure), don't extract anything.",
+        action="store_true"
+    )
+    # fmt: on
+    add_svg_files_argument(parser)
+
+
+def add_list_layers_arguments(parser: argparse.ArgumentParser) -> None:
+    # fmt: off
+    parser.add_argument(
+        "-j",
+        "--json",
+        help="Output results in JSON format instead of list.",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--ndjson",
+        help="Stream results as newline delimited JSON, one record per file as soon as the file is parsed. "
+             "Implies --print, use -q to suppress the startup log line.",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "-s",
+        "--stats",
+        help="List statistics per layer (objects, groups, size, referenced defs, embedded raster bytes, depth).",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "-p",
+        "--print",
+        help="Use print instead of log to return results.",
+        action="store_true"
+    )
+    # fmt: on
+    add_svg_files_argument(parser)
+
+
+def add_recolor_arguments(parser: argparse.ArgumentParser) -> None:
+    # fmt: off
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        default="output",
+        help=f'Output directory for the recolored images or "{STDIO_PATH}" for stdout. Default="./output"',
+    )
+
+    parser.add_argument(
+        "-l",
+        "--layer",
+        dest="layers",
+        action="append",
+        help='Path of the layer to recolor. Can be given multiple times. Default="/"',
+    )
+
+    parser.add_argument(
+        "-s",
+        "--select",
+        action="append",
+        help="Recolor the selected layers instead of the layers given with --layer, see extract_layers --select. Can "
+             "be given multiple times.",
+    )
+
+    parser.add_argument(
+        "--fill",
+        help="Fill color in Hex RGB format, e.g. '#FF0000'.",
+    )
+
+    parser.add_argument(
+        "--stroke",
+        help="Stroke paint color in Hex RGB format, e.g. '#FF0000'.",
+    )
+
+    parser.add_argument(
+        "--swap",
+        action="append",
+        metavar="FROM=TO",
+        help="Replace every use of a color (fill, stroke, stop-color and flood-color) within the layers and their "
+             "sublayers, e.g. '#FF0000=#00AA00'. Can be given multiple times, all colors are swapped at once.",
+    )
+
+    parser.add_argument(
+        "--hue-shift",
+        type=float,
+        default=0.0,
+        help="Rotate the hue of all hex RGB colors within the layers and their sublayers by the given degrees.",
+    )
+
+    parser.add_argument(
+        "--saturation",
+        type=float,
+        default=0.0,
+        help="Change the saturation of all hex RGB colors by the given amount from -1.0 to 1.0, -1.0 converts to "
+             "grayscale.",
+    )
+
+    parser.add_argument(
+        "--lightness",
+        type=float,
+        default=0.0,
+        help="Change the lightness of all hex RGB colors by the given amount from -1.0 to 1.0, e.g. -0.1 darkens by "
+             "10%%.",
+    )
+
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        help="Recolor the objects on sublayers as well.",
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "-f",
+        "--force",
+        help="Force to colorize objects even if they are not colorized at the moment.",
+        action="store_true"
+    )
+    # fmt: on
+    add_svg_files_argument(parser)
+
+
+def handle_extract_layers(args: argparse.Namespace, context: CommandContext = DEFAULT_CONTEXT) -> int:
+    if not _check_stdin_usage(args.svg_files, context):
+        return 1
+    if args.output == STDIO_PATH:
+        context.log_error("extract_layers writes one file per layer and can't write to stdout!")
+        return 1
+
+    try:
+        selector = LayerSelector(args.select) if args.select else None
+    except SelectorError as e:
+        context.log_error("%s", e)
+        return 1
+
+    if args.archive:
+        return _extract_layers_to_archive(args, context, selector)
+    if args.sprite:
+        if selector is not None:
+            context.log_error("--sprite can't be combined with --select!")
+            return 1
+        return _extract_layers_to_sprite_sheet(args, context)
+
+    if args.watch:
+        if STDIO_PATH in args.svg_files:
+            context.log_error("stdin can't be watched!")
+            return 1
+        if args.store or selector is not None:
+            context.log_error("--store and --select can't be combined with --watch!")
+            return 1
+        from inkscape_layer_utils.watch import watch_and_extract
+
+        try:
+            watch_and_extract(
+                [Path(svg_file_path) for svg_file_path in args.svg_files],
+                Path(args.output),
+                args.poll_interval,
+                args.compress,
+                args.compression_level,
+                args.minify,
+            )
+        except KeyboardInterrupt:
+            logm.info("Stopped watching")
+        return 0
+
+    store: Optional[ContentStore] = None
+    if args.store:
+        from inkscape_layer_utils.store import ContentStore
+
+        store = ContentStore(Path(args.store))
+    elif args.store_manifest:
+        context.log_error("--store-manifest requires --store!")
+        return 1
+
+    output_file_paths_by_input_file_path: Dict[Path, List[Path]] = {}
+    for svg_file_path in args.svg_files:
+        base_name = _get_base_name(svg_file_path)
+        if args.dry_run:
+            scan_source = sys.stdin.buffer if svg_file_path == STDIO_PATH else Path(svg_file_path)
+            layer_paths = Image.scan_layer_paths(scan_source)
+            if selector is not None:
+                layer_paths = selector.filter_paths(layer_paths)
+            output_file_paths = [Path(args.output) / Image.get_layer_file_name(base_name, layer_path, args.compress) for layer_path in layer_paths]
+            for output_file_path in output_file_paths:
+                context.log_line("%s -> %s", svg_file_path, output_file_path)
+        elif store is not None:
+            svg_image = _load_svg_file(svg_file_path, context)
+            output_file_paths = list(
+                svg_image.extract_layers_to_store(
+                    store, Path(args.output), base_name, _get_layer_paths(svg_image, selector), args.compress, args.compression_level, args.minify
+                ).values()
+            )
+        else:
+            svg_image = _load_svg_file(svg_file_path, context)
+            output_file_paths = list(
+                svg_image.extract_layers_to_file(
+                    args.output, base_name, _get_layer_paths(svg_image, selector), args.compress, args.compression_level, args.minify, args.threads
+                ).values()
+            )
+        output_file_paths_by_input_file_path[Path(svg_file_path)] = output_file_paths
+
+    if store is not None:
+        context.log_line("Stored %d new file(s), reused %d stored file(s)", store.objects_written, store.objects_reused)
+        if args.store_manifest:
+            store.save_manifest(Path(args.store_manifest))
+
+    if args.depfile or args.ninja:
+        from inkscape_layer_utils.depfile import write_depfile, write_ninja_file
+
+        if args.depfile:
+            write_depfile(Path(args.depfile), output_file_paths_by_input_file_path)
+        if args.ninja:
+            extra_arguments = ["--compress", f"--compression-level={args.compression_level}"] if args.compress else []
+            if args.minify:
+                extra_arguments.append("--minify")
+            if args.store:
+                extra_arguments.append(f"--store={args.store}")
+            extra_arguments.extend(f"--select={selector_term}" for selector_term in args.select or [])
+            write_ninja_file(Path(args.ninja), output_file_paths_by_input_file_path, Path(args.output), extra_arguments)
+
+    return 0
+
+
+def _get_layer_paths(svg_image: Image, selector: Optional[LayerSelector]) -> List[str]:
+    if selector is None:
+        return svg_image.get_all_layer_paths()
+    return [layer.layer_path for layer in selector.select(svg_image)]
+
+
+def _extract_layers_to_archive(args: argparse.Namespace, context: CommandContext, selector: Optional[LayerSelector]) -> int:
+    from inkscape_layer_utils.archive import ArchiveError, LayerArchive
+
+    if args.watch or args.ninja or args.dry_run:
+        context.log_error("--archive can't be combined with --watch, --ninja or --dry-run!")
+        return 1
+
+    archive_format = args.archive_format or ("tar" if args.archive == STDIO_PATH else None)
+    try:
+        with LayerArchive(sys.stdout.buffer if args.archive == STDIO_PATH else Path(args.archive), archive_format) as archive:
+            for svg_file_path in args.svg_files:
+                svg_image = _load_svg_file(svg_file_path, context)
+                svg_image.extract_layers_to_archive(archive, _get_base_name(svg_file_path), _get_layer_paths(svg_image, selector), args.minify)
+    except ArchiveError as e:
+        context.log_error("%s", e)
+        return 1
+    if args.archive == STDIO_PATH:
+        sys.stdout.buffer.flush()
+
+    if args.depfile:
+        from inkscape_layer_utils.depfile import write_depfile
+
+        write_depfile(Path(args.depfile), {Path(svg_file_path): [Path(args.archive)] for svg_file_path in args.svg_files})
+    return 0
+
+
+def _extract_layers_to_sprite_sheet(args: argparse.Namespace, context: CommandContext) -> int:
+    from inkscape_layer_utils.sprite import SpriteSheet
+
+    if args.watch or args.ninja or args.dry_run or args.compress:
+        context.log_error("--sprite can't be combined with --watch, --ninja, --dry-run or --compress!")
+        return 1
+
+    sprite_file_path = Path(args.sprite)
+    sprite_index_file_path = Path(args.sprite_index) if args.sprite_index else sprite_file_path.with_suffix(".json")
+    base_names = [_get_base_name(svg_file_path) for svg_file_path in args.svg_files]
+    duplicate_base_names = sorted({base_name for base_name in base_names if base_names.count(base_name) > 1})
+    if duplicate_base_names:
+        context.log_error("The symbol ids of the sprite sheet are based on the file names, input files with the same name: %s", ", ".join(duplicate_base_names))
+        return 1
+    sprite_sheet = SpriteSheet()
+    for svg_file_path in args.svg_files:
+        svg_image = _load_svg_file(svg_file_path, context)
+        sprite_sheet.add_image(svg_image, _get_base_name(svg_file_path))
+    sprite_sheet.save(sprite_file_path, args.minify)
+    sprite_sheet.save_index(sprite_index_file_path)
+
+    if args.depfile:
+        from inkscape_layer_utils.depfile import write_depfile
+
+        write_depfile(Path(args.depfile), {Path(svg_file_path): [sprite_file_path, sprite_index_file_path] for svg_file_path in args.svg_files})
+    return 0
+
+
+def handle_list_layers(args: argparse.Namespace, context: CommandContext = DEFAULT_CONTEXT) -> int:
+
+    def log_or_print_line(fmt: str, *vars) -> None:
+        if args.print:
+            context.print_line(fmt % vars)
+        else:
+            context.log_line(fmt, *vars)
+
+    if not _check_stdin_usage(args.svg_files, context):
+        return 1
+
+    if args.ndjson:
+        return _stream_layers_as_ndjson(args, context)
+
+    layers_by_svg_file_path: OrderedDict[str, List[Any]] = OrderedDict()
+    for svg_file_path in args.svg_files:
+        svg_image = _load_svg_file(svg_file_path, context)
+        layers_by_svg_file_path[svg_file_path] = _get_layers(svg_image, args.stats)
+
+    if args.json:
+        import json
+
+        json_str = json.dumps(layers_by_svg_file_path, indent=4)
+        for line in json_str.splitlines():
+            log_or_print_line(line)
+    elif args.stats:
+        for svg_file_path, layer_statistics in layers_by_svg_file_path.items():
+            log_or_print_line("File: %s", svg_file_path)
+            for statistics in layer_statistics:
+                log_or_print_line(
+                    "  %s: depth=%d, objects=%d, groups=%d, bytes=%d, subtree_bytes=%d, raster_bytes=%d, referenced_defs=%s",
+                    statistics["path"],
+                    statistics["depth"],
+                    statistics["objects"],
+                    statistics["groups"],
+                    statistics["bytes"],
+                    statistics["subtree_bytes"],
+                    statistics["raster_bytes"],
+                    ",".join(statistics["referenced_defs"]) or "-",
+                )
+    else:
+        for svg_file_path, layer_paths in layers_by_svg_file_path.items():
+            log_or_print_line("File: %s", svg_file_path)
+            for layer_path in layer_paths:
+                log_or_print_line("  %s", layer_path)
+
+    return 0
+
+
+def _get_layers(svg_image: Image, stats: bool) -> List[Any]:
+    if not stats:
+        return svg_image.get_all_layer_paths()
+
+    from inkscape_layer_utils.inventory import create_layer_inventory
+
+    return [statistics._asdict() for statistics in create_layer_inventory(svg_image.create_index())]
+
+
+def _stream_layers_as_ndjson(args: argparse.Namespace, context: CommandContext) -> int:
+    import json
+
+    exit_code = 0
+    for svg_file_path in args.svg_files:
+        try:
+            record = {"file": svg_file_path, "layers": _get_layers(_load_svg_file(svg_file_path, context), args.stats)}
+        except (OSError, SyntaxError, KeyError) as e:
+            record = {"file": svg_file_path, "error": f"{type(e).__name__}: {e}"}
+            exit_code = 1
+        context.print_line(json.dumps(record))
+        context.flush_output()
+    return exit_code
+
+
+def _is_same_or_sublayer_path(layer_path: str, ancestor_layer_path: str) -> bool:
+    return ancestor_layer_path == "/" or layer_path == ancestor_layer_path or layer_path.startswith(f"{ancestor_layer_path}/")
+
+
+def handle_recolor(args: argparse.Namespace, context: CommandContext = DEFAULT_CONTEXT) -> int:
+    # Imported here, NumPy (if installed) would add its import time to the startup of every subcommand
+    from inkscape_layer_utils.palette import ColorTransform
+
+    transform = ColorTransform(args.hue_shift, args.saturation, args.lightness)
+    if args.fill is None and args.stroke is None and not args.swap and transform == ColorTransform():
+        context.log_error("Neither --fill, --stroke, --swap nor a color transformation provided!")
+        return 1
+    palette: Dict[str, str] = {}
+    for swap in args.swap or []:
+        color, separator, new_color = swap.partition("=")
+        if not separator or not color or not new_color:
+            context.log_error('Invalid color swap "%s", expected FROM=TO, e.g. "#FF0000=#00AA00"', swap)
+            return 1
+        palette[color] = new_color
+    if not _check_stdin_usage(args.svg_files, context):
+        return 1
+    if args.output == STDIO_PATH and len(args.svg_files) > 1:
+        context.log_error("Only a single input file can be recolored to stdout!")
+        return 1
+    if args.select and args.layers:
+        context.log_error("--select can't be combined with --layer!")
+        return 1
+    try:
+        selector = LayerSelector(args.select) if args.select else None
+    except SelectorError as e:
+        context.log_error("%s", e)
+        return 1
+
+    for svg_file_path in args.svg_files:
+        svg_image = _load_svg_file(svg_file_path, context)
+        layers = selector.select(svg_image) if selector is not None else [svg_image.get_layer_by_path(layer_path) for layer_path in args.layers or ["/"]]
+        for layer in layers:
+            if args.fill is not None:
+                layer.fill_all_objects(args.fill, force=args.force, recursive=args.recursive)
+            if args.stroke is not None:
+                layer.stroke_paint_all_objects(args.stroke, force=args.force, recursive=args.recursive)
+        if palette or transform != ColorTransform():
+            # Sublayers are recolored with their ancestors, recoloring them twice would e.g. undo "#F00=#00F" "#00F=#F00"
+            recolored_layer_paths: List[str] = []
+            for layer in sorted(layers, key=lambda layer: len(layer.layer_path)):
+                if not any(_is_same_or_sublayer_path(layer.layer_path, layer_path) for layer_path in recolored_layer_paths):
+                    color_index = layer.create_color_index()
+                    color_index.apply(palette)
+                    if transform != ColorTransform():
+                        color_index.transform(transform)
+                    recolored_layer_paths.append(layer.layer_path)
+        if args.output == STDIO_PATH:
+            svg_image.save_to_file_object(sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+        else:
+            output_file_name = f"{STDIN_BASE_NAME}.svg" if svg_file_path == STDIO_PATH else Path(svg_file_path).name
+            # Compressed inputs stay compressed
+            svg_image.save(Path(args.output) / output_file_name, compress=output_file_name.lower().endswith(".svgz"))
+
+    return 0
+
+
+def add_batch_arguments(parser: argparse.ArgumentParser) -> None:
+    # fmt: off
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Default=number of CPUs",
+    )
+
+    parser.add_argument(
+        "manifest",
+        help="JSON (or TOML) manifest file with the jobs to run.",
+    )
+    # fmt: on
+
+
+def handle_batch(args: argparse.Namespace, context: CommandContext = DEFAULT_CONTEXT) -> int:
+    from inkscape_layer_utils.batch import BatchError, load_manifest, run_jobs
+
+    try:
+        jobs = load_manifest(Path(args.manifest))
+    except (BatchError, OSError, ValueError) as e:
+        context.log_error('Invalid manifest "%s": %s', args.manifest, e)
+        return 1
+
+    job_counts_by_source = Counter(job.source for job in jobs)
+    failed_job_count = 0
+    for source_result in run_jobs(jobs, args.workers):
+        if source_result.error is not None:
+            context.log_line('Source "%s": failed to parse: %s', source_result.source, source_result.error)
+            # None of the source's jobs ran
+            failed_job_count += job_counts_by_source[source_result.source]
+            continue
+        context.log_line('Source "%s": parsed in %.1f ms', source_result.source, source_result.parse_duration * 1000)
+        for job_result in source_result.job_results:
+            if job_result.error is None:
+                context.log_line('  Job "%s" (%s): %.1f ms', job_result.name, job_result.operation, job_result.duration * 1000)
+            else:
+                context.log_line(
+                    '  Job "%s" (%s): failed after %.1f ms: %s', job_result.name, job_result.operation, job_result.duration * 1000, job_result.error
+                )
+                failed_job_count += 1
+
+    if failed_job_count:
+        context.log_error("%d of %d job(s) failed", failed_job_count, len(jobs))
+        return 1
+    return 0
+
+
+def handle_serve(args: argparse.Namespace) -> int:
+    from inkscape_layer_utils.server import serve
+
+    return serve(Path(args.socket), args.cache_size * 1024 * 1024)
+
+
+def add_serve_arguments(parser: argparse.ArgumentParser) -> None:
+    from inkscape_layer_utils.server import DEFAULT_SOCKET_PATH
+
+    # fmt: off
+    parser.add_argument(
+        "-s",
+        "--socket",
+        default=DEFAULT_SOCKET_PATH,
+        help=f'Unix socket to listen on. Default="{DEFAULT_SOCKET_PATH}"',
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=512,
+        help="Approximate memory limit of the image cache in MiB. Default=512",
+    )
+    # fmt: on
+
+
+# fmt: off
+SUBCOMMANDS: Dict[str, Subcommand] = {
+    "extract_layers": Subcommand(
+        help="Extract layers from SVG input file.",
+        description="Extract layers from SVG input file into multiple output files.",
+        add_arguments=add_extract_layers_arguments,
+        handler=handle_extract_layers,
+    ),
+    "list_layers": Subcommand(
+        help="List layers of SVG input file.",
+        description="List layers of SVG input file in plain text list or JSON format.",
+        add_arguments=add_list_layers_arguments,
+        handler=handle_list_layers,
+    ),
+    "recolor": Subcommand(
+        help="Recolor layers of SVG input file.",
+        description="Recolor the objects of layers of SVG input files and save the results to an output directory.",
+        add_arguments=add_recolor_arguments,
+        handler=handle_recolor,
+    ),
+    "batch": Subcommand(
+        help="Run the jobs of a manifest file.",
+        description="Run extract_layers, extract_all_layers, recolor and set_visibility jobs described in a JSON or "
+                    "TOML manifest. Every source file is parsed only once and the sources are processed in parallel.",
+        add_arguments=add_batch_arguments,
+        handler=handle_batch,
+    ),
+    "serve": Subcommand(
+        help="Run as server on a Unix socket.",
+        description="Run as long-lived server that executes forwarded extract_layers, list_layers and recolor calls "
+                    "with a cache of parsed images. Clients forward their calls when the environment variable "
+                    "INKSCAPE_LAYER_UTILS_SOCKET is set.",
+        add_arguments=add_serve_arguments,
+        handler=handle_serve,
+    ),
+}
+# fmt: on
@@ -0,0 +1,86 @@
+# Copyright (C) 2024 twyleg
+import shlex
+from pathlib import Path
+from typing import Dict, List, Optional
+
+NINJA_RULE_NAME = "inkscape_layer_utils_extract_layers"
+
+
+def _escape_make_path(path: Path) -> str:
+    return str(path).replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
+
+
+def _escape_ninja_path(path: Path) -> str:
+    return str(path).replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+
+def format_depfile(output_file_paths_by_input_file_path: Dict[Path, List[Path]]) -> str:
+    """
+    Format a Make style dependency file with one rule per input file, listing the extracted layer files as
+    targets that depend on the input file. Ninja reads the same format (depfile = ... in a rule).
+
+    Parameters
+    ----------
+    output_file_paths_by_input_file_path: Dict[Path, List[Path]]
+        Extracted layer files by SVG input file.
+
+    Returns
+    -------
+    str
+        Content of the dependency file.
+    """
+    lines: List[str] = []
+    for input_file_path, output_file_paths in output_file_paths_by_input_file_path.items():
+        targets = " ".join(_escape_make_path(output_file_path) for output_file_path in output_file_paths)
+        lines.append(f"{targets}: {_escape_make_path(input_file_path)}")
+    return "".join(f"{line}\n" for line in lines)
+
+
+def format_ninja_file(output_file_paths_by_input_file_path: Dict[Path, List[Path]], output_dir: Path, extra_arguments: Optional[List[str]] = None) -> str:
+    """
+    Format a Ninja build file with one build statement per input file, listing the extracted layer files as
+    outputs. The file is meant to be included into (or subninja'd from) the project's build.ninja.
+
+    Parameters
+    ----------
+    output_file_paths_by_input_file_path: Dict[Path, List[Path]]
+        Extracted layer files by SVG input file.
+    output_dir: Path
+        Output directory the layers are extracted to.
+    extra_arguments: Optional[List[str]]
+        Further extract_layers arguments the layers are extracted with (e.g. --compress).
+
+    Returns
+    -------
+    str
+        Content of the Ninja build file.
+    """
+    arguments = "".join(f" {shlex.quote(argument)}" for argument in extra_arguments or []).replace("$", "$$")
+    lines: List[str] = [
+        f"rule {NINJA_RULE_NAME}",
+        f"  command = inkscape_layer_utils -q extract_layers{arguments} -o $output_dir $in",
+        "  description = Extract layers of $in",
+        "",
+    ]
+    output_dir_variable = shlex.quote(str(output_dir)).replace("$", "$$")
+    for input_file_path, output_file_paths in output_file_paths_by_input_file_path.items():
+        outputs = " ".join(_escape_ninja_path(output_file_path) for output_file_path in output_file_paths)
+        lines.append(f"build {outputs}: {NINJA_RULE_NAME} {_escape_ninja_path(input_file_path)}")
+        lines.append(f"  output_dir = {output_dir_variable}")
+    return "".join(f"{line}\n" for line in lines)
+
+
+def write_depfile(file_path: Path, output_file_paths_by_input_file_path: Dict[Path, List[Path]]) -> None:
+    """
+    Write a Make style dependency file, see format_depfile().
+    """
+    Path(file_path).write_text(format_depfile(output_file_paths_by_input_file_path))
+
+
+def write_ninja_file(
+    file_path: Path, output_file_paths_by_input_file_path: Dict[Path, List[Path]], output_dir: Path, extra_arguments: Optional[List[str]] = None
+) -> None:
+    """
+    Write a Ninja build file, see format_ninja_file().
+    """
+    Path(file_path).write_text(format_ninja_file(output_file_paths_by_input_file_path, output_dir, extra_arguments))
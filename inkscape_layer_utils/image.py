@@ -1,13 +1,30 @@
 # Copyright (C) 2024 twyleg
-import copy
+import functools
+import gzip
+import io
+import mmap
 import os
 import logging
+import stat
+import zlib
 import xml.etree.ElementTree as ET
-from collections import OrderedDict
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, ContextManager, Iterator, List, Optional, Dict, Set, TypeVar, Union, cast
 from xml.etree.ElementTree import Element, ElementTree
 
+from inkscape_layer_utils.minify import write_minified
+from inkscape_layer_utils.selector import LayerSelector
+from inkscape_layer_utils.style import ComputedStyles, format_style, parse_style
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from inkscape_layer_utils.archive import LayerArchive
+    from inkscape_layer_utils.index import DocumentIndex
+    from inkscape_layer_utils.palette import ColorIndex
+    from inkscape_layer_utils.store import ContentStore
+
 
 class LayerUnknownError(Exception):
     def __init__(self, path: str):
@@ -17,12 +34,267 @@ class LayerUnknownError(Exception):
         return f"Layer with path '{self.path}' is unknown!"
 
 
+class ImageFrozenError(Exception):
+    def __str__(self):
+        return "Image is frozen (read-only), fork it to get a modifiable copy!"
+
+
+class _EmptyChildren(dict):
+    """
+    Immutable empty dict that is shared by all elements without children of a kind. Most leaf objects have no
+    id-bearing children, so sharing a single instance avoids allocating one empty dict per object.
+    Code that needs to add children has to replace the sentinel with a new dict instead of mutating it.
+    """
+
+    __slots__ = ()
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("Shared empty children dict is immutable")
+
+    __setitem__ = __delitem__ = setdefault = update = pop = popitem = _immutable  # type: ignore[assignment]
+
+    def clear(self) -> None:
+        pass
+
+    def __copy__(self) -> "_EmptyChildren":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "_EmptyChildren":
+        return self
+
+    def __reduce__(self) -> str:
+        return "_EMPTY_CHILDREN"
+
+
+_EMPTY_CHILDREN: Dict[str, Any] = _EmptyChildren()
+
+GZIP_MAGIC = b"\x1f\x8b"
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+DEFAULT_COMPRESSION_LEVEL = 9
+
+
+def _compressing_writer(file_object: BinaryIO, compression_level: int) -> gzip.GzipFile:
+    # Neither file name nor timestamp in the header, the output only depends on the content (like ContentStore objects)
+    return gzip.GzipFile(filename="", mode="wb", compresslevel=compression_level, fileobj=file_object, mtime=0)
+
+
+def unlink_stored_output(path: Path) -> None:
+    """
+    Remove an output file that is a hard link of a stored object (see ContentStore) before it is written to.
+    Stored objects are read-only and shared by all their links, so such an output is replaced by a new file
+    instead of written through. Other files, including writable hard links, are left as they are.
+
+    Parameters
+    ----------
+    path: Path
+        Output file about to be written.
+    """
+    try:
+        file_stat = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if file_stat.st_nlink > 1 and not file_stat.st_mode & stat.S_IWUSR:
+        os.unlink(path)
+
+
+def _decompressing_reader(file_object: BinaryIO) -> io.BufferedIOBase:
+    # Compressed SVGs (.svgz) are detected by the gzip magic bytes, not by the file extension
+    if isinstance(file_object, io.BufferedReader):
+        buffered_reader = file_object
+    else:
+        # BufferedReader only uses readinto(), which all binary file objects provide, not only raw ones
+        buffered_reader = io.BufferedReader(cast(io.RawIOBase, file_object))
+    if buffered_reader.peek(len(GZIP_MAGIC))[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=buffered_reader, mode="rb")
+    return buffered_reader
+
+
+PARSE_CHUNK_SIZE = 1024 * 1024
+
+_T = TypeVar("_T")
+
+Selector = Union[str, List[str], LayerSelector]
+
+_async_executor: Optional["Executor"] = None
+
+
+def set_async_executor(executor: Optional["Executor"]) -> None:
+    """
+    Set the executor the async API (Image.aload(), Image.asave(), ...) runs parsing, extraction and file I/O in.
+    Images are passed to and returned from the executor, so a thread pool is the natural choice. A process pool
+    works as well, but pickles the images on every call.
+
+    Parameters
+    ----------
+    executor: Optional["Executor"]
+        Executor to use, None for the default executor of the running event loop.
+    """
+    global _async_executor
+    _async_executor = executor
+
+
+async def _run_in_executor(executor: Optional["Executor"], function: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+    # Imported here, asyncio would add its import time to every CLI start
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or _async_executor, functools.partial(function, *args, **kwargs))
+
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def _feed_decompressed(parser: ET.XMLParser, decompressor: Any, chunk: memoryview) -> Any:
+    compressed: Any = chunk
+    # A gzip file may consist of several members, each one needs a new decompressor
+    while True:
+        if decompressor.eof:
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+        parser.feed(decompressor.decompress(compressed))
+        compressed = decompressor.unused_data
+        if not compressed:
+            return decompressor
+
+
+def parse_svg_buffer(buffer: Any, progress: Optional[ProgressCallback] = None, chunk_size=PARSE_CHUNK_SIZE) -> ElementTree:
+    """
+    Parse a plain or gzip compressed SVG document from an object supporting the buffer protocol (bytes,
+    bytearray, memoryview, mmap, ...). The buffer is fed to the parser in chunks of memoryview slices, so no
+    copy of the document is created.
+
+    Parameters
+    ----------
+    buffer: Any
+        Buffer containing the document.
+    progress: Optional[ProgressCallback]
+        Called after every chunk with the number of bytes parsed so far and the total number of bytes.
+    chunk_size: int
+        Number of bytes fed to the parser at once.
+
+    Returns
+    -------
+    ElementTree
+        Parsed element tree.
+    """
+    parser = ET.XMLParser()
+    with memoryview(buffer) as view, view.cast("B") as data:
+        total_size = len(data)
+        decompressor = zlib.decompressobj(GZIP_WBITS) if data[: len(GZIP_MAGIC)] == GZIP_MAGIC else None
+        for offset in range(0, total_size, chunk_size):
+            with data[offset : offset + chunk_size] as chunk:
+                if decompressor is None:
+                    parser.feed(chunk)
+                else:
+                    decompressor = _feed_decompressed(parser, decompressor, chunk)
+            if progress is not None:
+                progress(min(offset + chunk_size, total_size), total_size)
+    return ElementTree(parser.close())
+
+
+def parse_svg(source: Path | BinaryIO, progress: Optional[ProgressCallback] = None) -> ElementTree:
+    """
+    Parse a plain (.svg) or gzip compressed (.svgz) SVG file into an ElementTree. The compressed file is
+    decompressed while parsing, it is never held in memory as a whole. Regular files are memory-mapped and
+    parsed with parse_svg_buffer().
+
+    Parameters
+    ----------
+    source: Path | BinaryIO
+        Path of the file or binary file object to parse.
+    progress: Optional[ProgressCallback]
+        Called while parsing a memory-mapped file, see parse_svg_buffer(). Not called for file objects and
+        files that can't be memory-mapped (e.g. empty files or pipes).
+
+    Returns
+    -------
+    ElementTree
+        Parsed element tree.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as file_object:
+            try:
+                mapped_file = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return ET.parse(_decompressing_reader(file_object))
+            with mapped_file:
+                return parse_svg_buffer(mapped_file, progress)
+    return ET.parse(_decompressing_reader(source))
+
+
+def _shallow_copy_element(element: Element) -> Element:
+    element_copy = element.makeelement(element.tag, element.attrib.copy())
+    element_copy.text = element.text
+    element_copy.tail = element.tail
+    element_copy.extend(element)
+    return element_copy
+
+
+def _get_ancestor_layer_paths(layer_path: str) -> Iterator[str]:
+    while layer_path != "/":
+        layer_path = layer_path.rsplit("/", 1)[0] or "/"
+        yield layer_path
+
+
 class HirarchicalElement:
-    def __init__(self, level: int):
+    __slots__ = ("level", "parent")
+
+    def __init__(self, level: int, parent: Optional["HirarchicalElement"] = None):
         self.level = level
+        self.parent = parent
+
+    def _get_element(self) -> Element:
+        raise NotImplementedError
+
+    def _set_element(self, element: Element) -> None:
+        raise NotImplementedError
+
+    def _make_writable(self) -> Element:
+        """
+        Get the element for modification. When the element is shared with a forked image, it is replaced by a copy
+        first (copy-on-write). Its ancestors are copied as well, so the modification stays local to this image.
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        if getattr(root, "_frozen", False):
+            raise ImageFrozenError()
+        computed_styles = getattr(root, "_computed_styles", None)
+        if computed_styles is not None:
+            computed_styles.invalidate(self)
+        owned_elements = getattr(root, "_owned_elements", None)
+        return self.__make_writable(owned_elements) if owned_elements is not None else self._get_element()
+
+    def __make_writable(self, owned_elements: Set[Element]) -> Element:
+        element = self._get_element()
+        if element in owned_elements or self.parent is None:
+            return element
+
+        parent_element = self.parent.__make_writable(owned_elements)
+        element_copy = _shallow_copy_element(element)
+        parent_element[list(parent_element).index(element)] = element_copy
+        owned_elements.add(element_copy)
+        self._set_element(element_copy)
+        return element_copy
+
+    def get_computed_style(self) -> Dict[str, str]:
+        """
+        Get the effective style of the element: its style attribute, its presentation attributes (e.g. fill="...")
+        and the properties inherited from its ancestors. Cached by the image, see Image.computed_styles.
+
+        Returns
+        -------
+        Dict[str, str]
+            Effective properties by name. Don't modify the returned dict.
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        computed_styles = root.computed_styles if isinstance(root, Image) else ComputedStyles()
+        return computed_styles.get(self)
 
     def log_hirarchical(self, logm: logging.Logger, fmt: str, *args):
-        logm.debug(f"{'  '*self.level}{fmt}", *args)
+        if logm.isEnabledFor(logging.DEBUG):
+            logm.debug(f"{'  '*self.level}{fmt}", *args)
 
 
 class Object(HirarchicalElement):
@@ -37,55 +309,76 @@ class Object(HirarchicalElement):
         tag name of XML element.
     id: str
         Inkscape id of the object.
-    objects: OrderedDict[str, Object]
-        An ordered dict with all the sub objects by their id
+    objects: Dict[str, Object]
+        An insertion ordered dict with all the sub objects by their id
 
     """
 
+    __slots__ = ("object_element", "tag", "id", "objects")
+
     logm = logging.getLogger(f"{__name__}.obj")
 
-    def __init__(self, object_element: Element, level=0) -> None:
+    def __init__(self, object_element: Element, level=0, parent: Optional[HirarchicalElement] = None) -> None:
         """
         Parameters
         ----------
         object_element: Element
            ElementTree Element that represents the object.
+        parent: Optional[HirarchicalElement]
+            Wrapper of the parent element.
         """
-        super().__init__(level)
+        super().__init__(level, parent)
         self.object_element = object_element
 
         self.tag: str = object_element.tag
         self.id: str = object_element.attrib["id"]
-        self.objects: OrderedDict[str, Object] = self.__parse_objects()
+        self.objects: Dict[str, Object] = self.__parse_objects()
 
     def __str__(self) -> str:
         return f"Object: tag={self.tag}, id={self.id}"
 
-    def __parse_objects(self) -> OrderedDict[str, "Object"]:
-        object_dict: OrderedDict[str, Object] = OrderedDict()
+    def _get_element(self) -> Element:
+        return self.object_element
+
+    def _set_element(self, element: Element) -> None:
+        self.object_element = element
+
+    def __parse_objects(self) -> Dict[str, "Object"]:
+        object_dict: Dict[str, Object] = {}
 
         self.log_hirarchical(self.logm, 'Parse object "%s" for sub-objects', self.id)
         for element in self.object_element:
             if "id" in element.attrib:
                 self.log_hirarchical(self.logm, '- Found object: tag="%s", id="%s"', element.tag, element.attrib["id"])
-                object = Object(element, self.level + 1)
+                object = Object(element, self.level + 1, self)
                 object_dict[object.id] = object
 
         if len(object_dict) == 0:
             self.log_hirarchical(self.logm, "- None")
+            return _EMPTY_CHILDREN
 
         return object_dict
 
     def _set_style_attribute(self, key: str, value: str | float | int, force=False):
-        if "style" in self.object_element.attrib:
-            style = self.object_element.attrib["style"]
-            style_dict = OrderedDict(item.split(":") for item in style.split(";"))
-            if force:
-                style_dict[key] = str(value)
-            else:
-                if key in style_dict and style_dict[key] != "none":
-                    style_dict[key] = str(value)
-            self.object_element.attrib["style"] = ";".join([f"{key}:{value}" for key, value in style_dict.items()])
+        style = self.object_element.get("style")
+        style_dict = parse_style(style) if style else {}
+        new_value = str(value)
+        if key in style_dict:
+            if style_dict[key] != new_value and (force or style_dict[key] != "none"):
+                style_dict[key] = new_value
+                self._make_writable().attrib["style"] = format_style(style_dict)
+            return
+
+        # The property is also changed where it is effectively set as presentation attribute or inherited from an
+        # ancestor (e.g. a group with style="fill:#ff0000"). Without force, unset properties and "none" are kept.
+        current_value = self.get_computed_style().get(key)
+        if current_value == new_value or (not force and (current_value is None or current_value == "none")):
+            return
+        if key in self.object_element.attrib:
+            self._make_writable().attrib[key] = new_value
+        elif current_value is not None or style is not None:
+            style_dict[key] = new_value
+            self._make_writable().attrib["style"] = format_style(style_dict)
 
     def set_fill_color(self, color: str, force=False) -> None:
         """
@@ -99,11 +392,12 @@ class Object(HirarchicalElement):
             Force to colorize even if not colorized at the moment.
         """
         self.logm.debug("Set fill color: object-id=%s, color=%s, force=%s", self.id, color, force)
+        # Set first, so sub-objects inheriting the fill already have the new color
+        self._set_style_attribute("fill", color, force)
+
         for object in self.objects.values():
             object.set_fill_color(color, force)
 
-        self._set_style_attribute("fill", color, force)
-
     def set_stroke_paint_color(self, color: str, force=False) -> None:
         """
         Set the stroke paint color of an object to the given value.
@@ -116,11 +410,11 @@ class Object(HirarchicalElement):
             Force to colorize even if not colorized at the moment.
         """
         self.logm.debug("Set stroke paint color: object-id=%s, color=%s, force=%s", self.id, color, force)
+        self._set_style_attribute("stroke", color, force)
+
         for object in self.objects.values():
             object.set_stroke_paint_color(color, force)
 
-        self._set_style_attribute("stroke", color, force)
-
     def set_fill_opacity(self, opacity: float, force=False) -> None:
         """
         Set the fill opacity of an object to the given value.
@@ -165,57 +459,69 @@ class Group(HirarchicalElement):
         ElementTree Element that represents the group.
     id: str
         Inkscape id of the group.
-    objects: OrderedDict[str, Object]
+    objects: Dict[str, Object]
         Holds objects within the group by their id.
-    groups: OrderedDict[str, Group]
+    groups: Dict[str, Group]
         Holds groups within the group by their id (e.g. nested groups or groups within layers).
 
     """
 
+    __slots__ = ("group_element", "id", "objects", "groups")
+
     logm = logging.getLogger(f"{__name__}.grp")
 
-    def __init__(self, group_element: Element, level=0):
+    def __init__(self, group_element: Element, level=0, parent: Optional[HirarchicalElement] = None):
         """
         Parameters
         ----------
         group_element: Element
            ElementTree Element that represents the group.
+        parent: Optional[HirarchicalElement]
+            Wrapper of the parent element.
         """
-        super().__init__(level)
+        super().__init__(level, parent)
         self.group_element: Element = group_element
 
         self.id = group_element.attrib["id"]
-        self.objects: OrderedDict[str, Object] = self.__parse_objects()
-        self.groups: OrderedDict[str, Group] = self.__parse_groups()
+        self.objects: Dict[str, Object] = self.__parse_objects()
+        self.groups: Dict[str, Group] = self.__parse_groups()
+
+    def _get_element(self) -> Element:
+        return self.group_element
+
+    def _set_element(self, element: Element) -> None:
+        self.group_element = element
 
-    def __parse_objects(self) -> OrderedDict[str, Object]:
-        object_dict: OrderedDict[str, Object] = OrderedDict()
+    def __parse_objects(self) -> Dict[str, Object]:
+        object_dict: Dict[str, Object] = {}
 
         self.log_hirarchical(self.logm, 'Parse group "%s" for sub-objects:', self.id)
         for element in self.group_element:
             if not element.tag == "{http://www.w3.org/2000/svg}g" and "id" in element.attrib:
                 self.log_hirarchical(self.logm, '- Found object: tag="%s", id="%s"', element.tag, element.attrib["id"])
-                object = Object(element, self.level + 1)
+                object = Object(element, self.level + 1, self)
                 object_dict[object.id] = object
 
         if len(object_dict) == 0:
             self.log_hirarchical(self.logm, "- None")
+            return _EMPTY_CHILDREN
 
         return object_dict
 
-    def __parse_groups(self) -> OrderedDict[str, "Group"]:
-        group_dict: OrderedDict[str, "Group"] = OrderedDict()
+    def __parse_groups(self) -> Dict[str, "Group"]:
+        group_dict: Dict[str, "Group"] = {}
 
         self.log_hirarchical(self.logm, 'Parse group "%s" for sub-groups:', self.id)
         for group_element in self.group_element.findall("{http://www.w3.org/2000/svg}g"):
             groupmode = group_element.get("{http://www.inkscape.org/namespaces/inkscape}groupmode")
             if not groupmode or groupmode != "layer" and "id" in group_element.attrib:
                 self.log_hirarchical(self.logm, '- Found group: id="%s"', group_element.attrib["id"])
-                group = Group(group_element, self.level + 1)
+                group = Group(group_element, self.level + 1, self)
                 group_dict[group.id] = group
 
         if len(group_dict) == 0:
             self.log_hirarchical(self.logm, "- None")
+            return _EMPTY_CHILDREN
 
         return group_dict
 
@@ -287,6 +593,36 @@ class Group(HirarchicalElement):
         for object in self.objects.values():
             object.set_stroke_opacity(opacity, force)
 
+    def find_objects_by_style(self, key: str, value: Optional[str] = None) -> List[Object]:
+        """
+        Find all objects within the group (including nested groups and sub-objects) by their effective style, see
+        get_computed_style().
+
+        Parameters
+        ----------
+        key: str
+            Name of the property, e.g. "fill".
+        value: Optional[str]
+            Value of the property, e.g. "#ff0000". If not provided, all objects with the property set are found.
+
+        Returns
+        -------
+        List[Object]
+            List containing all objects with the given property value.
+        """
+        objects: List[Object] = []
+        for group in self.groups.values():
+            objects.extend(group.find_objects_by_style(key, value))
+
+        stack = list(reversed(self.objects.values()))
+        while stack:
+            object = stack.pop()
+            object_value = object.get_computed_style().get(key)
+            if object_value is not None and (value is None or object_value == value):
+                objects.append(object)
+            stack.extend(reversed(object.objects.values()))
+        return objects
+
 
 class Layer(Group):
     """
@@ -302,14 +638,16 @@ class Layer(Group):
     layer_path: str
         POSIX style path of the layer. This kind of path is not used by inkscape itself but introduced by this library
         to make identification and access of layers within complex multilayer images simple and convenient.
-    layers: OrderedDict[str, Layer]
+    layers: Dict[str, Layer]
         Holds sublayers of this layer by their name.
 
     """
 
+    __slots__ = ("layer_element", "layer_name", "layer_path", "layers")
+
     logm = logging.getLogger(f"{__name__}.lay")
 
-    def __init__(self, layer_element: Element, parent_layer_path: Optional[str], level=0):
+    def __init__(self, layer_element: Element, parent_layer_path: Optional[str], level=0, parent: Optional[HirarchicalElement] = None):
         """
         Parameters
         ----------
@@ -318,8 +656,10 @@ class Layer(Group):
         parent_layer_path: Optional[str]
             Path of the parent layer to build up the path of this layer. If not provided, the layer is treated as the
             root layer, which results in a layer path equal to '/'.
+        parent: Optional[HirarchicalElement]
+            Wrapper of the parent element.
         """
-        super().__init__(layer_element, level)
+        super().__init__(layer_element, level, parent)
         self.layer_element: Element = layer_element
         if parent_layer_path:
             self.layer_name = layer_element.attrib["{http://www.inkscape.org/namespaces/inkscape}label"]
@@ -327,13 +667,17 @@ class Layer(Group):
         else:
             self.layer_name = "/"
             self.layer_path = "/"
-        self.layers: OrderedDict[str, Layer] = self.__parse_layers()
+        self.layers: Dict[str, Layer] = self.__parse_layers()
 
     def __str__(self):
         return f"Layer: name={self.layer_name}"
 
-    def __parse_layers(self) -> OrderedDict[str, "Layer"]:
-        layer_dict: OrderedDict[str, Layer] = OrderedDict()
+    def _set_element(self, element: Element) -> None:
+        self.group_element = element
+        self.layer_element = element
+
+    def __parse_layers(self) -> Dict[str, "Layer"]:
+        layer_dict: Dict[str, Layer] = {}
 
         self.log_hirarchical(self.logm, 'Parse layer "%s" for sub-layers:', self.layer_path)
         for group_element in self.layer_element.findall("{http://www.w3.org/2000/svg}g"):
@@ -345,11 +689,12 @@ class Layer(Group):
                     group_element.attrib["{http://www.inkscape.org/namespaces/inkscape}label"],
                     group_element.attrib["id"],
                 )
-                layer = Layer(group_element, self.layer_path, self.level + 1)
+                layer = Layer(group_element, self.layer_path, self.level + 1, self)
                 layer_dict[layer.layer_name] = layer
 
         if len(layer_dict) == 0:
             self.log_hirarchical(self.logm, "- None")
+            return _EMPTY_CHILDREN
 
         return layer_dict
 
@@ -379,6 +724,22 @@ class Layer(Group):
 
         return layers
 
+    def select_layers(self, selector: Selector) -> List["Layer"]:
+        """
+        Select layers of this layer's subtree (including the layer itself) with a selector, see LayerSelector.
+
+        Parameters
+        ----------
+        selector: Selector
+            Selector term (e.g. "/face/**"), list of terms or compiled LayerSelector.
+
+        Returns
+        -------
+        List[Layer]
+            Selected layers in the same order as get_all_layer_paths().
+        """
+        return LayerSelector.compile(selector).select(self)
+
     def get_layer_by_path(self, path: str) -> "Layer":
         """
         Get a layer by its path.
@@ -430,10 +791,13 @@ class Layer(Group):
         Remove all sub layers from layer.
         """
         self.logm.debug("Remove all sub-layers of layer: %s", self.layer_path)
+        if len(self.layers) == 0:
+            return
+        layer_element = self._make_writable()
         for layer in self.layers.values():
             self.logm.debug(" - Remove layer: %s", layer.layer_name)
-            self.layer_element.remove(layer.layer_element)
-        self.layers.clear()
+            layer_element.remove(layer.layer_element)
+        self.layers = _EMPTY_CHILDREN
 
     def remove_all_objects_and_groups(self) -> None:
         """
@@ -443,15 +807,17 @@ class Layer(Group):
 
         if len(self.objects) == 0 and len(self.groups) == 0:
             self.logm.debug(" - None")
+            return
 
+        layer_element = self._make_writable()
         for object in self.objects.values():
             self.logm.debug(" - Removing object: %s", object.id)
-            self.layer_element.remove(object.object_element)
+            layer_element.remove(object.object_element)
         for group in self.groups.values():
             self.logm.debug(" - Removing group: %s", group.id)
-            self.layer_element.remove(group.group_element)
-        self.objects.clear()
-        self.groups.clear()
+            layer_element.remove(group.group_element)
+        self.objects = _EMPTY_CHILDREN
+        self.groups = _EMPTY_CHILDREN
 
     def remove_layers_if_path_not_matching(self, whitelist_paths: List[str], _recursive_call=False) -> None:
         """
@@ -481,14 +847,14 @@ class Layer(Group):
             layer.remove_layers_if_path_not_matching(whitelist_paths, _recursive_call=True)
 
         for layer_to_remove in layers_to_remove:
-            self.layer_element.remove(layer_to_remove.layer_element)
+            self._make_writable().remove(layer_to_remove.layer_element)
             del self.layers[layer_to_remove.layer_name]
 
         if self.layer_path != "/" and self.layer_path not in whitelist_paths:
             self.logm.debug("Remove layer: %s", self.layer_path)
             self.remove_all_objects_and_groups()
 
-    def fill_all_objects(self, color: str, force=False, recursive=False, _recursive_call=False) -> None:
+    def fill_all_objects(self, color: str, force=False, recursive=False, select: Optional[Selector] = None, _recursive_call=False) -> None:
         """
         Set the fill color of all objects and groups within the group to the given value.
         If recursive is activated, all objects on sublayers will be filled as well.
@@ -501,8 +867,15 @@ class Layer(Group):
             Force to colorize even if not colorized at the moment
         recursive: bool
             Flag to enable recursive coloring.
+        select: Optional[Selector]
+            Fill the objects of the layers selected within this layer's subtree (see select_layers()) instead of
+            the objects of this layer.
 
         """
+        if select is not None:
+            for layer in self.select_layers(select):
+                layer.fill_all_objects(color, force=force, recursive=recursive)
+            return
         if not _recursive_call:
             self.logm.debug('Fill all objects: layer="%s", color="%s", force=%s, recursive=%s', self.layer_path, color, force, recursive)
 
@@ -512,7 +885,7 @@ class Layer(Group):
             for layer in self.layers.values():
                 layer.fill_all_objects(color, force=force, recursive=recursive, _recursive_call=True)
 
-    def stroke_paint_all_objects(self, color: str, force=False, recursive=False, _recursive_call=False) -> None:
+    def stroke_paint_all_objects(self, color: str, force=False, recursive=False, select: Optional[Selector] = None, _recursive_call=False) -> None:
         """
         Set the stroke paint color of all objects and groups within the group to the given value.
         If recursive is activated, all objects on sublayers will be stroke painted as well.
@@ -525,8 +898,15 @@ class Layer(Group):
             Force to colorize even if not colorized at the moment
         recursive: bool
             Flag to enable recursive coloring.
+        select: Optional[Selector]
+            Stroke paint the objects of the layers selected within this layer's subtree (see select_layers())
+            instead of the objects of this layer.
 
         """
+        if select is not None:
+            for layer in self.select_layers(select):
+                layer.stroke_paint_all_objects(color, force=force, recursive=recursive)
+            return
         if not _recursive_call:
             self.logm.debug('Stroke paint all objects: layer="%s", color="%s", force=%s, recursive=%s', self.layer_path, color, force, recursive)
         super().stroke_paint_all_objects(color, force=force)
@@ -535,6 +915,75 @@ class Layer(Group):
             for layer in self.layers.values():
                 layer.stroke_paint_all_objects(color, force=force, recursive=recursive, _recursive_call=True)
 
+    def find_objects_by_style(self, key: str, value: Optional[str] = None, recursive=False) -> List[Object]:
+        """
+        Find all objects within the layer by their effective style, see Group.find_objects_by_style().
+        If recursive is activated, the objects on sublayers are found as well.
+        """
+        objects = super().find_objects_by_style(key, value)
+        if recursive:
+            for layer in self.layers.values():
+                objects.extend(layer.find_objects_by_style(key, value, recursive=True))
+        return objects
+
+    def create_color_index(self) -> "ColorIndex":
+        """
+        Create an index of all colors used within the layer and its sublayers, see ColorIndex. Keep the index to
+        apply several palette swaps without walking the layer tree again.
+
+        Returns
+        -------
+        ColorIndex
+            Uses of all fill, stroke, stop-color and flood-color values, by color.
+        """
+        from inkscape_layer_utils.palette import ColorIndex
+
+        self.logm.debug('Create color index: layer="%s"', self.layer_path)
+        return ColorIndex(self)
+
+    def swap_colors(self, palette: Dict[str, str]) -> int:
+        """
+        Replace colors within the layer and its sublayers, e.g. {"#ff0000": "#00aa00", "#333": "#111"}. Unlike
+        fill_all_objects(), every use of a color is replaced: fill, stroke, stop-color and flood-color, in style
+        attributes and presentation attributes, including gradient stops. All colors are swapped at once.
+
+        Parameters
+        ----------
+        palette: Dict[str, str]
+            New colors by current colors.
+
+        Returns
+        -------
+        int
+            Number of replaced color uses.
+        """
+        return self.create_color_index().apply(palette)
+
+    def transform_colors(self, hue_shift=0.0, saturation=0.0, lightness=0.0) -> int:
+        """
+        Transform all hex RGB colors within the layer and its sublayers in HSL color space, e.g. rotate the hue by
+        30° (hue_shift=30), darken by 10% (lightness=-0.1) or convert to grayscale (saturation=-1). Like
+        swap_colors(), every use of a color is changed. Each distinct color is transformed only once, with NumPy
+        if it is installed.
+
+        Parameters
+        ----------
+        hue_shift: float
+            Hue rotation in degrees.
+        saturation: float
+            Saturation change from -1.0 to 1.0.
+        lightness: float
+            Lightness change from -1.0 to 1.0.
+
+        Returns
+        -------
+        int
+            Number of changed color uses.
+        """
+        from inkscape_layer_utils.palette import ColorTransform
+
+        return self.create_color_index().transform(ColorTransform(hue_shift, saturation, lightness))
+
     def set_visibility(self, visibility: bool, recursive=False, _recursive_call=False) -> None:
         """
         Set the visibility of a specific layer and its children (when recursive flag is set)
@@ -556,11 +1005,10 @@ class Layer(Group):
 
         if "style" in self.layer_element.attrib:
             self.logm.debug('"style" attribute detected. Preserving other style parameters.')
-            style = self.layer_element.attrib["style"]
-            style_dict = OrderedDict(item.split(":") for item in style.split(";"))
+            style_dict = parse_style(self.layer_element.attrib["style"])
 
             style_dict["display"] = "inline" if visibility else "none"
-            self.layer_element.attrib["style"] = ";".join([f"{key}:{value}" for key, value in style_dict.items()])
+            self._make_writable().attrib["style"] = format_style(style_dict)
 
 
 class Image(Layer):
@@ -574,17 +1022,21 @@ class Image(Layer):
 
     """
 
+    __slots__ = ("element_tree", "_owned_elements", "_frozen", "_computed_styles")
+
     logm = logging.getLogger(f"{__name__}.img")
 
     @classmethod
-    def load_from_file(cls, file_path: Path) -> "Image":
+    def load_from_file(cls, file_path: Path, progress: Optional[ProgressCallback] = None) -> "Image":
         """
-        Load a SVG image from file.
+        Load a SVG image from file. The file is memory-mapped and parsed in chunks, see parse_svg().
 
         Parameters
         ----------
         file_path: Path
             Path of file to load.
+        progress: Optional[ProgressCallback]
+            Called while parsing with the number of bytes parsed so far and the file size.
 
         Returns
         -------
@@ -593,7 +1045,71 @@ class Image(Layer):
 
         """
         cls.logm.debug("Load image from file: %s", file_path)
-        return Image(ET.parse(file_path))
+        return Image(parse_svg(file_path, progress))
+
+    @classmethod
+    async def aload(cls, file_path: Path, progress: Optional[ProgressCallback] = None, executor: Optional["Executor"] = None) -> "Image":
+        """
+        Async counterpart of load_from_file(). The file is read and parsed in the executor (see
+        set_async_executor()), the event loop is not blocked meanwhile.
+
+        Parameters
+        ----------
+        file_path: Path
+            Path of file to load.
+        progress: Optional[ProgressCallback]
+            Called while parsing, from the executor's thread.
+        executor: Optional["Executor"]
+            Executor to use instead of the one set with set_async_executor().
+
+        Returns
+        -------
+        Image
+            Loaded image.
+
+        """
+        return await _run_in_executor(executor, cls.load_from_file, file_path, progress)
+
+    @classmethod
+    def load_from_file_object(cls, file_object: BinaryIO) -> "Image":
+        """
+        Load a SVG image from a binary file object (e.g. sys.stdin.buffer).
+
+        Parameters
+        ----------
+        file_object: BinaryIO
+            File object to read the image from.
+
+        Returns
+        -------
+        Image
+            Loaded image.
+
+        """
+        cls.logm.debug("Load image from file object")
+        return Image(parse_svg(file_object))
+
+    @classmethod
+    def load_from_bytes(cls, buffer: Any, progress: Optional[ProgressCallback] = None) -> "Image":
+        """
+        Load a SVG image from an object supporting the buffer protocol (bytes, bytearray, memoryview, mmap, ...)
+        without copying it. Gzip compressed data (.svgz) is decompressed while parsing.
+
+        Parameters
+        ----------
+        buffer: Any
+            Buffer containing the image.
+        progress: Optional[ProgressCallback]
+            Called while parsing with the number of bytes parsed so far and the buffer size.
+
+        Returns
+        -------
+        Image
+            Loaded image.
+
+        """
+        cls.logm.debug("Load image from buffer")
+        return Image(parse_svg_buffer(buffer, progress))
 
     @classmethod
     def load_from_string(cls, image_as_string: str) -> "Image":
@@ -614,6 +1130,63 @@ class Image(Layer):
         cls.logm.debug("Load image from string")
         return Image(ElementTree(ET.fromstring(image_as_string)))
 
+    @classmethod
+    def scan_layer_paths(cls, file_path: Path | BinaryIO) -> List[str]:
+        """
+        Get all layer paths of a SVG file (same as load_from_file(file_path).get_all_layer_paths()) with a
+        single streaming pass over the file. Only the layer skeleton is kept, neither the element tree nor
+        the wrapper tree is built.
+
+        Parameters
+        ----------
+        file_path: Path | BinaryIO
+            Path of file or binary file object to scan.
+
+        Returns
+        -------
+        List[str]
+            List of all the layer paths.
+        """
+        cls.logm.debug("Scan layer paths of file: %s", file_path)
+        # Sublayers by name, per layer. Like Layer.layers, a later layer with the same name replaces an earlier one.
+        root_sublayers: Dict[str, Any] = {}
+        stack: List[Optional[Dict[str, Any]]] = []
+        file_context: ContextManager[BinaryIO]
+        if isinstance(file_path, (str, Path)):
+            file_context = open(file_path, "rb")
+        else:
+            file_context = nullcontext(file_path)
+        with file_context as file_object:
+            for event, element in ET.iterparse(_decompressing_reader(file_object), events=("start", "end")):
+                if event == "end":
+                    stack.pop()
+                    element.clear()
+                elif not stack:
+                    stack.append(root_sublayers)
+                else:
+                    parent_sublayers = stack[-1]
+                    if (
+                        parent_sublayers is not None
+                        and element.tag == "{http://www.w3.org/2000/svg}g"
+                        and element.get("{http://www.inkscape.org/namespaces/inkscape}groupmode") == "layer"
+                    ):
+                        sublayers: Dict[str, Any] = {}
+                        parent_sublayers[element.attrib["{http://www.inkscape.org/namespaces/inkscape}label"]] = sublayers
+                        stack.append(sublayers)
+                    else:
+                        stack.append(None)
+
+        layer_paths: List[str] = ["/"]
+
+        def add_layer_paths(sublayers: Dict[str, Any], parent_layer_path: str) -> None:
+            for layer_name, sub_sublayers in sublayers.items():
+                layer_path = f"{parent_layer_path}/{layer_name}"
+                layer_paths.append(layer_path)
+                add_layer_paths(sub_sublayers, layer_path)
+
+        add_layer_paths(root_sublayers, "")
+        return layer_paths
+
     def __init__(self, element_tree: ElementTree) -> None:
         """
         Parameters
@@ -623,6 +1196,86 @@ class Image(Layer):
         """
         super().__init__(element_tree.getroot(), None)
         self.element_tree: ElementTree = element_tree
+        # Elements this image may modify in place. None as long as the image shares no elements with a fork.
+        self._owned_elements: Optional[Set[Element]] = None
+        self._frozen = False
+        self._computed_styles: Optional[ComputedStyles] = None
+
+    @property
+    def computed_styles(self) -> ComputedStyles:
+        """
+        Cache of the computed styles of the image's layers, groups and objects, see get_computed_style().
+        Created on first use.
+        """
+        if self._computed_styles is None:
+            self._computed_styles = ComputedStyles()
+        return self._computed_styles
+
+    @property
+    def frozen(self) -> bool:
+        """
+        True if the image is read-only, see freeze().
+        """
+        return self._frozen
+
+    def freeze(self) -> "Image":
+        """
+        Make the image read-only. Every method modifying the image (or one of its layers, groups and objects)
+        raises an ImageFrozenError from then on, a frozen image can't be unfrozen. Use fork() to get a
+        modifiable copy.
+
+        A frozen image can be shared by several threads without locking: all query methods (get_layer_by_path(),
+        get_all_layer_paths(), find_layers_by_name(), get_layer_digests(), create_index(), ...), extract_layer(),
+        extract_layers(), fork() and the save and extract-to-file methods only read the image's elements. The
+        images they return are independent copy-on-write forks owned by the calling thread. This also holds on
+        free-threaded Python builds. get_computed_style() and find_objects_by_style() fill the shared style
+        cache, concurrent calls at worst compute a style twice.
+
+        Returns
+        -------
+        Image
+            The image itself.
+        """
+        self.logm.debug("Freeze image")
+        self._frozen = True
+        return self
+
+    def fork(self) -> "Image":
+        """
+        Create a copy-on-write copy of the image. The fork shares all elements with this image, an element (and
+        the path of its ancestors) is only copied when it is modified by either of the images.
+        This makes deriving many variants of a large image considerably cheaper than copy.deepcopy().
+
+        Returns
+        -------
+        Image
+            Forked image.
+        """
+        self.logm.debug("Fork image")
+        root_element = self.element_tree.getroot()
+        forked_root_element = _shallow_copy_element(root_element)
+
+        # A frozen image never modifies its elements, so it doesn't need to track (and write) their ownership
+        if not self._frozen:
+            self._owned_elements = {root_element}
+        forked_image = Image(ElementTree(forked_root_element))
+        forked_image._owned_elements = {forked_root_element}
+        return forked_image
+
+    def create_index(self) -> "DocumentIndex":
+        """
+        Create a compact, array-backed index of the image's current element tree.
+        The index is a snapshot and does not reflect modifications made to the image afterwards.
+
+        Returns
+        -------
+        DocumentIndex
+            Index over all elements of the image in document order.
+        """
+        from inkscape_layer_utils.index import DocumentIndex
+
+        self.logm.debug("Create document index")
+        return DocumentIndex(self.element_tree.getroot(), self)
 
     def extract_layer(self, path: str, preserve_layer_paths=True) -> "Image":
         """
@@ -643,21 +1296,22 @@ class Image(Layer):
         """
         self.logm.debug('Extract layer: path="%s", preserve_layer_path=%s', path, preserve_layer_paths)
         if path == "/":
-            return copy.deepcopy(self)
+            return self.fork()
         else:
             return self.extract_layers([path], preserve_layer_paths)
 
-    def extract_layers(self, paths: List[str], preserve_layer_paths=True) -> "Image":
+    def extract_layers(self, paths: List[str] | LayerSelector, preserve_layer_paths=True) -> "Image":
         """
         Extract one or multiple layers.
 
         Parameters
         ----------
-        paths: List[str]
-            List of layer paths to extract.
+        paths: List[str] | LayerSelector
+            List of layer paths to extract, or a compiled selector selecting them (see LayerSelector).
         preserve_layer_paths: bool=True
             When True, the complete layer path will be preserved in the output file.
-            When False, the extracted layer will be a direct child of the root layer in the output file.
+            When False, the extracted layer will be a direct child of the root layer in the output file. Layers
+            selected by a selector are only extracted with their selected ancestors, not on their own.
 
         Returns
         -------
@@ -665,24 +1319,55 @@ class Image(Layer):
             Output image that will contain only the requested layers.
 
         """
+        if isinstance(paths, LayerSelector):
+            paths = [layer.layer_path for layer in paths.select(self)]
+            if not preserve_layer_paths:
+                # Sublayers are contained in their extracted ancestors, extracting them again would duplicate them
+                selected_paths = set(paths)
+                paths = [path for path in paths if selected_paths.isdisjoint(_get_ancestor_layer_paths(path))]
         self.logm.debug('Extract layers: paths="%s", preserve_layer_path=%s', paths, preserve_layer_paths)
 
-        new_image = copy.deepcopy(self)
+        new_image = self.fork()
 
         if preserve_layer_paths:
             new_image.remove_layers_if_path_not_matching(paths)
         else:
             layers_to_extract: List[Layer] = []
             for path in paths:
-                layers_to_extract.append(copy.deepcopy(new_image.get_layer_by_path(path)))
+                layer = new_image.get_layer_by_path(path)
+                parent_layer_path = path.rsplit("/", 1)[0] or "/"
+                layers_to_extract.append(Layer(layer.layer_element, parent_layer_path, 1, new_image))
 
             new_image.remove_all_layers()
+            new_image.layers = {}
 
             for layer_to_extract in layers_to_extract:
                 new_image.layers[layer_to_extract.layer_name] = layer_to_extract
                 new_image.layer_element.append(layer_to_extract.layer_element)
         return new_image
 
+    async def aextract_layers(self, paths: List[str], preserve_layer_paths=True, executor: Optional["Executor"] = None) -> "Image":
+        """
+        Async counterpart of extract_layers(), run in the executor (see set_async_executor()).
+
+        Parameters
+        ----------
+        paths: List[str]
+            List of layer paths to extract.
+        preserve_layer_paths: bool=True
+            When True, the complete layer path will be preserved in the output file.
+            When False, the extracted layer will be a direct child of the root layer in the output file.
+        executor: Optional["Executor"]
+            Executor to use instead of the one set with set_async_executor().
+
+        Returns
+        -------
+        Image
+            Output image that will contain only the requested layers.
+
+        """
+        return await _run_in_executor(executor, self.extract_layers, paths, preserve_layer_paths)
+
     def extract_all_layers(self) -> dict[str, "Image"]:
         """
         Extract all layers of the image.
@@ -697,7 +1382,138 @@ class Image(Layer):
         layer_path_list = self.get_all_layer_paths()
         return dict((layer_path, self.extract_layer(layer_path)) for layer_path in layer_path_list)
 
-    def extract_all_layers_to_file(self, output_dir: Path, base_name: str) -> Dict[str, Path]:
+    @staticmethod
+    def get_layer_file_name(base_name: str, layer_path: str, compressed=False) -> str:
+        """
+        Get the name of the output file of an extracted layer, e.g. "base_name_face_eyes.svg" for "/face/eyes".
+
+        Parameters
+        ----------
+        base_name: str
+            Base name of the output files.
+        layer_path: str
+            Path of the layer.
+        compressed: bool
+            Use the extension of compressed files (.svgz) instead of .svg.
+
+        Returns
+        -------
+        str
+            File name of the extracted layer.
+        """
+        extension = "svgz" if compressed else "svg"
+        if layer_path == "/":
+            return f"{base_name}.{extension}"
+        return f'{base_name}{layer_path.replace("/", "_")}.{extension}'
+
+    def get_layer_digests(self) -> Dict[str, str]:
+        """
+        Calculate a digest per layer that changes whenever the content of the layer's extracted image
+        (see extract_layer()) changes. This allows detecting changed layers without extracting them.
+
+        Returns
+        -------
+        Dict[str, str]
+            Hex digests by layer paths.
+        """
+        import hashlib
+
+        self.logm.debug("Calculate layer digests")
+        digests: Dict[str, str] = {}
+
+        def element_attributes(element: Element) -> bytes:
+            return repr((element.tag, sorted(element.attrib.items()), element.text)).encode()
+
+        def own_content(layer: Layer) -> "hashlib._Hash":
+            sublayer_elements = [sublayer.layer_element for sublayer in layer.layers.values()]
+            content = hashlib.sha256()
+            for element in layer.layer_element:
+                if not any(element is sublayer_element for sublayer_element in sublayer_elements):
+                    content.update(ET.tostring(element))
+            return content
+
+        def add_sublayer_digests(layer: Layer, chain_digest: bytes) -> None:
+            for sublayer in layer.layers.values():
+                sublayer_chain_digest = hashlib.sha256(chain_digest + element_attributes(sublayer.layer_element)).digest()
+                content = own_content(sublayer)
+                content.update(sublayer_chain_digest)
+                digests[sublayer.layer_path] = content.hexdigest()
+                add_sublayer_digests(sublayer, sublayer_chain_digest)
+
+        root_content = own_content(self)
+        root_content.update(element_attributes(self.layer_element))
+        root_chain_digest = root_content.digest()
+        add_sublayer_digests(self, root_chain_digest)
+
+        image_digest = hashlib.sha256(root_chain_digest)
+        for layer_path, digest in digests.items():
+            image_digest.update(f"{layer_path}:{digest}".encode())
+        return {"/": image_digest.hexdigest(), **digests}
+
+    def extract_layers_to_file(
+        self,
+        output_dir: Path,
+        base_name: str,
+        layer_paths: List[str],
+        compress=False,
+        compression_level=DEFAULT_COMPRESSION_LEVEL,
+        minify=False,
+        threads=1,
+    ) -> Dict[str, Path]:
+        """
+        Extract the given layers to one file per layer by providing an output directory and a base name for
+        the extracted layers output file names.
+
+        Parameters
+        ----------
+        output_dir: Path
+            Output directory to write files to.
+        base_name: str
+            Base name of the files that will be saved.
+        layer_paths: List[str]
+            Paths of the layers to extract.
+        compress: bool
+            Write gzip compressed files (.svgz).
+        compression_level: int
+            Compression level from 1 (fastest) to 9 (smallest).
+        minify: bool
+            Write minified files, see save().
+        threads: int
+            Number of threads extracting the layers. With more than one thread, the layers are extracted from a
+            frozen fork of the image (see freeze()), or from the image itself if it is already frozen.
+        Returns
+        -------
+        dict[str, Path]
+            Dictionary with file paths by layer paths.
+        """
+        extracted_layer_file_paths_by_layer_path = {
+            layer_path: Path(output_dir) / self.get_layer_file_name(base_name, layer_path, compress) for layer_path in layer_paths
+        }
+        if threads <= 1 or len(layer_paths) <= 1:
+            for layer_path, output_file_path in extracted_layer_file_paths_by_layer_path.items():
+                self._extract_layer_to_file(layer_path, output_file_path, compress, compression_level, minify)
+            return extracted_layer_file_paths_by_layer_path
+
+        shared_image = self if self._frozen else self.fork().freeze()
+        self.logm.debug("Extract %d layers with %d threads", len(layer_paths), threads)
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for _ in executor.map(
+                functools.partial(shared_image._extract_layer_to_file, compress=compress, compression_level=compression_level, minify=minify),
+                extracted_layer_file_paths_by_layer_path.keys(),
+                extracted_layer_file_paths_by_layer_path.values(),
+            ):
+                pass
+        return extracted_layer_file_paths_by_layer_path
+
+    def _extract_layer_to_file(self, layer_path: str, output_file_path: Path, compress: bool, compression_level: int, minify: bool) -> None:
+        self.logm.debug('Saving layer "%s" to file "%s"', layer_path, output_file_path)
+        self.extract_layer(layer_path).save(output_file_path, compress, compression_level, minify)
+
+    def extract_all_layers_to_file(
+        self, output_dir: Path, base_name: str, compress=False, compression_level=DEFAULT_COMPRESSION_LEVEL, minify=False, threads=1
+    ) -> Dict[str, Path]:
         """
         Extract all layers to file by providing an output directory and a base name for
         the extracted layers output file names.
@@ -708,24 +1524,191 @@ class Image(Layer):
             Output directory to write files to.
         base_name: str
             Base name of the files that will be saved.
+        compress: bool
+            Write gzip compressed files (.svgz).
+        compression_level: int
+            Compression level from 1 (fastest) to 9 (smallest).
+        minify: bool
+            Write minified files, see save().
+        threads: int
+            Number of threads extracting the layers, see extract_layers_to_file().
         Returns
         -------
         dict[str, Path]
             Dictionary with file paths by layer paths.
         """
         self.logm.debug("Extract all layers to file")
+        return self.extract_layers_to_file(output_dir, base_name, self.get_all_layer_paths(), compress, compression_level, minify, threads)
+
+    async def aextract_all_layers_to_file(
+        self,
+        output_dir: Path,
+        base_name: str,
+        compress=False,
+        compression_level=DEFAULT_COMPRESSION_LEVEL,
+        minify=False,
+        executor: Optional["Executor"] = None,
+    ) -> Dict[str, Path]:
+        """
+        Async counterpart of extract_all_layers_to_file(). Every layer is extracted and written as a separate
+        call in the executor (see set_async_executor()), so the layers' file I/O overlaps. The image must not be
+        modified until the extraction is finished.
+
+        Parameters
+        ----------
+        output_dir: Path
+            Output directory to write files to.
+        base_name: str
+            Base name of the files that will be saved.
+        compress: bool
+            Write gzip compressed files (.svgz).
+        compression_level: int
+            Compression level from 1 (fastest) to 9 (smallest).
+        minify: bool
+            Write minified files, see save().
+        executor: Optional["Executor"]
+            Executor to use instead of the one set with set_async_executor().
+        Returns
+        -------
+        dict[str, Path]
+            Dictionary with file paths by layer paths.
+        """
+        import asyncio
+
+        self.logm.debug("Extract all layers to file (async)")
+        extracted_layer_file_paths_by_layer_path = {
+            layer_path: Path(output_dir) / self.get_layer_file_name(base_name, layer_path, compress) for layer_path in self.get_all_layer_paths()
+        }
+        await asyncio.gather(
+            *(
+                _run_in_executor(executor, self._extract_layer_to_file, layer_path, output_file_path, compress, compression_level, minify)
+                for layer_path, output_file_path in extracted_layer_file_paths_by_layer_path.items()
+            )
+        )
+        return extracted_layer_file_paths_by_layer_path
+
+    def extract_layers_to_archive(self, archive: "LayerArchive", base_name: str, layer_paths: List[str], minify=False) -> Dict[str, str]:
+        """
+        Extract the given layers into an archive, one member per layer. The member names follow the same
+        naming scheme as the files written by extract_layers_to_file().
+
+        Parameters
+        ----------
+        archive: LayerArchive
+            Archive to write the extracted layers to.
+        base_name: str
+            Base name of the archive members.
+        layer_paths: List[str]
+            Paths of the layers to extract.
+        minify: bool
+            Write minified members, see save().
+        Returns
+        -------
+        dict[str, str]
+            Dictionary with member names by layer paths.
+        """
+        member_names_by_layer_path: Dict[str, str] = {}
+        for layer_path in layer_paths:
+            member_name = self.get_layer_file_name(base_name, layer_path)
+            self.logm.debug('Adding layer "%s" to archive as "%s"', layer_path, member_name)
+            archive.add_image(member_name, self.extract_layer(layer_path), minify)
+            member_names_by_layer_path[layer_path] = member_name
+        return member_names_by_layer_path
+
+    def extract_all_layers_to_archive(self, archive: "LayerArchive", base_name: str, minify=False) -> Dict[str, str]:
+        """
+        Extract all layers into an archive, see extract_layers_to_archive().
+
+        Parameters
+        ----------
+        archive: LayerArchive
+            Archive to write the extracted layers to.
+        base_name: str
+            Base name of the archive members.
+        minify: bool
+            Write minified members, see save().
+        Returns
+        -------
+        dict[str, str]
+            Dictionary with member names by layer paths.
+        """
+        self.logm.debug("Extract all layers to archive")
+        return self.extract_layers_to_archive(archive, base_name, self.get_all_layer_paths(), minify)
+
+    def extract_layers_to_store(
+        self,
+        store: "ContentStore",
+        output_dir: Path,
+        base_name: str,
+        layer_paths: List[str],
+        compress=False,
+        compression_level=DEFAULT_COMPRESSION_LEVEL,
+        minify=False,
+    ) -> Dict[str, Path]:
+        """
+        Extract the given layers like extract_layers_to_file(), but store every extracted layer file in a
+        content-addressed store and link it to its output location. Layers with identical content are only
+        written once.
+
+        Parameters
+        ----------
+        store: ContentStore
+            Store to write the extracted layers to.
+        output_dir: Path
+            Output directory of the links.
+        base_name: str
+            Base name of the links.
+        layer_paths: List[str]
+            Paths of the layers to extract.
+        compress: bool
+            Store gzip compressed files (.svgz).
+        compression_level: int
+            Compression level from 1 (fastest) to 9 (smallest).
+        minify: bool
+            Store minified files, see save().
+        Returns
+        -------
+        dict[str, Path]
+            Dictionary with file paths (of the links) by layer paths.
+        """
         extracted_layer_file_paths_by_layer_path: Dict[str, Path] = {}
-        extracted_images = self.extract_all_layers()
-        for layer_path, extracted_image in extracted_images.items():
-            if layer_path == "/":
-                output_file_path = Path(output_dir) / f"{base_name}.svg"
-            else:
-                output_file_path = Path(output_dir) / f'{base_name}{layer_path.replace("/", "_")}.svg'
-            self.logm.debug('Saving layer "%s" to file "%s"', layer_path, output_file_path)
-            extracted_image.save(output_file_path)
+        for layer_path in layer_paths:
+            output_file_path = Path(output_dir) / self.get_layer_file_name(base_name, layer_path, compress)
+            buffer = io.BytesIO()
+            self.extract_layer(layer_path).save_to_file_object(buffer, minify=minify)
+            object_path = store.put(buffer.getvalue(), output_file_path, compress, compression_level)
+            self.logm.debug('Stored layer "%s" as "%s" linked to "%s"', layer_path, object_path, output_file_path)
             extracted_layer_file_paths_by_layer_path[layer_path] = output_file_path
         return extracted_layer_file_paths_by_layer_path
 
+    def extract_all_layers_to_store(
+        self, store: "ContentStore", output_dir: Path, base_name: str, compress=False, compression_level=DEFAULT_COMPRESSION_LEVEL, minify=False
+    ) -> Dict[str, Path]:
+        """
+        Extract all layers into a content-addressed store, see extract_layers_to_store().
+
+        Parameters
+        ----------
+        store: ContentStore
+            Store to write the extracted layers to.
+        output_dir: Path
+            Output directory of the links.
+        base_name: str
+            Base name of the links.
+        compress: bool
+            Store gzip compressed files (.svgz).
+        compression_level: int
+            Compression level from 1 (fastest) to 9 (smallest).
+        minify: bool
+            Store minified files, see save().
+        Returns
+        -------
+        dict[str, Path]
+            Dictionary with file paths (of the links) by layer paths.
+        """
+        self.logm.debug("Extract all layers to store")
+        return self.extract_layers_to_store(store, output_dir, base_name, self.get_all_layer_paths(), compress, compression_level, minify)
+
     def extract_all_layers_to_file_lazy(self, output_dir: Path, base_name: str, input_file_path: Path) -> Dict[str, Path]:
         """
         Extract all layers to file by providing an output directory and a base name for
@@ -750,12 +1733,8 @@ class Image(Layer):
         extracted_layer_file_paths_by_layer_path: Dict[str, Path] = {}
         extracted_images = self.extract_all_layers()
         for layer_path, extracted_image in extracted_images.items():
+            output_file_path = Path(output_dir) / self.get_layer_file_name(base_name, layer_path)
 
-            if layer_path == "/":
-                output_file_path = Path(output_dir) / f"{base_name}.svg"
-            else:
-                output_file_path = Path(output_dir) / f'{base_name}{layer_path.replace("/", "_")}.svg'
-                
             if output_file_path.exists() is False:
                 self.logm.debug("Output file not yet existing. Save file!")
                 extracted_image.save(output_file_path)
@@ -767,7 +1746,13 @@ class Image(Layer):
             extracted_layer_file_paths_by_layer_path[layer_path] = output_file_path
         return extracted_layer_file_paths_by_layer_path
 
-    def save(self, path: Path) -> None:
+    def _write(self, file_object: BinaryIO, minify: bool) -> None:
+        if minify:
+            write_minified(self.element_tree, file_object)
+        else:
+            self.element_tree.write(file_object)
+
+    def save(self, path: Path, compress=False, compression_level=DEFAULT_COMPRESSION_LEVEL, minify=False) -> None:
         """
         Save image to file.
 
@@ -775,7 +1760,68 @@ class Image(Layer):
         ----------
         path: Path
             File location to write image to.
+        compress: bool
+            Write a gzip compressed file (.svgz). The output is streamed through the compressor.
+        compression_level: int
+            Compression level from 1 (fastest) to 9 (smallest).
+        minify: bool
+            Write a minified, web-optimized file without editor-only content (Inkscape/Sodipodi namespaces,
+            metadata), whitespace between elements and empty groups. The image itself is not modified, the
+            content is skipped while serializing.
+
+        An existing file that links a stored object of a ContentStore is replaced, see unlink_stored_output().
         """
-        self.logm.debug("Save image to file: %s", path)
+        self.logm.debug("Save image to file: %s (compress=%s, minify=%s)", path, compress, minify)
         path.parent.mkdir(exist_ok=True)
-        self.element_tree.write(path)
+        unlink_stored_output(path)
+        if compress:
+            with open(path, "wb") as file_object, _compressing_writer(file_object, compression_level) as gzip_file:
+                self._write(gzip_file, minify)  # type: ignore[arg-type]
+        elif minify:
+            with open(path, "wb") as file_object:
+                self._write(file_object, minify)
+        else:
+            self.element_tree.write(path)
+
+    async def asave(self, path: Path, compress=False, compression_level=DEFAULT_COMPRESSION_LEVEL, minify=False, executor: Optional["Executor"] = None) -> None:
+        """
+        Async counterpart of save(). The image is serialized and written in the executor (see
+        set_async_executor()). The image must not be modified until it is saved.
+
+        Parameters
+        ----------
+        path: Path
+            File location to write image to.
+        compress: bool
+            Write a gzip compressed file (.svgz).
+        compression_level: int
+            Compression level from 1 (fastest) to 9 (smallest).
+        minify: bool
+            Write a minified file, see save().
+        executor: Optional["Executor"]
+            Executor to use instead of the one set with set_async_executor().
+        """
+        await _run_in_executor(executor, self.save, path, compress, compression_level, minify)
+
+    def save_to_file_object(self, file_object: BinaryIO, compress=False, compression_level=DEFAULT_COMPRESSION_LEVEL, minify=False) -> None:
+        """
+        Save image to a binary file object (e.g. sys.stdout.buffer, a socket file or an io.BytesIO).
+        The output is identical to the output of save().
+
+        Parameters
+        ----------
+        file_object: BinaryIO
+            Binary file object to write image to.
+        compress: bool
+            Write gzip compressed data (.svgz). The output is streamed through the compressor.
+        compression_level: int
+            Compression level from 1 (fastest) to 9 (smallest).
+        minify: bool
+            Write minified data, see save().
+        """
+        self.logm.debug("Save image to file object (compress=%s, minify=%s)", compress, minify)
+        if compress:
+            with _compressing_writer(file_object, compression_level) as gzip_file:
+                self._write(gzip_file, minify)  # type: ignore[arg-type]
+        else:
+            self._write(file_object, minify)
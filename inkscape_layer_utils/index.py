@@ -0,0 +1,363 @@
+# Copyright (C) 2024 twyleg
+import logging
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, cast
+from xml.etree.ElementTree import Element
+
+from inkscape_layer_utils.image import LayerUnknownError
+
+if TYPE_CHECKING:
+    from inkscape_layer_utils.image import HirarchicalElement, Image, Object
+
+SVG_GROUP_TAG = "{http://www.w3.org/2000/svg}g"
+INKSCAPE_GROUPMODE_ATTRIBUTE = "{http://www.inkscape.org/namespaces/inkscape}groupmode"
+INKSCAPE_LABEL_ATTRIBUTE = "{http://www.inkscape.org/namespaces/inkscape}label"
+
+KIND_OTHER = 0
+KIND_LAYER = 1
+KIND_GROUP = 2
+KIND_OBJECT = 3
+
+NO_STRING = -1
+
+
+class DocumentIndex:
+    """
+    Compact, array-backed index over all elements of an SVG image in document order.
+
+    Instead of a Python object per element, the index holds parallel arrays with one entry per element and a
+    string table for ids and labels. Elements are classified the same way the Layer/Group/Object wrapper tree
+    classifies them, elements the wrapper tree does not reach are of kind KIND_OTHER. The subtree of an element
+    is the contiguous index range [index, subtree_ends[index]).
+
+    Attributes
+    ----------
+    elements: List[Element]
+        ElementTree Elements in document order. Not pickled, empty for unpickled indices until attach_elements()
+        is called.
+    parents: array
+        Index of the parent element or -1 for the root element.
+    depths: array
+        Depth of the element within the document, 0 for the root element.
+    kinds: array
+        Kind of the element (KIND_LAYER, KIND_GROUP, KIND_OBJECT or KIND_OTHER).
+    id_offsets: array
+        Offset of the element's id within the string table or NO_STRING.
+    label_offsets: array
+        Offset of the layer's label within the string table or NO_STRING.
+    subtree_ends: array
+        Exclusive end index of the element's subtree.
+    strings: List[str]
+        String table holding the ids and labels.
+
+    """
+
+    logm = logging.getLogger(f"{__name__}.idx")
+
+    def __init__(self, root_element: Element, image: Optional["Image"] = None) -> None:
+        """
+        Parameters
+        ----------
+        root_element: Element
+            Root element (<svg:svg>) of the image to index.
+        image: Optional[Image]
+            Image the root element belongs to. Required to modify the image through the index.
+        """
+        self._image = image
+        # Wrappers of the image by element index, see __get_wrappers()
+        self._wrappers: Optional[List[Optional["HirarchicalElement"]]] = None
+        self.elements: List[Element] = []
+        self.parents = array("i")
+        self.depths = array("i")
+        self.kinds = array("b")
+        self.id_offsets = array("i")
+        self.label_offsets = array("i")
+        self.subtree_ends = array("i")
+        self.strings: List[str] = []
+
+        self._string_offsets: Dict[str, int] = {}
+        self._layer_paths: Dict[int, str] = {}
+        self._layer_indices_by_path: Dict[str, int] = {}
+
+        self.__build(root_element)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["elements"] = []
+        state["_image"] = None
+        state["_wrappers"] = None
+        return state
+
+    def attach_elements(self, root_element: Element) -> None:
+        """
+        Attach the elements of a freshly parsed image to an index that has been restored without them
+        (e.g. from a snapshot). The element tree must have the same structure as the indexed one.
+
+        Parameters
+        ----------
+        root_element: Element
+            Root element (<svg:svg>) of the image.
+        """
+        elements = list(root_element.iter())
+        if len(elements) != len(self.kinds):
+            raise ValueError(f"Element count mismatch: index={len(self.kinds)}, element tree={len(elements)}")
+        self.elements = elements
+        self._wrappers = None
+
+    def __intern(self, value: str) -> int:
+        offset = self._string_offsets.get(value)
+        if offset is None:
+            offset = len(self.strings)
+            self.strings.append(value)
+            self._string_offsets[value] = offset
+        return offset
+
+    @staticmethod
+    def __classify(element: Element, parent_kind: int) -> int:
+        if parent_kind == KIND_OBJECT:
+            return KIND_OBJECT if "id" in element.attrib else KIND_OTHER
+        if parent_kind == KIND_OTHER:
+            return KIND_OTHER
+
+        if element.tag == SVG_GROUP_TAG:
+            if element.get(INKSCAPE_GROUPMODE_ATTRIBUTE) == "layer":
+                return KIND_LAYER if parent_kind == KIND_LAYER and INKSCAPE_LABEL_ATTRIBUTE in element.attrib else KIND_OTHER
+            return KIND_GROUP if "id" in element.attrib else KIND_OTHER
+        return KIND_OBJECT if "id" in element.attrib else KIND_OTHER
+
+    def __build(self, root_element: Element) -> None:
+        self.logm.debug("Build document index")
+        # Sublayer indices by label, per layer. Like Layer.layers, a later layer with the same label replaces an earlier one.
+        sublayers: Dict[int, Dict[str, int]] = {}
+        stack: List[Tuple[Element, int, int]] = [(root_element, -1, 0)]
+        while stack:
+            element, parent, depth = stack.pop()
+            index = len(self.elements)
+
+            kind = KIND_LAYER if parent == -1 else self.__classify(element, self.kinds[parent])
+            element_id = element.get("id")
+
+            self.elements.append(element)
+            self.parents.append(parent)
+            self.depths.append(depth)
+            self.kinds.append(kind)
+            self.id_offsets.append(NO_STRING if element_id is None else self.__intern(element_id))
+            self.subtree_ends.append(index + 1)
+
+            if kind == KIND_LAYER:
+                if parent == -1:
+                    self.label_offsets.append(NO_STRING)
+                else:
+                    label = element.attrib[INKSCAPE_LABEL_ATTRIBUTE]
+                    self.label_offsets.append(self.__intern(label))
+                    sublayers[parent][label] = index
+                sublayers[index] = {}
+            else:
+                self.label_offsets.append(NO_STRING)
+
+            stack.extend((child, index, depth + 1) for child in reversed(element))
+
+        for index in range(len(self.parents) - 1, 0, -1):
+            parent = self.parents[index]
+            if self.subtree_ends[index] > self.subtree_ends[parent]:
+                self.subtree_ends[parent] = self.subtree_ends[index]
+
+        # Replaced layers (and their sublayers) have no path, the same as with the wrapper tree
+        layer_stack: List[Tuple[int, str]] = [(0, "/")]
+        while layer_stack:
+            index, layer_path = layer_stack.pop()
+            self._layer_paths[index] = layer_path
+            self._layer_indices_by_path[layer_path] = index
+            parent_layer_path = "" if layer_path == "/" else layer_path
+            layer_stack.extend((sublayer_index, f"{parent_layer_path}/{label}") for label, sublayer_index in reversed(sublayers[index].items()))
+
+        self.logm.debug("Indexed %d elements, %d layers, %d strings", len(self.elements), len(self._layer_paths), len(self.strings))
+
+    def get_id(self, index: int) -> str | None:
+        """
+        Get the id of the element at the given index or None if it has no id.
+        """
+        offset = self.id_offsets[index]
+        return None if offset == NO_STRING else self.strings[offset]
+
+    def get_label(self, index: int) -> str | None:
+        """
+        Get the label of the layer at the given index or None if it is no (sub-)layer.
+        """
+        offset = self.label_offsets[index]
+        return None if offset == NO_STRING else self.strings[offset]
+
+    def get_layer_index_by_path(self, path: str) -> int:
+        """
+        Get the element index of a layer by its path.
+
+        Parameters
+        ----------
+        path: str
+            Path of the layer e.g. /parent_layer/sub_layer/sub_sub_layer.
+
+        Returns
+        -------
+        int
+            Index of the layer element.
+        """
+        try:
+            return self._layer_indices_by_path[path]
+        except KeyError:
+            raise LayerUnknownError(path)
+
+    def get_layer_path(self, index: int) -> str:
+        """
+        Get the layer path of the layer at the given index.
+        """
+        return self._layer_paths[index]
+
+    def get_layer_indices(self) -> List[int]:
+        """
+        Get the element indices of all layers in the same order as get_all_layer_paths().
+        """
+        return list(self._layer_paths.keys())
+
+    def get_all_layer_paths(self) -> List[str]:
+        """
+        Get all layer paths of the image in the same order as Layer.get_all_layer_paths().
+
+        Returns
+        -------
+        List[str]
+            List of all the layer paths.
+        """
+        return list(self._layer_paths.values())
+
+    def find_layers_by_name(self, layer_name: str) -> List[str]:
+        """
+        Find all layers with the given name in the same order as Layer.find_layers_by_name().
+
+        Parameters
+        ----------
+        layer_name: str
+            Name of the layers to search for.
+
+        Returns
+        -------
+        List[str]
+            List containing the paths of all layers with the given name.
+        """
+        offset = self._string_offsets.get(layer_name)
+        if offset is None:
+            return []
+        positions = {index: position for position, index in enumerate(self._layer_paths)}
+        matches = [index for index in self._layer_paths if self.label_offsets[index] == offset]
+        matches.sort(key=lambda index: positions[self.parents[index]])
+        return [self._layer_paths[index] for index in matches]
+
+    def get_subtree_range(self, path: str) -> Tuple[int, int]:
+        """
+        Get the index range of a layer's subtree (including the layer itself).
+
+        Parameters
+        ----------
+        path: str
+            Path of the layer.
+
+        Returns
+        -------
+        Tuple[int, int]
+            Start (inclusive) and end (exclusive) index of the subtree.
+        """
+        index = self.get_layer_index_by_path(path)
+        return index, self.subtree_ends[index]
+
+    def iter_object_indices(self, path: str, recursive=False) -> Iterator[int]:
+        """
+        Iterate over the indices of all objects of a layer, including objects within groups and sub-objects.
+
+        Parameters
+        ----------
+        path: str
+            Path of the layer.
+        recursive: bool
+            Include the objects of sublayers as well.
+        """
+        start, end = self.get_subtree_range(path)
+        kinds = self.kinds
+        subtree_ends = self.subtree_ends
+        index = start + 1
+        while index < end:
+            kind = kinds[index]
+            if kind == KIND_LAYER and not recursive:
+                index = subtree_ends[index]
+                continue
+            if kind == KIND_OBJECT:
+                yield index
+            index += 1
+
+    def __get_wrappers(self) -> List[Optional["HirarchicalElement"]]:
+        image = getattr(self, "_image", None)
+        if image is None:
+            raise ValueError("Only indices created with Image.create_index() can modify the image")
+        wrappers = getattr(self, "_wrappers", None)
+        if wrappers is None:
+            # Matched once by element, the wrappers keep track of elements replaced by copy-on-write afterwards
+            indices_by_element = {element: index for index, element in enumerate(self.elements)}
+            wrappers = [None] * len(self.elements)
+            stack: List["HirarchicalElement"] = [image]
+            while stack:
+                wrapper = stack.pop()
+                index = indices_by_element.get(wrapper._get_element())
+                if index is not None:
+                    wrappers[index] = wrapper
+                for attribute in ("layers", "groups", "objects"):
+                    stack.extend(getattr(wrapper, attribute, {}).values())
+            self._wrappers = wrappers
+        return wrappers
+
+    def __update_element(self, wrappers: List[Optional["HirarchicalElement"]], index: int) -> None:
+        wrapper = wrappers[index]
+        if wrapper is not None:
+            self.elements[index] = wrapper._get_element()
+
+    def set_style_attribute_of_all_objects(self, path: str, key: str, value: str | float | int, force=False, recursive=False) -> None:
+        """
+        Set a style attribute (e.g. "fill" or "stroke-opacity") of all objects of a layer in a single array scan.
+        The objects are modified through the image's wrappers like with Object.set_fill_color(), so forks stay
+        independent and frozen images raise an ImageFrozenError.
+
+        Parameters
+        ----------
+        path: str
+            Path of the layer.
+        key: str
+            Name of the style attribute.
+        value: str | float | int
+            Value to set.
+        force: bool
+            Force to set the attribute even if it is not present at the moment.
+        recursive: bool
+            Flag to enable recursive modification of the objects on sublayers.
+
+        Raises
+        ------
+        ValueError
+            If the index wasn't created with Image.create_index().
+        """
+        self.logm.debug('Set style attribute: layer="%s", key="%s", value="%s", force=%s, recursive=%s', path, key, value, force, recursive)
+        wrappers = self.__get_wrappers()
+        for index in self.iter_object_indices(path, recursive):
+            # Objects with the same id as a sibling aren't reachable through the wrappers either
+            object = cast(Optional["Object"], wrappers[index])
+            if object is not None:
+                object._set_style_attribute(key, value, force)
+
+        # Copy-on-write may have replaced the modified elements and their ancestors (all of them wrapped), the tree
+        # structure is unchanged
+        start, end = self.get_subtree_range(path)
+        index = self.parents[start]
+        while index != -1:
+            self.__update_element(wrappers, index)
+            index = self.parents[index]
+        for index in range(start, end):
+            self.__update_element(wrappers, index)
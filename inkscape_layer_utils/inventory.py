@@ -0,0 +1,178 @@
+# Copyright (C) 2024 twyleg
+import logging
+import re
+from array import array
+from typing import Dict, List, NamedTuple, Set
+from xml.etree.ElementTree import Element
+
+from inkscape_layer_utils import NAMESPACE_PREFIXES
+from inkscape_layer_utils.index import KIND_GROUP, KIND_LAYER, KIND_OBJECT, DocumentIndex
+from inkscape_layer_utils.minify import XML_NAMESPACE
+
+SVG_IMAGE_TAG = "{http://www.w3.org/2000/svg}image"
+HREF_ATTRIBUTES = ["{http://www.w3.org/1999/xlink}href", "href"]
+
+URL_REFERENCE_PATTERN = re.compile(r"url\(\s*['\"]?#([^)'\"\s]+)")
+
+logm = logging.getLogger(__name__)
+
+
+class LayerStatistics(NamedTuple):
+    """
+    Statistics of a single layer. Except for subtree_bytes, all values refer to the layer's own content
+    (without its sublayers), which is what ends up in the layer's extracted image.
+
+    Attributes
+    ----------
+    path: str
+        Path of the layer.
+    depth: int
+        Nesting depth of the layer, 0 for the root layer.
+    objects: int
+        Number of objects, including objects within groups and sub-objects.
+    groups: int
+        Number of groups.
+    bytes: int
+        Estimated serialized size of the layer's own content in bytes.
+    subtree_bytes: int
+        Estimated serialized size of the layer including its sublayers in bytes.
+    referenced_defs: List[str]
+        Sorted ids referenced via url(#...) or href="#...".
+    raster_bytes: int
+        Decoded size of the raster images embedded as data URIs in bytes.
+    """
+
+    path: str
+    depth: int
+    objects: int
+    groups: int
+    bytes: int
+    subtree_bytes: int
+    referenced_defs: List[str]
+    raster_bytes: int
+
+
+def _qualified_name_length(name: str) -> int:
+    if name[0] != "{":
+        return len(name)
+    uri, local_name = name[1:].split("}", 1)
+    # Unknown namespaces get a generated prefix like "ns0" when written
+    prefix = "xml" if uri == XML_NAMESPACE else NAMESPACE_PREFIXES.get(uri, "ns0")
+    return len(local_name) + len(prefix) + 1 if prefix else len(local_name)
+
+
+def _estimate_serialized_size(element: Element) -> int:
+    # <tag attr="value">text</tag>tail, escaping is not taken into account
+    tag_length = _qualified_name_length(element.tag)
+    size = 2 * tag_length + 5
+    for key, value in element.attrib.items():
+        size += _qualified_name_length(key) + len(value) + 4
+    return size + len(element.text or "") + len(element.tail or "")
+
+
+def estimate_svg_size(root_element: Element) -> int:
+    """
+    Estimate the serialized (uncompressed) size of an element tree in bytes without serializing it.
+    """
+    return sum(_estimate_serialized_size(element) for element in root_element.iter())
+
+
+def _embedded_raster_bytes(element: Element) -> int:
+    for href_attribute in HREF_ATTRIBUTES:
+        href = element.get(href_attribute)
+        if href is not None and href.startswith("data:"):
+            header, _, payload = href.partition(",")
+            if header.endswith(";base64"):
+                payload = payload.strip()
+                return len(payload) * 3 // 4 - payload[-2:].count("=")
+            return len(payload)
+    return 0
+
+
+def _referenced_ids(element: Element) -> List[str]:
+    referenced_ids: List[str] = []
+    for key, value in element.attrib.items():
+        if key in HREF_ATTRIBUTES:
+            if value.startswith("#"):
+                referenced_ids.append(value[1:])
+        elif "url(" in value:
+            referenced_ids.extend(URL_REFERENCE_PATTERN.findall(value))
+    return referenced_ids
+
+
+class _OwnContent:
+    __slots__ = ("objects", "groups", "bytes", "referenced_ids", "raster_bytes")
+
+    def __init__(self) -> None:
+        self.objects = 0
+        self.groups = 0
+        self.bytes = 0
+        self.referenced_ids: Set[str] = set()
+        self.raster_bytes = 0
+
+
+def create_layer_inventory(index: DocumentIndex) -> List[LayerStatistics]:
+    """
+    Calculate the statistics of all layers of an image in a single pass over its document index.
+
+    Parameters
+    ----------
+    index: DocumentIndex
+        Document index of the image with attached elements (see Image.create_index()).
+
+    Returns
+    -------
+    List[LayerStatistics]
+        Statistics of all layers in the same order as Layer.get_all_layer_paths().
+    """
+    element_count = len(index)
+    if len(index.elements) != element_count:
+        raise ValueError("Document index without elements, attach the elements first")
+
+    kinds = index.kinds
+    parents = index.parents
+    owners = array("i", [0]) * element_count
+    own_contents: Dict[int, _OwnContent] = {}
+    sizes = array("q", [0]) * (element_count + 1)
+
+    # Elements in document order: the owner (nearest layer) of an element's parent is known before the element.
+    for element_index, element in enumerate(index.elements):
+        kind = kinds[element_index]
+        if kind == KIND_LAYER:
+            owner = element_index
+            own_contents[owner] = _OwnContent()
+        else:
+            owner = owners[parents[element_index]]
+        owners[element_index] = owner
+
+        size = _estimate_serialized_size(element)
+        sizes[element_index + 1] = sizes[element_index] + size
+        own_content = own_contents[owner]
+        if kind == KIND_OBJECT:
+            own_content.objects += 1
+        elif kind == KIND_GROUP:
+            own_content.groups += 1
+        own_content.bytes += size
+        if element.attrib:
+            own_content.referenced_ids.update(_referenced_ids(element))
+            if element.tag == SVG_IMAGE_TAG:
+                own_content.raster_bytes += _embedded_raster_bytes(element)
+
+    inventory: List[LayerStatistics] = []
+    for layer_index in index.get_layer_indices():
+        layer_path = index.get_layer_path(layer_index)
+        own_content = own_contents[layer_index]
+        inventory.append(
+            LayerStatistics(
+                path=layer_path,
+                depth=0 if layer_path == "/" else layer_path.count("/"),
+                objects=own_content.objects,
+                groups=own_content.groups,
+                bytes=own_content.bytes,
+                subtree_bytes=sizes[index.subtree_ends[layer_index]] - sizes[layer_index],
+                referenced_defs=sorted(own_content.referenced_ids),
+                raster_bytes=own_content.raster_bytes,
+            )
+        )
+    logm.debug("Created inventory of %d layers", len(inventory))
+    return inventory
@@ -1,117 +1,92 @@
 # Copyright (C) 2024 twyleg
-import json
-import os
 import argparse
-import xml.etree.ElementTree as ET
-from collections import OrderedDict
+import logging
+import os
+import sys
 from pathlib import Path
-from typing import List
-
-from simple_python_app.subcommand_application import SubcommandApplication
-
-from inkscape_layer_utils import __version__
-from inkscape_layer_utils.image import Image
-
-
-FILE_DIR = Path(__file__).parent
-
-
-class InkscapeLayerUtils(SubcommandApplication):
-    def __init__(self):
-        super().__init__(
-            application_name="inkscape_layer_utils",
-            version=__version__,
-            application_config_init_enabled=False,
-            logging_init_custom_logging_enabled=False,
-            logging_logfile_output_dir=FILE_DIR / "logs/",
-        )
-
-    def add_arguments(self, argparser: argparse.ArgumentParser) -> None:
-        # fmt: off
-        extract_layers_command = self.add_subcommand(
-            command="extract_layers",
-            help="Extract layers from SVG input file.",
-            description="Extract layers from SVG input file into multiple output files.",
-            handler=self._handle_extract_layers
-        )
-
-        extract_layers_command.parser.add_argument(
-            "-o",
-            "--output",
-            dest="output",
-            default=os.path.join(os.getcwd(), "output"),
-            help='Output directory for extracted layers. Default="./"',
-        )
-
-        list_layers_command = self.add_subcommand(
-            command="list_layers",
-            help="List layers of SVG input file.",
-            description="List layers of SVG input file in plain text list or JSON format.",
-            handler=self._handle_list_layers
-        )
-
-        list_layers_command.parser.add_argument(
-            "-j",
-            "--json",
-            help="Output results in JSON format instead of list.",
-            action="store_true"
-        )
-
-        list_layers_command.parser.add_argument(
-            "-p",
-            "--print",
-            help="Use print instead of log to return results.",
-            action="store_true"
-        )
-        # fmt: on
-
-        for command in [extract_layers_command, list_layers_command]:
-            command.parser.add_argument(
-                "svg_files",
-                metavar="svg_files",
-                type=str,
-                nargs="+",
-                help="SVG image file(s) to extract the layers from.",
-            )
-
-    def _handle_extract_layers(self, args: argparse.Namespace) -> int:
-        for svg_file_path in args.svg_files:
-            svg_file_element_tree = ET.parse(svg_file_path)
-            svg_image = Image(svg_file_element_tree)
-            svg_image.extract_all_layers_to_file(args.output, Path(svg_file_path).stem)
-
-        return 0
-
-    def _handle_list_layers(self, args: argparse.Namespace) -> int:
-
-        def log_or_print_line(fmt: str, *vars) -> None:
-            if args.print:
-                print(fmt % vars)
-            else:
-                self.logm.info(fmt, *vars)
-
-        layers_by_svg_file_path: OrderedDict[str, List[str]] = OrderedDict()
-        for svg_file_path in args.svg_files:
-            svg_file_element_tree = ET.parse(svg_file_path)
-            svg_image = Image(svg_file_element_tree)
-            layers_by_svg_file_path[svg_file_path] = svg_image.get_all_layer_paths()
-
-        if args.json:
-            json_str = json.dumps(layers_by_svg_file_path, indent=4)
-            for line in json_str.splitlines():
-                log_or_print_line(line)
-        else:
-            for svg_file_path, layer_paths in layers_by_svg_file_path.items():
-                log_or_print_line("File: %s", svg_file_path)
-                for layer_path in layer_paths:
-                    log_or_print_line("  %s", layer_path)
-
-        return 0
-
-
-def main() -> None:
+from typing import Any, List, Optional
+
+from inkscape_layer_utils.commands import STDIO_PATH, SUBCOMMANDS
+
+# Subcommands that are executed without the simple_python_app framework when invoked without framework options.
+# Importing and initializing the framework (prompt_toolkit, jsonschema, yaml logging config, logfile) costs
+# several times more than processing a typical SVG file, which adds up when the tool is invoked per file by
+# build systems.
+FAST_PATH_SUBCOMMANDS = ["extract_layers", "list_layers", "recolor", "batch"]
+FAST_PATH_QUIET_OPTIONS = ["-q", "--quiet"]
+FAST_PATH_EXCLUDED_OPTIONS = ["-h", "--help"]
+
+LOGGING_FORMAT = "[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s]: %(message)s"
+LOGGING_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def __getattr__(name: str) -> Any:
+    # Keep "from inkscape_layer_utils.main import InkscapeLayerUtils" working without importing the framework eagerly.
+    if name == "InkscapeLayerUtils":
+        from inkscape_layer_utils.application import InkscapeLayerUtils
+
+        return InkscapeLayerUtils
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def fast_path_available(argv: List[str]) -> bool:
+    args = [arg for arg in argv if arg not in FAST_PATH_QUIET_OPTIONS]
+    return len(args) > 0 and args[0] in FAST_PATH_SUBCOMMANDS and not any(arg in FAST_PATH_EXCLUDED_OPTIONS for arg in args)
+
+
+def forward_to_server(socket_path: str, args: List[str]) -> Optional[int]:
+    from inkscape_layer_utils.server import FORWARDABLE_SUBCOMMANDS, forward
+
+    # Watch mode runs forever and stdin/stdout can't be passed to the server
+    if args[0] not in FORWARDABLE_SUBCOMMANDS or "-w" in args or "--watch" in args or STDIO_PATH in args:
+        return None
+    try:
+        output, exit_code = forward(Path(socket_path), args)
+    except OSError as e:
+        logging.getLogger("inkscape_layer_utils").debug('Server "%s" not reachable, running locally: %s', socket_path, e)
+        return None
+    for line in output:
+        print(line)
+    return exit_code
+
+
+def run_fast_path(argv: List[str]) -> int:
+    quiet = any(arg in FAST_PATH_QUIET_OPTIONS for arg in argv)
+    args = [arg for arg in argv if arg not in FAST_PATH_QUIET_OPTIONS]
+
+    socket_path = os.environ.get("INKSCAPE_LAYER_UTILS_SOCKET")
+    if socket_path:
+        exit_code = forward_to_server(socket_path, args)
+        if exit_code is not None:
+            return exit_code
+
+    command_name = args[0]
+    subcommand = SUBCOMMANDS[command_name]
+    parser = argparse.ArgumentParser(prog=f"inkscape_layer_utils {command_name}", description=subcommand.description)
+    subcommand.add_arguments(parser)
+    parsed_args = parser.parse_args(args[1:])
+
+    # Keep stdout clean when the result itself is written to stdout
+    writes_to_stdout = STDIO_PATH in (getattr(parsed_args, "output", None), getattr(parsed_args, "archive", None))
+    log_stream = sys.stderr if writes_to_stdout else sys.stdout
+    logging.basicConfig(level=logging.INFO, stream=log_stream, format=LOGGING_FORMAT, datefmt=LOGGING_DATE_FORMAT)
+    logm = logging.getLogger("inkscape_layer_utils")
+
+    if not quiet:
+        # Without the version, resolving it runs git in a source checkout, which costs more than processing a typical file
+        logm.info("%s started!", "inkscape_layer_utils")
+    return subcommand.handler(parsed_args)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if fast_path_available(argv):
+        sys.exit(run_fast_path(argv))
+
+    from inkscape_layer_utils.application import InkscapeLayerUtils
+
     inkscape_layer_utils = InkscapeLayerUtils()
-    inkscape_layer_utils.start()
+    sys.exit(inkscape_layer_utils.start(argv))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+# Copyright (C) 2024 twyleg
+import re
+from typing import BinaryIO, Dict, List, Optional
+from xml.etree.ElementTree import Element, ElementTree
+
+from inkscape_layer_utils import NAMESPACE_PREFIXES
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# Namespaces only used by editors (Inkscape, Sodipodi) and the RDF metadata block
+EDITOR_NAMESPACES = {
+    "http://www.inkscape.org/namespaces/inkscape",
+    "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "http://creativecommons.org/ns#",
+    "http://purl.org/dc/elements/1.1/",
+}
+
+METADATA_TAG = f"{{{SVG_NAMESPACE}}}metadata"
+GROUP_TAG = f"{{{SVG_NAMESPACE}}}g"
+TEXT_CONTENT_TAGS = {f"{{{SVG_NAMESPACE}}}{name}" for name in ("text", "tspan", "textPath")}
+XML_SPACE_ATTRIBUTE = f"{{{XML_NAMESPACE}}}space"
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Characters escaped in text and attribute values, like ElementTree.write() does. Not using xml.sax.saxutils, it
+# imports urllib.request (with http.client, ssl and email), which alone exceeds the CLI startup budget.
+TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+ATTRIBUTE_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"})
+ATTRIBUTE_SPECIAL_CHARACTERS = frozenset('&<>"\n\r\t')
+
+
+def _escape_text(text: str) -> str:
+    return text.translate(TEXT_ESCAPES) if "&" in text or "<" in text or ">" in text else text
+
+
+def _escape_attribute(value: str) -> str:
+    # Enclosed in double quotes
+    return value.translate(ATTRIBUTE_ESCAPES) if not ATTRIBUTE_SPECIAL_CHARACTERS.isdisjoint(value) else value
+
+
+class _MinifyingSerializer:
+    """
+    Serializer that writes an element tree like ElementTree.write(), but skips editor-only content on the way:
+
+    - Elements and attributes of the Inkscape, Sodipodi and RDF namespaces (e.g. sodipodi:namedview,
+      inkscape:label) and <metadata> elements.
+    - Comments and processing instructions.
+    - Whitespace between elements. Runs of whitespace within text are collapsed into a single space, except
+      within xml:space="preserve".
+    - Groups without any content after the above, e.g. the ones left by Layer.remove_all_objects_and_groups().
+
+    Namespace declarations are only written for the namespaces in use, so the root start tag is written after
+    its content has been serialized.
+    """
+
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+        self.namespaces: Dict[str, str] = {}
+
+    def qualified_name(self, name: str) -> str:
+        if name[0] != "{":
+            return name
+        uri, local_name = name[1:].split("}", 1)
+        prefix = self.namespaces.get(uri)
+        if prefix is None:
+            if uri == XML_NAMESPACE:
+                return f"xml:{local_name}"
+            prefix = NAMESPACE_PREFIXES.get(uri)
+            if prefix is None or prefix in self.namespaces.values():
+                prefix = f"ns{len(self.namespaces)}"
+            self.namespaces[uri] = prefix
+        return f"{prefix}:{local_name}" if prefix else local_name
+
+    @staticmethod
+    def is_editor_only(name: str) -> bool:
+        return name[0] == "{" and name[1:].split("}", 1)[0] in EDITOR_NAMESPACES
+
+    @staticmethod
+    def minify_text(text: Optional[str], preserve_space: bool, in_text_content: bool) -> Optional[str]:
+        if not text or preserve_space:
+            return text
+        if in_text_content:
+            # Whitespace between text spans separates words, keep it
+            return WHITESPACE_PATTERN.sub(" ", text)
+        if text.isspace():
+            return None
+        return WHITESPACE_PATTERN.sub(" ", text)
+
+    def start_tag(self, element: Element) -> str:
+        start_tag = f"<{self.qualified_name(element.tag)}"
+        for key, value in element.items():
+            if not self.is_editor_only(key):
+                start_tag += f' {self.qualified_name(key)}="{_escape_attribute(value)}"'
+        return start_tag
+
+    def serialize(self, element: Element, preserve_space: bool, in_text_content: bool) -> bool:
+        tag = element.tag
+        if not isinstance(tag, str) or tag == METADATA_TAG or self.is_editor_only(tag):
+            return False
+
+        preserve_space = element.get(XML_SPACE_ATTRIBUTE, "preserve" if preserve_space else "default") == "preserve"
+        in_text_content = in_text_content or tag in TEXT_CONTENT_TAGS
+        parts = self.parts
+        start_index = len(parts)
+        parts.append(self.start_tag(element))
+        content_index = len(parts)
+
+        text = self.minify_text(element.text, preserve_space, in_text_content)
+        if text:
+            parts.append(_escape_text(text))
+        for child in element:
+            self.serialize(child, preserve_space, in_text_content)
+            tail = self.minify_text(child.tail, preserve_space, in_text_content)
+            if tail:
+                parts.append(_escape_text(tail))
+
+        if len(parts) == content_index:
+            if tag == GROUP_TAG:
+                del parts[start_index:]
+                return False
+            parts.append(" />")
+        else:
+            parts.insert(content_index, ">")
+            parts.append(f"</{self.qualified_name(tag)}>")
+        return True
+
+    def namespace_declarations(self) -> str:
+        return "".join(
+            f' xmlns="{_escape_attribute(uri)}"' if not prefix else f' xmlns:{prefix}="{_escape_attribute(uri)}"'
+            for uri, prefix in sorted(self.namespaces.items(), key=lambda item: item[1])
+        )
+
+
+def write_minified(element_tree: ElementTree, file_object: BinaryIO) -> None:
+    """
+    Write a minified element tree to a binary file object. Editor-only content is skipped during
+    serialization (see _MinifyingSerializer), the tree itself is not modified. Like ElementTree.write(), the
+    output is written as us-ascii without XML declaration, other characters are written as character
+    references.
+
+    Parameters
+    ----------
+    element_tree: ElementTree
+        Element tree to write.
+    file_object: BinaryIO
+        Binary file object to write to.
+    """
+    serializer = _MinifyingSerializer()
+    root = element_tree.getroot()
+    if root is None or not serializer.serialize(root, False, False):
+        return
+    # Insert the namespace declarations into the root start tag once all namespaces in use are known
+    root_start = f"<{serializer.qualified_name(root.tag)}"
+    serializer.parts[0] = root_start + serializer.namespace_declarations() + serializer.parts[0][len(root_start) :]
+    file_object.write("".join(serializer.parts).encode("us-ascii", "xmlcharrefreplace"))
@@ -0,0 +1,368 @@
+# Copyright (C) 2024 twyleg
+import logging
+import math
+import re
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from xml.etree.ElementTree import Element
+
+from inkscape_layer_utils.image import _shallow_copy_element
+from inkscape_layer_utils.style import parse_style
+
+
+def _import_numpy() -> Optional[ModuleType]:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# Optional, see transform_colors()
+numpy = _import_numpy()
+
+if TYPE_CHECKING:
+    from inkscape_layer_utils.image import HirarchicalElement, Layer
+
+COLOR_PROPERTIES = ("fill", "stroke", "stop-color", "flood-color")
+
+NON_COLOR_VALUES = {"", "none", "inherit", "currentcolor", "transparent"}
+
+SHORT_HEX_COLOR_PATTERN = re.compile(r"#[0-9a-f]{3}")
+HEX_COLOR_PATTERN = re.compile(r"#[0-9a-f]{6}")
+
+
+def normalize_color(color: str) -> str:
+    """
+    Normalize a color value for comparison: lower case, short hex colors expanded, e.g. "#F00" -> "#ff0000".
+    """
+    color = color.strip().lower()
+    if SHORT_HEX_COLOR_PATTERN.fullmatch(color):
+        return "#" + "".join(2 * c for c in color[1:])
+    return color
+
+
+class ColorTransform(NamedTuple):
+    """
+    Transformation of colors in HSL color space. Amounts are absolute changes of the saturation and lightness,
+    e.g. lightness=-0.1 darkens by 10% and saturation=-1.0 converts to grayscale. Results are clipped.
+
+    Attributes
+    ----------
+    hue_shift: float
+        Hue rotation in degrees.
+    saturation: float
+        Saturation change from -1.0 to 1.0.
+    lightness: float
+        Lightness change from -1.0 to 1.0.
+    """
+
+    hue_shift: float = 0.0
+    saturation: float = 0.0
+    lightness: float = 0.0
+
+
+def _transform_rgb_colors_numpy(rgb_colors: List[int], transform: ColorTransform) -> List[int]:
+    assert numpy is not None
+    packed_rgb = numpy.array(rgb_colors, dtype=numpy.int64)
+    red, green, blue = (((packed_rgb >> shift) & 0xFF) / 255.0 for shift in (16, 8, 0))
+    max_component = numpy.maximum(numpy.maximum(red, green), blue)
+    min_component = numpy.minimum(numpy.minimum(red, green), blue)
+    chroma = max_component - min_component
+    lightness = (max_component + min_component) / 2.0
+    gray = chroma == 0.0
+    safe_chroma = numpy.where(gray, 1.0, chroma)
+    # Clipped to remove rounding errors, e.g. a saturation of 1.0000000000000002 would not become 0.0 for grayscale
+    saturation = numpy.where(gray, 0.0, numpy.minimum(chroma / numpy.where(gray, 1.0, 1.0 - numpy.abs(2.0 * lightness - 1.0)), 1.0))
+    hue = numpy.select(
+        [gray, max_component == red, max_component == green],
+        [0.0, ((green - blue) / safe_chroma) % 6.0, (blue - red) / safe_chroma + 2.0],
+        (red - green) / safe_chroma + 4.0,
+    )
+
+    hue = (hue / 6.0 + transform.hue_shift / 360.0) % 1.0
+    saturation = numpy.clip(saturation + transform.saturation, 0.0, 1.0)
+    lightness = numpy.clip(lightness + transform.lightness, 0.0, 1.0)
+
+    amplitude = saturation * numpy.minimum(lightness, 1.0 - lightness)
+    packed_rgb = numpy.zeros_like(packed_rgb)
+    for offset, shift in ((0.0, 16), (8.0, 8), (4.0, 0)):
+        k = (offset + hue * 12.0) % 12.0
+        component = lightness - amplitude * numpy.clip(numpy.minimum(k - 3.0, 9.0 - k), -1.0, 1.0)
+        packed_rgb |= numpy.floor(numpy.clip(component, 0.0, 1.0) * 255.0 + 0.5).astype(numpy.int64) << shift
+    return packed_rgb.tolist()
+
+
+def _transform_rgb_colors_python(rgb_colors: List[int], transform: ColorTransform) -> List[int]:
+    # Same arithmetic as _transform_rgb_colors_numpy(), so both return identical results
+    transformed_rgb_colors: List[int] = []
+    for packed_rgb in rgb_colors:
+        red, green, blue = (((packed_rgb >> shift) & 0xFF) / 255.0 for shift in (16, 8, 0))
+        max_component = max(red, green, blue)
+        min_component = min(red, green, blue)
+        chroma = max_component - min_component
+        lightness = (max_component + min_component) / 2.0
+        if chroma == 0.0:
+            hue = saturation = 0.0
+        else:
+            saturation = min(chroma / (1.0 - abs(2.0 * lightness - 1.0)), 1.0)
+            if max_component == red:
+                hue = ((green - blue) / chroma) % 6.0
+            elif max_component == green:
+                hue = (blue - red) / chroma + 2.0
+            else:
+                hue = (red - green) / chroma + 4.0
+
+        hue = (hue / 6.0 + transform.hue_shift / 360.0) % 1.0
+        saturation = min(max(saturation + transform.saturation, 0.0), 1.0)
+        lightness = min(max(lightness + transform.lightness, 0.0), 1.0)
+
+        amplitude = saturation * min(lightness, 1.0 - lightness)
+        packed_rgb = 0
+        for offset, shift in ((0.0, 16), (8.0, 8), (4.0, 0)):
+            k = (offset + hue * 12.0) % 12.0
+            component = lightness - amplitude * min(max(min(k - 3.0, 9.0 - k), -1.0), 1.0)
+            packed_rgb |= math.floor(min(max(component, 0.0), 1.0) * 255.0 + 0.5) << shift
+        transformed_rgb_colors.append(packed_rgb)
+    return transformed_rgb_colors
+
+
+def transform_colors(colors: List[str], transform: ColorTransform, use_numpy: Optional[bool] = None) -> List[str]:
+    """
+    Transform hex RGB colors, e.g. "#ff0000" or "#F00". Other color values (e.g. color names) are returned
+    unchanged. The colors are transformed as one array with NumPy if it is installed, otherwise one by one.
+    Both return the same results.
+
+    Parameters
+    ----------
+    colors: List[str]
+        Colors to transform.
+    transform: ColorTransform
+        Transformation to apply.
+    use_numpy: Optional[bool]
+        Force (True) or prevent (False) the use of NumPy. Default: use NumPy if installed.
+
+    Returns
+    -------
+    List[str]
+        Transformed colors as normalized hex RGB colors, in the same order as colors.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    transformed_colors = list(colors)
+    positions: List[int] = []
+    rgb_colors: List[int] = []
+    for position, color in enumerate(colors):
+        color = normalize_color(color)
+        if HEX_COLOR_PATTERN.fullmatch(color):
+            positions.append(position)
+            rgb_colors.append(int(color[1:], 16))
+    if not rgb_colors:
+        return transformed_colors
+
+    transform_rgb_colors: Any = _transform_rgb_colors_numpy if use_numpy else _transform_rgb_colors_python
+    for position, packed_rgb in zip(positions, transform_rgb_colors(rgb_colors, transform)):
+        transformed_colors[position] = f"#{packed_rgb:06x}"
+    return transformed_colors
+
+
+class ColorOccurrence(NamedTuple):
+    """
+    Single use of a color.
+
+    Attributes
+    ----------
+    location: int
+        Index of the element in ColorIndex.elements.
+    property: str
+        Property the color is assigned to, one of COLOR_PROPERTIES.
+    in_style: bool
+        True if the color is set in the style attribute, False for a presentation attribute.
+    """
+
+    location: int
+    property: str
+    in_style: bool
+
+
+def _style_with_properties(style: str, values_by_property: Dict[str, str]) -> str:
+    declarations = style.split(";")
+    for i, declaration in enumerate(declarations):
+        key, separator, _ = declaration.partition(":")
+        if separator and key.strip() in values_by_property:
+            declarations[i] = f"{key}:{values_by_property[key.strip()]}"
+    return ";".join(declarations)
+
+
+def _color_value(value: str) -> Optional[str]:
+    color = normalize_color(value)
+    if color in NON_COLOR_VALUES or color.startswith("url("):
+        return None
+    return color
+
+
+class ColorIndex:
+    """
+    Inverted index of all colors of a layer tree (usually a whole image): color value -> uses of the color as
+    fill, stroke, stop-color or flood-color, in style attributes and presentation attributes. Gradient stops
+    and other elements within objects are included.
+
+    The index is built in a single pass over the elements. Applying a palette swap with apply() then only
+    touches the uses of the swapped colors. Modifications respect the copy-on-write state of forked images.
+    The index stays valid across apply() calls, but has to be created again after objects, groups or layers
+    have been added or removed.
+
+    Attributes
+    ----------
+    occurrences_by_color: Dict[str, List[ColorOccurrence]]
+        Uses of every color, by normalized color value (see normalize_color()).
+    elements: List[Element]
+        Elements using colors.
+
+    """
+
+    logm = logging.getLogger(f"{__name__}.col")
+
+    def __init__(self, layer: "Layer") -> None:
+        """
+        Parameters
+        ----------
+        layer: Layer
+            Layer to index, including all its sublayers. Pass the image to index the whole document.
+        """
+        self.occurrences_by_color: Dict[str, List[ColorOccurrence]] = {}
+        self.elements: List[Element] = []
+        # Nearest wrapper (layer, group or object) of every element and the child indices from the wrapper's element
+        self._locations: List[Tuple["HirarchicalElement", Tuple[int, ...]]] = []
+
+        root = layer
+        while root.parent is not None:
+            root = root.parent  # type: ignore[assignment]
+        self._root = root
+
+        wrappers_by_element = self._collect_wrappers(layer)
+        stack: List[Tuple[Element, "HirarchicalElement", Tuple[int, ...]]] = [(layer.layer_element, layer, ())]
+        while stack:
+            element, wrapper, child_path = stack.pop()
+            self._index_element(element, wrapper, child_path)
+            for child_index, child in enumerate(element):
+                child_wrapper = wrappers_by_element.get(child)
+                if child_wrapper is not None:
+                    stack.append((child, child_wrapper, ()))
+                else:
+                    stack.append((child, wrapper, child_path + (child_index,)))
+        self.logm.debug("Indexed %d colors on %d elements", len(self.occurrences_by_color), len(self.elements))
+
+    @staticmethod
+    def _collect_wrappers(layer: "Layer") -> Dict[Element, "HirarchicalElement"]:
+        wrappers_by_element: Dict[Element, "HirarchicalElement"] = {}
+        stack: List["HirarchicalElement"] = [layer]
+        while stack:
+            wrapper = stack.pop()
+            wrappers_by_element[wrapper._get_element()] = wrapper
+            for attribute in ("layers", "groups", "objects"):
+                stack.extend(getattr(wrapper, attribute, {}).values())
+        return wrappers_by_element
+
+    def _index_element(self, element: Element, wrapper: "HirarchicalElement", child_path: Tuple[int, ...]) -> None:
+        occurrences: List[Tuple[str, str, bool]] = []
+        style = element.get("style")
+        if style:
+            for key, value in parse_style(style).items():
+                if key in COLOR_PROPERTIES:
+                    color = _color_value(value)
+                    if color is not None:
+                        occurrences.append((color, key, True))
+        for key in COLOR_PROPERTIES:
+            attribute_value = element.get(key)
+            if attribute_value is not None:
+                color = _color_value(attribute_value)
+                if color is not None:
+                    occurrences.append((color, key, False))
+
+        if occurrences:
+            location = len(self.elements)
+            self.elements.append(element)
+            self._locations.append((wrapper, child_path))
+            for color, key, in_style in occurrences:
+                self.occurrences_by_color.setdefault(color, []).append(ColorOccurrence(location, key, in_style))
+
+    def get_color_counts(self) -> Dict[str, int]:
+        """
+        Get the number of uses of every color, most used colors first.
+        """
+        return dict(sorted(((color, len(occurrences)) for color, occurrences in self.occurrences_by_color.items()), key=lambda item: -item[1]))
+
+    def _make_writable(self, location: int, owned_elements: Optional[Set[Element]]) -> Element:
+        wrapper, child_path = self._locations[location]
+        element = wrapper._make_writable()
+        for child_index in child_path:
+            child = element[child_index]
+            if owned_elements is not None and child not in owned_elements:
+                # Copy-on-write of the elements below the wrapper, _make_writable() only covers wrapped elements
+                child = _shallow_copy_element(child)
+                element[child_index] = child
+                owned_elements.add(child)
+            element = child
+        self.elements[location] = element
+        return element
+
+    def apply(self, palette: Dict[str, str]) -> int:
+        """
+        Swap colors. All colors are swapped at once, so {"#ff0000": "#0000ff", "#0000ff": "#ff0000"} exchanges
+        red and blue.
+
+        Parameters
+        ----------
+        palette: Dict[str, str]
+            New colors by current colors. Colors are compared normalized, e.g. "#F00" matches "#ff0000".
+
+        Returns
+        -------
+        int
+            Number of swapped color uses.
+
+        Raises
+        ------
+        ImageFrozenError
+            If the image is frozen.
+        """
+        swapped_occurrences: List[Tuple[str, List[ColorOccurrence]]] = []
+        for color, new_color in palette.items():
+            occurrences = self.occurrences_by_color.pop(normalize_color(color), None)
+            if occurrences:
+                swapped_occurrences.append((new_color, occurrences))
+
+        changes_by_location: Dict[int, Tuple[Dict[str, str], Dict[str, str]]] = {}
+        for new_color, occurrences in swapped_occurrences:
+            for occurrence in occurrences:
+                style_changes, attribute_changes = changes_by_location.setdefault(occurrence.location, ({}, {}))
+                (style_changes if occurrence.in_style else attribute_changes)[occurrence.property] = new_color
+            self.occurrences_by_color.setdefault(normalize_color(new_color), []).extend(occurrences)
+
+        owned_elements: Optional[Set[Element]] = getattr(self._root, "_owned_elements", None)
+        for location, (style_changes, attribute_changes) in changes_by_location.items():
+            element = self._make_writable(location, owned_elements)
+            if style_changes:
+                element.set("style", _style_with_properties(element.get("style", ""), style_changes))
+            for key, value in attribute_changes.items():
+                element.set(key, value)
+
+        swapped_count = sum(len(occurrences) for _, occurrences in swapped_occurrences)
+        self.logm.debug("Swapped %d color uses on %d elements", swapped_count, len(changes_by_location))
+        return swapped_count
+
+    def transform(self, transform: ColorTransform) -> int:
+        """
+        Transform all hex RGB colors, see transform_colors(). Every distinct color is transformed once, no matter
+        how often it is used, the results are then applied as palette swap.
+
+        Returns
+        -------
+        int
+            Number of changed color uses.
+        """
+        colors = list(self.occurrences_by_color)
+        palette = {color: new_color for color, new_color in zip(colors, transform_colors(colors, transform)) if new_color != color}
+        self.logm.debug("Transformed %d of %d colors: %s", len(palette), len(colors), transform)
+        return self.apply(palette)
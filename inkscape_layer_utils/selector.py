@@ -0,0 +1,141 @@
+# Copyright (C) 2024 twyleg
+import re
+from typing import TYPE_CHECKING, Iterable, List, Optional, Pattern, Union
+
+if TYPE_CHECKING:
+    from inkscape_layer_utils.image import Layer
+
+NEGATION_PREFIX = "!"
+REGEX_PREFIX = "re:"
+
+
+class SelectorError(Exception):
+    pass
+
+
+def _compile_glob(glob: str) -> Pattern[str]:
+    if not glob.startswith("/"):
+        raise SelectorError(f'Invalid selector "{glob}", layer path globs have to start with "/"')
+    pattern = ""
+    for segment in glob.strip("/").split("/") if glob != "/" else []:
+        if segment == "**":
+            pattern += "(?:/[^/]+)*"
+        elif "**" in segment:
+            raise SelectorError(f'Invalid selector "{glob}", "**" has to be a path segment of its own')
+        else:
+            pattern += "/" + "".join("[^/]*" if c == "*" else "[^/]" if c == "?" else re.escape(c) for c in segment)
+    return re.compile(pattern)
+
+
+class _Term:
+    __slots__ = ("negated", "pattern", "match_name")
+
+    def __init__(self, selector: str) -> None:
+        self.negated = selector.startswith(NEGATION_PREFIX)
+        if self.negated:
+            selector = selector[len(NEGATION_PREFIX) :]
+        self.match_name = selector.startswith(REGEX_PREFIX)
+        if self.match_name:
+            try:
+                self.pattern = re.compile(selector[len(REGEX_PREFIX) :])
+            except re.error as e:
+                raise SelectorError(f'Invalid regular expression in selector "{selector}": {e}')
+        else:
+            self.pattern = _compile_glob(selector)
+
+    def matches(self, layer_path: str, layer_name: str) -> bool:
+        if self.match_name:
+            return self.pattern.search(layer_name) is not None
+        # The root layer is matched as empty path, so "/**" matches it as well
+        return self.pattern.fullmatch("" if layer_path == "/" else layer_path) is not None
+
+
+class LayerSelector:
+    """
+    Compiled layer selector. A selector consists of one or more terms:
+
+    - Layer path globs: "*" and "?" match within a path segment (layer name), a "**" segment matches any number
+      of segments, e.g. "/face/**" (the layer "/face" and all its sublayers), "/*/eyes/*" or "/icon_*".
+    - Regular expressions searched in the layer name, prefixed with "re:", e.g. "re:^icon_\\d+$".
+    - Negations of the above, prefixed with "!", e.g. "!/face/nose".
+
+    A layer is selected if it matches any of the positive terms (or there are none) and none of the negations.
+    All terms are compiled once, a selection visits every layer only once.
+    """
+
+    def __init__(self, selectors: Union[str, Iterable[str]]) -> None:
+        """
+        Parameters
+        ----------
+        selectors: Union[str, Iterable[str]]
+            Term or terms of the selector.
+
+        Raises
+        ------
+        SelectorError
+            If a term is invalid.
+        """
+        self.selectors = [selectors] if isinstance(selectors, str) else list(selectors)
+        terms = [_Term(selector) for selector in self.selectors]
+        self._terms = [term for term in terms if not term.negated]
+        self._negated_terms = [term for term in terms if term.negated]
+
+    @classmethod
+    def compile(cls, selector: Union[str, List[str], "LayerSelector"]) -> "LayerSelector":
+        """
+        Compile a selector from a single term or a list of terms. Compiled selectors are returned as they are.
+        """
+        if isinstance(selector, LayerSelector):
+            return selector
+        return cls(selector)
+
+    def matches(self, layer_path: str, layer_name: Optional[str] = None) -> bool:
+        """
+        Check if a layer is selected.
+
+        Parameters
+        ----------
+        layer_path: str
+            Path of the layer.
+        layer_name: Optional[str]
+            Name of the layer. Determined from the path if not provided.
+
+        Returns
+        -------
+        bool
+            True if the layer is selected.
+        """
+        if layer_name is None:
+            layer_name = "/" if layer_path == "/" else layer_path.rsplit("/", 1)[1]
+        if self._terms and not any(term.matches(layer_path, layer_name) for term in self._terms):
+            return False
+        return not any(term.matches(layer_path, layer_name) for term in self._negated_terms)
+
+    def filter_paths(self, layer_paths: Iterable[str]) -> List[str]:
+        """
+        Get the selected layer paths of a list of layer paths (e.g. the result of Image.scan_layer_paths()).
+        """
+        return [layer_path for layer_path in layer_paths if self.matches(layer_path)]
+
+    def select(self, layer: "Layer") -> List["Layer"]:
+        """
+        Get the selected layers of a layer tree (the layer itself and all its sublayers) in a single traversal.
+
+        Parameters
+        ----------
+        layer: Layer
+            Layer to start the traversal at, usually the image.
+
+        Returns
+        -------
+        List[Layer]
+            Selected layers in the same order as Layer.get_all_layer_paths().
+        """
+        selected_layers: List["Layer"] = []
+        stack = [layer]
+        while stack:
+            layer = stack.pop()
+            if self.matches(layer.layer_path, layer.layer_name):
+                selected_layers.append(layer)
+            stack.extend(reversed(layer.layers.values()))
+        return selected_layers
@@ -0,0 +1,181 @@
+# Copyright (C) 2024 twyleg
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from inkscape_layer_utils.cache import ImageCache
+from inkscape_layer_utils.commands import STDIO_PATH, SUBCOMMANDS, CommandContext
+
+SOCKET_ENVIRONMENT_VARIABLE = "INKSCAPE_LAYER_UTILS_SOCKET"
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), f"inkscape_layer_utils-{os.getuid() if hasattr(os, 'getuid') else 0}.sock")
+
+# Subcommands the server executes on behalf of clients
+FORWARDABLE_SUBCOMMANDS = ["extract_layers", "list_layers", "recolor"]
+
+# Arguments of the forwardable subcommands that are paths and need to be resolved relative to the client's cwd
+PATH_ARGUMENTS = ["svg_files", "output", "depfile", "ninja", "archive", "sprite", "sprite_index", "store", "store_manifest"]
+
+LOGGING_FORMAT = "[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s]: %(message)s"
+LOGGING_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+logm = logging.getLogger(__name__)
+
+
+class ServerError(Exception):
+    pass
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="inkscape_layer_utils", exit_on_error=False, add_help=False)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command_name in FORWARDABLE_SUBCOMMANDS:
+        subcommand = SUBCOMMANDS[command_name]
+        subcommand.add_arguments(subparsers.add_parser(command_name, exit_on_error=False, add_help=False))
+    return parser
+
+
+def _resolve_paths(args: argparse.Namespace, cwd: str) -> None:
+    for argument in PATH_ARGUMENTS:
+        value = getattr(args, argument, None)
+        if isinstance(value, list):
+            setattr(args, argument, [os.path.join(cwd, path) for path in value])
+        elif isinstance(value, str):
+            setattr(args, argument, os.path.join(cwd, value))
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "LayerUtilsServer"
+
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+        output: List[str] = []
+        try:
+            exit_code = self.server.execute(request["argv"], request["cwd"], output)
+        except Exception as e:
+            logm.exception("Error while executing request: %s", request)
+            output.append(f"Error: {e}")
+            exit_code = 1
+        self.wfile.write(json.dumps({"output": output, "exit_code": exit_code}).encode() + b"\n")
+
+
+class LayerUtilsServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Long-lived server that executes forwarded extract_layers, list_layers and recolor calls. Parsed images are kept
+    in an ImageCache, so neither the interpreter startup nor the parsing of unchanged files is paid per call.
+
+    The protocol is one JSON object per line: the client sends {"argv": [...], "cwd": "..."}, the server replies
+    with {"output": [...], "exit_code": ...}.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, image_cache: ImageCache) -> None:
+        self.socket_path = Path(socket_path)
+        self.image_cache = image_cache
+        self.formatter = logging.Formatter(LOGGING_FORMAT, LOGGING_DATE_FORMAT)
+        if self.socket_path.is_socket():
+            self.socket_path.unlink()
+        super().__init__(str(self.socket_path), _RequestHandler)
+
+    def execute(self, argv: List[str], cwd: str, output: List[str]) -> int:
+        def log(level: int, fmt: str, *args: Any) -> None:
+            record = logging.LogRecord("inkscape_layer_utils", level, __file__, 0, fmt, args, None)
+            output.append(self.formatter.format(record))
+
+        try:
+            args = _create_parser().parse_args(argv)
+        except (argparse.ArgumentError, SystemExit) as e:
+            raise ServerError(f"Invalid arguments {argv}: {e}")
+
+        if getattr(args, "watch", False):
+            raise ServerError("Watch mode is not supported by the server")
+        # The server's stdin/stdout are not the client's, resolved as path "-" would become a file in the cwd
+        for argument in PATH_ARGUMENTS:
+            value = getattr(args, argument, None)
+            if value == STDIO_PATH or (isinstance(value, list) and STDIO_PATH in value):
+                raise ServerError(f'stdin/stdout ("{STDIO_PATH}") is not supported by the server')
+
+        _resolve_paths(args, cwd)
+        logm.info("Execute: %s", argv)
+        context = CommandContext(
+            load_image=self.image_cache.load,
+            print_line=output.append,
+            log_line=lambda fmt, *args: log(logging.INFO, fmt, *args),
+            log_error=lambda fmt, *args: log(logging.ERROR, fmt, *args),
+            flush_output=lambda: None,
+        )
+        return SUBCOMMANDS[args.command].handler(args, context)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.socket_path.is_socket():
+            self.socket_path.unlink()
+
+
+def _raise_keyboard_interrupt(signum: int, frame: Any) -> None:
+    raise KeyboardInterrupt()
+
+
+def serve(socket_path: Path, cache_size: int) -> int:
+    """
+    Run the server until it is interrupted or terminated.
+
+    Parameters
+    ----------
+    socket_path: Path
+        Unix socket to listen on.
+    cache_size: int
+        Approximate memory limit of the image cache in bytes.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        logm.error("Server mode requires Unix domain sockets, which are not available on this platform!")
+        return 1
+
+    with LayerUtilsServer(socket_path, ImageCache(max_bytes=cache_size)) as server:
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+        logm.info('Listening on "%s"', socket_path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logm.info("Shutting down")
+    return 0
+
+
+def forward(socket_path: Path, argv: List[str], cwd: Optional[str] = None) -> Tuple[List[str], int]:
+    """
+    Forward a call to a running server.
+
+    Parameters
+    ----------
+    socket_path: Path
+        Unix socket the server listens on.
+    argv: List[str]
+        Arguments of the call, starting with the subcommand.
+    cwd: Optional[str]
+        Working directory to resolve relative paths against. Defaults to the current working directory.
+
+    Returns
+    -------
+    Tuple[List[str], int]
+        Output lines and exit code of the call.
+
+    Raises
+    ------
+    OSError
+        If the server is not reachable.
+    """
+    request: Dict[str, Any] = {"argv": argv, "cwd": cwd or os.getcwd()}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+        client_socket.connect(str(socket_path))
+        with client_socket.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            response = json.loads(stream.readline())
+    return response["output"], response["exit_code"]
@@ -0,0 +1,284 @@
+# Copyright (C) 2024 twyleg
+import copy
+import json
+import logging
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+from xml.etree.ElementTree import Element, ElementTree
+
+from inkscape_layer_utils.image import unlink_stored_output
+from inkscape_layer_utils.minify import EDITOR_NAMESPACES, METADATA_TAG, SVG_NAMESPACE, write_minified
+
+if TYPE_CHECKING:
+    from inkscape_layer_utils.image import Image, Layer
+
+SVG_TAG = f"{{{SVG_NAMESPACE}}}svg"
+DEFS_TAG = f"{{{SVG_NAMESPACE}}}defs"
+SYMBOL_TAG = f"{{{SVG_NAMESPACE}}}symbol"
+USE_TAG = f"{{{SVG_NAMESPACE}}}use"
+XLINK_HREF_ATTRIBUTE = "{http://www.w3.org/1999/xlink}href"
+HREF_ATTRIBUTES = (XLINK_HREF_ATTRIBUTE, "href")
+
+INVALID_ID_CHARACTERS_PATTERN = re.compile(r"[^A-Za-z0-9_.-]")
+URL_REFERENCE_PATTERN = re.compile(r"url\(\s*#([^)\s]+)\s*\)")
+
+
+def get_symbol_id(base_name: str, layer_path: str) -> str:
+    """
+    Get the id of a layer's symbol, e.g. "base_name_face_eyes" for "/face/eyes". Follows the naming scheme of
+    the extracted layer files (see Image.get_layer_file_name()) with characters that aren't allowed in ids
+    replaced by "_".
+    """
+    symbol_id = INVALID_ID_CHARACTERS_PATTERN.sub("_", base_name if layer_path == "/" else f'{base_name}{layer_path.replace("/", "_")}')
+    return symbol_id if symbol_id[:1].isalpha() or symbol_id[:1] == "_" else f"_{symbol_id}"
+
+
+def _is_editor_only(element: Element) -> bool:
+    tag = element.tag
+    return not isinstance(tag, str) or tag == METADATA_TAG or (tag[0] == "{" and tag[1:].split("}", 1)[0] in EDITOR_NAMESPACES)
+
+
+def _serialize(element: Element) -> str:
+    tail = element.tail
+    element.tail = None
+    try:
+        return ET.tostring(element, encoding="unicode")
+    finally:
+        element.tail = tail
+
+
+def _rename_ids(root_element: Element, new_ids: Dict[str, str]) -> None:
+    def replace_url_reference(match: "re.Match[str]") -> str:
+        return f"url(#{new_ids[match.group(1)]})" if match.group(1) in new_ids else match.group(0)
+
+    for element in root_element.iter():
+        for key, value in element.items():
+            if key == "id":
+                if value in new_ids:
+                    element.set(key, new_ids[value])
+            elif key in HREF_ATTRIBUTES:
+                if value.startswith("#") and value[1:] in new_ids:
+                    element.set(key, f"#{new_ids[value[1:]]}")
+            elif "url(" in value:
+                element.set(key, URL_REFERENCE_PATTERN.sub(replace_url_reference, value))
+
+
+def _wrapper_element(layer_element: Element) -> Element:
+    # Ancestor layers appear in the symbols of all their sublayers, their ids would not be unique
+    return layer_element.makeelement(layer_element.tag, {key: value for key, value in layer_element.items() if key != "id"})
+
+
+class SpriteSheet:
+    """
+    Sprite sheet with one <symbol> per layer, to be referenced with <use href="sprite.svg#symbol_id" />.
+
+    Every symbol holds the layer's own content (its objects and groups, without its sublayers), wrapped into
+    copies of the layer's ancestor layer groups to keep their transforms and styles. Like the extracted file of
+    the root layer, the root layer's symbol shows the whole image: it references all other symbols of the image
+    with <use> elements, in document order of the layers. The symbols use the viewBox of the image, so they
+    render at the same position as the extracted layer files. The content of all <defs> elements is moved into
+    one shared <defs>, identical definitions are only added once.
+
+    Ids stay unique within the sheet: when an image uses ids that are already taken by a previously added image
+    (e.g. a different gradient with the same id), they are prefixed with the base name and all references to
+    them (url(#...) and href) are updated. Unless ids are renamed, the content elements are shared with the
+    source image, not copied. Don't modify the image until the sheet is saved.
+
+    Attributes
+    ----------
+    index: Dict[str, Dict[str, str]]
+        Symbol ids by layer path, by base name of the added images.
+
+    """
+
+    logm = logging.getLogger(f"{__name__}.spr")
+
+    def __init__(self) -> None:
+        self.root_element = Element(SVG_TAG)
+        self.defs_element = ET.SubElement(self.root_element, DEFS_TAG)
+        self.index: Dict[str, Dict[str, str]] = {}
+        self._ids: Set[str] = set()
+        # Serialized definitions by id and serialized definitions without id
+        self._definitions_by_id: Dict[str, str] = {}
+        self._definitions_without_id: Set[str] = set()
+
+    def _add_definitions(self, defs_element: Element) -> None:
+        for definition in defs_element:
+            definition_id = definition.get("id")
+            if definition_id is not None:
+                if definition_id in self._definitions_by_id:
+                    # Definitions with a taken id are either identical or renamed (see _rename_taken_ids())
+                    self.logm.debug("Skip duplicate definition: #%s", definition_id)
+                    continue
+                self._definitions_by_id[definition_id] = _serialize(definition)
+            else:
+                serialized_definition = _serialize(definition)
+                if serialized_definition in self._definitions_without_id:
+                    self.logm.debug("Skip duplicate definition: %s", serialized_definition[:80])
+                    continue
+                self._definitions_without_id.add(serialized_definition)
+            self.defs_element.append(definition)
+
+    def _get_unique_id(self, base_name: str, element_id: str, image_ids: Set[str]) -> str:
+        unique_id = get_symbol_id(base_name, f"/{element_id}")
+        suffix = 1
+        while unique_id in self._ids or unique_id in image_ids:
+            suffix += 1
+            unique_id = get_symbol_id(base_name, f"/{element_id}_{suffix}")
+        image_ids.add(unique_id)
+        return unique_id
+
+    def _rename_taken_ids(self, root_element: Element, base_name: str) -> Optional[Element]:
+        image_ids = {element_id for element_id in (element.get("id") for element in root_element.iter()) if element_id is not None}
+        if image_ids.isdisjoint(self._ids):
+            return None
+
+        root_element = copy.deepcopy(root_element)
+        definitions = [definition for defs_element in root_element.iter(DEFS_TAG) for definition in defs_element]
+        renamed_ids: Set[str] = set()
+        # Renaming an id changes the definitions referencing it, which then aren't identical anymore either
+        while True:
+            # Definitions identical to ones in the sheet are skipped, ids within them don't need to be renamed
+            deduplicated_ids: Set[str] = set()
+            for definition in definitions:
+                definition_id = definition.get("id")
+                serialized_definition = _serialize(definition)
+                if (
+                    serialized_definition == self._definitions_by_id.get(definition_id)
+                    if definition_id is not None
+                    else serialized_definition in self._definitions_without_id
+                ):
+                    deduplicated_ids.update(element.attrib["id"] for element in definition.iter() if "id" in element.attrib)
+
+            new_ids: Dict[str, str] = {}
+            for element in root_element.iter():
+                element_id = element.get("id")
+                if element_id is None or element_id not in self._ids or element_id in renamed_ids or element_id in deduplicated_ids:
+                    continue
+                new_ids[element_id] = self._get_unique_id(base_name, element_id, image_ids)
+            if not new_ids:
+                return root_element
+            self.logm.debug('Rename ids of image "%s": %s', base_name, new_ids)
+            _rename_ids(root_element, new_ids)
+            renamed_ids.update(new_ids.values())
+
+    @staticmethod
+    def _get_unique_symbol_id(base_name: str, layer_path: str, taken_ids: Set[str]) -> str:
+        # Different layer paths can map to the same id, e.g. "/a_b" and "/a/b"
+        symbol_id = get_symbol_id(base_name, layer_path)
+        unique_symbol_id = symbol_id
+        suffix = 1
+        while unique_symbol_id in taken_ids:
+            suffix += 1
+            unique_symbol_id = f"{symbol_id}_{suffix}"
+        taken_ids.add(unique_symbol_id)
+        return unique_symbol_id
+
+    def _add_symbol(self, symbol_id: str, layer_chain: List["Layer"], view_box: Optional[str]) -> Element:
+        symbol_element = ET.SubElement(self.root_element, SYMBOL_TAG, {"id": symbol_id})
+        if view_box is not None:
+            symbol_element.set("viewBox", view_box)
+
+        layer = layer_chain[-1]
+        content_parent = symbol_element
+        for ancestor_layer in layer_chain[1:]:
+            wrapper_element = _wrapper_element(ancestor_layer.layer_element)
+            content_parent.append(wrapper_element)
+            content_parent = wrapper_element
+
+        sublayer_elements = {sublayer.layer_element for sublayer in layer.layers.values()}
+        for child in layer.layer_element:
+            if child in sublayer_elements or _is_editor_only(child):
+                continue
+            if child.tag == DEFS_TAG:
+                self._add_definitions(child)
+            else:
+                content_parent.append(child)
+        return symbol_element
+
+    def add_image(self, image: "Image", base_name: str) -> Dict[str, str]:
+        """
+        Add a symbol for every layer of an image in a single pass over its layers.
+
+        Parameters
+        ----------
+        image: Image
+            Image to add.
+        base_name: str
+            Base name of the symbol ids, see get_symbol_id(). Symbol ids that are already taken get a suffix,
+            e.g. "base_name_face_eyes_2".
+
+        Returns
+        -------
+        Dict[str, str]
+            Symbol ids by layer path, in the same order as Image.get_all_layer_paths().
+
+        Raises
+        ------
+        ValueError
+            If an image with the same base name has already been added.
+        """
+        self.logm.debug('Add image "%s" to sprite sheet', base_name)
+        if base_name in self.index:
+            raise ValueError(f'An image with the base name "{base_name}" has already been added to the sprite sheet')
+        renamed_root_element = self._rename_taken_ids(image.layer_element, base_name)
+        if renamed_root_element is not None:
+            image = type(image)(ElementTree(renamed_root_element))
+        view_box = image.layer_element.get("viewBox")
+        symbol_ids_by_layer_path: Dict[str, str] = {}
+        taken_ids = self._ids | {element.attrib["id"] for element in image.layer_element.iter() if "id" in element.attrib}
+
+        stack: List[Tuple["Layer", List["Layer"]]] = [(image, [image])]
+        while stack:
+            layer, layer_chain = stack.pop()
+            symbol_id = self._get_unique_symbol_id(base_name, layer.layer_path, taken_ids)
+            symbol_element = self._add_symbol(symbol_id, layer_chain, view_box)
+            if layer is image:
+                root_symbol_element = symbol_element
+            symbol_ids_by_layer_path[layer.layer_path] = symbol_id
+            stack.extend((sublayer, layer_chain + [sublayer]) for sublayer in reversed(layer.layers.values()))
+
+        for layer_path, symbol_id in symbol_ids_by_layer_path.items():
+            if layer_path != "/":
+                ET.SubElement(root_symbol_element, USE_TAG, {XLINK_HREF_ATTRIBUTE: f"#{symbol_id}"})
+
+        for element in self.root_element.iter():
+            element_id = element.get("id")
+            if element_id is not None:
+                self._ids.add(element_id)
+
+        self.index[base_name] = symbol_ids_by_layer_path
+        return symbol_ids_by_layer_path
+
+    def save(self, file_path: Path, minify=False) -> None:
+        """
+        Save the sprite sheet to file.
+
+        Parameters
+        ----------
+        file_path: Path
+            File location to write the sprite sheet to.
+        minify: bool
+            Write a minified file, see Image.save().
+
+        Like with Image.save(), an existing file that links a stored object of a ContentStore is replaced.
+        """
+        self.logm.debug("Save sprite sheet to file: %s (minify=%s)", file_path, minify)
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        unlink_stored_output(Path(file_path))
+        element_tree = ElementTree(self.root_element)
+        if minify:
+            with open(file_path, "wb") as file_object:
+                write_minified(element_tree, file_object)
+        else:
+            element_tree.write(file_path)
+
+    def save_index(self, file_path: Path) -> None:
+        """
+        Save the index (symbol ids by layer path, by base name) as JSON file.
+        """
+        self.logm.debug("Save sprite sheet index to file: %s", file_path)
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(file_path).write_text(json.dumps(self.index, indent=4))
@@ -0,0 +1,125 @@
+# Copyright (C) 2024 twyleg
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from inkscape_layer_utils.image import DEFAULT_COMPRESSION_LEVEL
+
+
+class ContentStore:
+    """
+    Content-addressed store for extracted layer files. Every file is stored once under the SHA-256 digest of its
+    (uncompressed) content, e.g. "store/3f/3fa8...c2.svg", and hard-linked to its output locations. Identical
+    layers of many files therefore only take the disk space and write volume of one file.
+
+    Stored objects are made read-only, since writing to one of its links would modify all of them. Links are
+    replaced, never written to, by the store as well as by Image.save(), SpriteSheet.save() and LayerArchive
+    (see unlink_stored_output()). When hard links aren't possible (e.g. output and store on different file
+    systems), the object is copied instead. With link=False, no output files are created at all, the outputs
+    are only recorded in the manifest.
+
+    Attributes
+    ----------
+    store_dir: Path
+        Directory of the stored objects.
+    link: bool
+        Create hard links at the output locations.
+    manifest: Dict[str, str]
+        Stored object paths (relative to store_dir) by output path.
+    objects_written: int
+        Number of objects written to the store.
+    objects_reused: int
+        Number of outputs that reused an existing object.
+
+    """
+
+    logm = logging.getLogger(f"{__name__}.sto")
+
+    def __init__(self, store_dir: Path, link=True) -> None:
+        self.store_dir = Path(store_dir)
+        self.link = link
+        self.manifest: Dict[str, str] = {}
+        self.objects_written = 0
+        self.objects_reused = 0
+
+    def get_object_path(self, digest: str, compressed=False) -> Path:
+        """
+        Get the path of a stored object by the digest of its content.
+        """
+        return self.store_dir / digest[:2] / f'{digest}.{"svgz" if compressed else "svg"}'
+
+    def _write_object(self, object_path: Path, data: bytes, compress: bool, compression_level: int) -> None:
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name and renamed, so concurrent writers never see partial objects.
+        # The gzip header has no timestamp, compressed objects only depend on the content as well.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=object_path.parent, prefix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file_object:
+                file_object.write(gzip.compress(data, compression_level, mtime=0) if compress else data)
+            os.chmod(temporary_path, 0o444)
+            os.replace(temporary_path, object_path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def _link_object(self, object_path: Path, output_file_path: Path) -> None:
+        try:
+            if os.path.samefile(object_path, output_file_path):
+                return
+        except FileNotFoundError:
+            pass
+        output_file_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = output_file_path.with_name(f".tmp{os.getpid()}_{output_file_path.name}")
+        try:
+            os.link(object_path, temporary_path)
+        except OSError as e:
+            self.logm.debug('Unable to hard link "%s" (%s), copy it instead', object_path, e)
+            shutil.copyfile(object_path, temporary_path)
+        os.replace(temporary_path, output_file_path)
+
+    def put(self, data: bytes, output_file_path: Optional[Path] = None, compress=False, compression_level=DEFAULT_COMPRESSION_LEVEL) -> Path:
+        """
+        Store a file's content, unless it is stored already, and link it to its output location.
+
+        Parameters
+        ----------
+        data: bytes
+            Uncompressed content of the file.
+        output_file_path: Optional[Path]
+            Output location of the file.
+        compress: bool
+            Store the content gzip compressed (.svgz).
+        compression_level: int
+            Compression level from 1 (fastest) to 9 (smallest).
+
+        Returns
+        -------
+        Path
+            Path of the stored object.
+        """
+        object_path = self.get_object_path(hashlib.sha256(data).hexdigest(), compress)
+        if object_path.exists():
+            self.objects_reused += 1
+        else:
+            self.logm.debug('Store object "%s"', object_path)
+            self._write_object(object_path, data, compress, compression_level)
+            self.objects_written += 1
+
+        if output_file_path is not None:
+            self.manifest[str(output_file_path)] = object_path.relative_to(self.store_dir).as_posix()
+            if self.link:
+                self._link_object(object_path, Path(output_file_path))
+        return object_path
+
+    def save_manifest(self, file_path: Path) -> None:
+        """
+        Save the manifest (stored object paths by output path) as JSON file.
+        """
+        self.logm.debug("Save store manifest to file: %s", file_path)
+        Path(file_path).write_text(json.dumps({"store": str(self.store_dir), "files": self.manifest}, indent=4))
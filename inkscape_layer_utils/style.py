@@ -0,0 +1,197 @@
+# Copyright (C) 2024 twyleg
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional
+from xml.etree.ElementTree import Element
+
+if TYPE_CHECKING:
+    from inkscape_layer_utils.image import HirarchicalElement
+
+# Properties that are inherited from the parent element when they are not set on an element
+INHERITED_PROPERTIES = frozenset(
+    {
+        "clip-rule",
+        "color",
+        "color-interpolation",
+        "color-interpolation-filters",
+        "color-rendering",
+        "cursor",
+        "direction",
+        "dominant-baseline",
+        "fill",
+        "fill-opacity",
+        "fill-rule",
+        "font",
+        "font-family",
+        "font-size",
+        "font-size-adjust",
+        "font-stretch",
+        "font-style",
+        "font-variant",
+        "font-weight",
+        "image-rendering",
+        "letter-spacing",
+        "marker",
+        "marker-end",
+        "marker-mid",
+        "marker-start",
+        "paint-order",
+        "pointer-events",
+        "shape-rendering",
+        "stroke",
+        "stroke-dasharray",
+        "stroke-dashoffset",
+        "stroke-linecap",
+        "stroke-linejoin",
+        "stroke-miterlimit",
+        "stroke-opacity",
+        "stroke-width",
+        "text-anchor",
+        "text-rendering",
+        "visibility",
+        "word-spacing",
+        "writing-mode",
+    }
+)
+
+# Properties that can be set as presentation attributes, e.g. <path fill="#ff0000" />
+PRESENTATION_ATTRIBUTES = INHERITED_PROPERTIES | {
+    "alignment-baseline",
+    "baseline-shift",
+    "clip-path",
+    "display",
+    "filter",
+    "flood-color",
+    "flood-opacity",
+    "lighting-color",
+    "mask",
+    "opacity",
+    "overflow",
+    "stop-color",
+    "stop-opacity",
+    "text-decoration",
+    "transform-origin",
+    "unicode-bidi",
+}
+
+INHERIT_VALUE = "inherit"
+
+
+def parse_style(style: str) -> Dict[str, str]:
+    """
+    Parse the declarations of a style attribute, e.g. "fill:#ff0000;stroke:none" -> {"fill": "#ff0000",
+    "stroke": "none"}. Empty declarations (e.g. of a trailing ";") are ignored, values may contain ":".
+    """
+    declarations: Dict[str, str] = {}
+    for declaration in style.split(";"):
+        key, separator, value = declaration.partition(":")
+        key = key.strip()
+        if separator and key:
+            declarations[key] = value.strip()
+    return declarations
+
+
+def format_style(declarations: Dict[str, str]) -> str:
+    """
+    Format declarations as style attribute, see parse_style().
+    """
+    return ";".join(f"{key}:{value}" for key, value in declarations.items())
+
+
+def get_declared_style(element: Element) -> Dict[str, str]:
+    """
+    Get the properties set on an element: presentation attributes overridden by the style attribute.
+    """
+    declarations = {key: value for key, value in element.attrib.items() if key in PRESENTATION_ATTRIBUTES}
+    style = element.get("style")
+    if style:
+        declarations.update(parse_style(style))
+    return declarations
+
+
+def compute_style(element: Element, parent_style: Dict[str, str]) -> Dict[str, str]:
+    """
+    Compute the effective style of an element from its declared style and the computed style of its parent.
+
+    Parameters
+    ----------
+    element: Element
+        Element to compute the style of.
+    parent_style: Dict[str, str]
+        Computed style of the parent element.
+
+    Returns
+    -------
+    Dict[str, str]
+        Effective properties of the element. Properties set nowhere in the cascade are missing, no initial values
+        are added.
+    """
+    computed_style = {key: value for key, value in parent_style.items() if key in INHERITED_PROPERTIES}
+    for key, value in get_declared_style(element).items():
+        if value == INHERIT_VALUE:
+            if key in parent_style:
+                computed_style[key] = parent_style[key]
+            else:
+                computed_style.pop(key, None)
+        else:
+            computed_style[key] = value
+    return computed_style
+
+
+class ComputedStyles:
+    """
+    Cache of the computed (effective) styles of the layers, groups and objects of an image: inline style,
+    presentation attributes and the styles inherited from their ancestors. Styles are computed on demand, the
+    style of an element is computed from the cached style of its parent, so computing the styles of all elements
+    of a subtree visits every element only once.
+
+    Every modification through the image's API (see HirarchicalElement._make_writable()) invalidates the cached
+    styles of the modified element and its descendants. Call clear() after modifying the elements directly.
+
+    Use Image.computed_styles instead of creating an instance.
+
+    """
+
+    logm = logging.getLogger(f"{__name__}.sty")
+
+    def __init__(self) -> None:
+        self._computed_styles: Dict["HirarchicalElement", Dict[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._computed_styles)
+
+    def get(self, wrapper: "HirarchicalElement") -> Dict[str, str]:
+        """
+        Get the computed style of a layer, group or object. The returned dict is shared, don't modify it.
+        """
+        computed_style = self._computed_styles.get(wrapper)
+        if computed_style is not None:
+            return computed_style
+
+        uncached_wrappers: List["HirarchicalElement"] = []
+        ancestor: Optional["HirarchicalElement"] = wrapper
+        while ancestor is not None and ancestor not in self._computed_styles:
+            uncached_wrappers.append(ancestor)
+            ancestor = ancestor.parent
+        computed_style = self._computed_styles[ancestor] if ancestor is not None else {}
+        for uncached_wrapper in reversed(uncached_wrappers):
+            computed_style = compute_style(uncached_wrapper._get_element(), computed_style)
+            self._computed_styles[uncached_wrapper] = computed_style
+        return computed_style
+
+    def invalidate(self, wrapper: "HirarchicalElement") -> None:
+        """
+        Drop the cached styles of a layer, group or object and all its descendants.
+        """
+        # Styles are cached from the root down, descendants of an uncached element aren't cached either
+        stack = [wrapper]
+        while stack:
+            wrapper = stack.pop()
+            if self._computed_styles.pop(wrapper, None) is not None:
+                for attribute in ("layers", "groups", "objects"):
+                    stack.extend(getattr(wrapper, attribute, {}).values())
+
+    def clear(self) -> None:
+        """
+        Drop all cached styles.
+        """
+        self._computed_styles.clear()
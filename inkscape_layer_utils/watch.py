@@ -0,0 +1,228 @@
+# Copyright (C) 2024 twyleg
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from inkscape_layer_utils.image import DEFAULT_COMPRESSION_LEVEL, Image
+
+logm = logging.getLogger(__name__)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+# Time to wait for further events after a change was detected, since editors often write files in several steps
+SETTLE_TIME = 0.1
+
+
+class PollingFileWatcher:
+    """
+    Detects changed files by comparing their modification time and size periodically.
+    """
+
+    def __init__(self, file_paths: List[Path], interval: float = 1.0) -> None:
+        self.file_paths = [Path(file_path).resolve() for file_path in file_paths]
+        self.interval = interval
+        self._states: Dict[Path, Optional[Tuple[int, int]]] = {file_path: self.__state(file_path) for file_path in self.file_paths}
+
+    @staticmethod
+    def __state(file_path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = file_path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def check(self) -> List[Path]:
+        """
+        Get the files that changed since the last check.
+        """
+        changed_file_paths: List[Path] = []
+        for file_path in self.file_paths:
+            state = self.__state(file_path)
+            if state != self._states[file_path]:
+                self._states[file_path] = state
+                if state is not None:
+                    changed_file_paths.append(file_path)
+        return changed_file_paths
+
+    def wait(self) -> List[Path]:
+        """
+        Block until at least one file changed and return the changed files.
+        """
+        while True:
+            time.sleep(self.interval)
+            changed_file_paths = self.check()
+            if changed_file_paths:
+                return changed_file_paths
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyFileWatcher:
+    """
+    Detects changed files with Linux' inotify. The parent directories of the files are watched, so files replaced
+    by editors (write to temporary file and rename) are detected as well.
+    """
+
+    def __init__(self, file_paths: List[Path]) -> None:
+        self.file_paths = {Path(file_path).resolve() for file_path in file_paths}
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._directories_by_watch_descriptor: Dict[int, Path] = {}
+        for directory in {file_path.parent for file_path in self.file_paths}:
+            watch_descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+            if watch_descriptor < 0:
+                self.close()
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for "{directory}"')
+            self._directories_by_watch_descriptor[watch_descriptor] = directory
+
+    def __read_events(self, timeout: Optional[float]) -> Set[Path]:
+        changed_file_paths: Set[Path] = set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return changed_file_paths
+
+        buffer = os.read(self._fd, 64 * 1024)
+        offset = 0
+        while offset < len(buffer):
+            watch_descriptor, _, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT_HEADER.size
+            name = buffer[offset : offset + name_length].rstrip(b"\0")
+            offset += name_length
+
+            directory = self._directories_by_watch_descriptor.get(watch_descriptor)
+            if directory is not None and name:
+                file_path = directory / os.fsdecode(name)
+                if file_path in self.file_paths:
+                    changed_file_paths.add(file_path)
+        return changed_file_paths
+
+    def wait(self) -> List[Path]:
+        """
+        Block until at least one file changed and return the changed files.
+        """
+        while True:
+            changed_file_paths = self.__read_events(None)
+            if changed_file_paths:
+                while True:
+                    further_changed_file_paths = self.__read_events(SETTLE_TIME)
+                    if not further_changed_file_paths:
+                        break
+                    changed_file_paths |= further_changed_file_paths
+                return sorted(changed_file_paths)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_file_watcher(file_paths: List[Path], poll_interval: float = 1.0) -> "InotifyFileWatcher | PollingFileWatcher":
+    """
+    Create an inotify based file watcher when available (Linux), or a polling file watcher otherwise.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyFileWatcher(file_paths)
+        except (OSError, AttributeError) as e:
+            logm.debug("inotify not available, falling back to polling: %s", e)
+    return PollingFileWatcher(file_paths, poll_interval)
+
+
+class LayerExtractionWatcher:
+    """
+    Keeps the extracted layer files of SVG images up-to-date. On every update of a file, only the output files of
+    layers whose content changed (see Image.get_layer_digests()) are extracted and written again. Output files of
+    layers that no longer exist are removed.
+    """
+
+    def __init__(self, output_dir: Path, compress=False, compression_level=DEFAULT_COMPRESSION_LEVEL, minify=False) -> None:
+        self.output_dir = Path(output_dir)
+        self.compress = compress
+        self.compression_level = compression_level
+        self.minify = minify
+        self._layer_digests_by_file_path: Dict[Path, Dict[str, str]] = {}
+
+    def update(self, svg_file_path: Path) -> List[str]:
+        """
+        Parse an SVG file and (re-)write the output files of its changed layers.
+
+        Parameters
+        ----------
+        svg_file_path: Path
+            SVG file to update the extracted layers of.
+
+        Returns
+        -------
+        List[str]
+            Paths of the layers that were written.
+        """
+        svg_file_path = Path(svg_file_path)
+        base_name = svg_file_path.stem
+        image = Image.load_from_file(svg_file_path)
+        layer_digests = image.get_layer_digests()
+        previous_layer_digests = self._layer_digests_by_file_path.get(svg_file_path, {})
+
+        changed_layer_paths = [layer_path for layer_path, digest in layer_digests.items() if previous_layer_digests.get(layer_path) != digest]
+        image.extract_layers_to_file(self.output_dir, base_name, changed_layer_paths, self.compress, self.compression_level, self.minify)
+
+        for removed_layer_path in previous_layer_digests.keys() - layer_digests.keys():
+            output_file_path = self.output_dir / Image.get_layer_file_name(base_name, removed_layer_path, self.compress)
+            logm.debug('Layer "%s" removed, deleting "%s"', removed_layer_path, output_file_path)
+            output_file_path.unlink(missing_ok=True)
+
+        self._layer_digests_by_file_path[svg_file_path] = layer_digests
+        logm.info('Updated "%s": %d of %d layers written', svg_file_path, len(changed_layer_paths), len(layer_digests))
+        return changed_layer_paths
+
+
+def watch_and_extract(
+    svg_file_paths: List[Path], output_dir: Path, poll_interval: float = 1.0, compress=False, compression_level=DEFAULT_COMPRESSION_LEVEL, minify=False
+) -> None:
+    """
+    Extract all layers of the given SVG files and keep the extracted files up-to-date until interrupted.
+
+    Parameters
+    ----------
+    svg_file_paths: List[Path]
+        SVG files to watch.
+    output_dir: Path
+        Output directory for the extracted layers.
+    poll_interval: float
+        Interval in seconds to check the files for changes when inotify is not available.
+    compress: bool
+        Write gzip compressed files (.svgz).
+    compression_level: int
+        Compression level from 1 (fastest) to 9 (smallest).
+    minify: bool
+        Write minified files, see Image.save().
+    """
+    extraction_watcher = LayerExtractionWatcher(output_dir, compress, compression_level, minify)
+    resolved_file_paths = [Path(svg_file_path).resolve() for svg_file_path in svg_file_paths]
+    for svg_file_path in resolved_file_paths:
+        extraction_watcher.update(svg_file_path)
+
+    file_watcher = create_file_watcher(resolved_file_paths, poll_interval)
+    logm.info("Watching %d file(s) for changes (%s)", len(resolved_file_paths), type(file_watcher).__name__)
+    try:
+        while True:
+            for changed_file_path in file_watcher.wait():
+                try:
+                    extraction_watcher.update(changed_file_path)
+                except Exception as e:
+                    logm.error('Failed to update "%s": %s', changed_file_path, e)
+    finally:
+        file_watcher.close()
@@ -29,6 +29,10 @@ setup(
     install_requires=[
         "simple-python-app>=0.4.0",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+        "zstd": ["zstandard"],
+    },
     entry_points={
         "console_scripts": [
             "inkscape_layer_utils = inkscape_layer_utils.main:main",
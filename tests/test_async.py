@@ -0,0 +1,64 @@
+# Copyright (C) 2024 twyleg
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from inkscape_layer_utils.image import Image, set_async_executor
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+TEST_IMAGE_FILE_PATH = FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg"
+
+
+class AsyncTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(TEST_IMAGE_FILE_PATH, *args, **kwargs)
+
+    def test_File_Aload_SameImageAsLoadFromFile(self):
+        image = asyncio.run(Image.aload(TEST_IMAGE_FILE_PATH))
+
+        self.assert_image_element_trees_equal(self.test_image.layer_element, image.layer_element)
+
+    def test_Image_AextractLayersAndAsave_SameFileAsSynchronousApi(self):
+        async def extract_and_save() -> None:
+            extracted_image = await self.test_image.aextract_layers(["/face/eyes"], preserve_layer_paths=False)
+            await extracted_image.asave(self.output_dir_path / "async.svg")
+
+        asyncio.run(extract_and_save())
+
+        self.test_image.extract_layers(["/face/eyes"], preserve_layer_paths=False).save(self.output_dir_path / "sync.svg")
+        self.assert_images_from_file_equal(self.output_dir_path / "sync.svg", self.output_dir_path / "async.svg")
+
+    def test_Image_AextractAllLayersToFile_SameFilesAsSynchronousApi(self):
+        extracted_layer_file_paths = self.test_image.extract_all_layers_to_file(self.output_dir_path / "sync", "image")
+
+        async_extracted_layer_file_paths = asyncio.run(self.test_image.aextract_all_layers_to_file(self.output_dir_path / "async", "image"))
+
+        self.assertEqual(list(extracted_layer_file_paths.keys()), list(async_extracted_layer_file_paths.keys()))
+        for layer_path, file_path in extracted_layer_file_paths.items():
+            self.assertEqual(file_path.read_bytes(), async_extracted_layer_file_paths[layer_path].read_bytes())
+
+    def test_ConfiguredExecutor_Aload_ExecutorUsed(self):
+        thread_names = []
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="image_loader") as executor:
+            set_async_executor(executor)
+            try:
+                asyncio.run(Image.aload(TEST_IMAGE_FILE_PATH, progress=lambda parsed_size, total_size: thread_names.append(threading.current_thread().name)))
+            finally:
+                set_async_executor(None)
+
+        self.assertTrue(thread_names)
+        self.assertTrue(all(thread_name.startswith("image_loader") for thread_name in thread_names))
+
+
+if __name__ == "__main__":
+    unittest.main()
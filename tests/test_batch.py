@@ -0,0 +1,122 @@
+# Copyright (C) 2024 twyleg
+import argparse
+import json
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List
+
+from inkscape_layer_utils.batch import BatchError, load_manifest, run_jobs
+from inkscape_layer_utils.commands import CommandContext, handle_batch
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class BatchTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def write_manifest(self, jobs: List[Dict[str, Any]]) -> Path:
+        manifest_path = self.output_dir_path / "manifest.json"
+        manifest_path.write_text(json.dumps({"jobs": jobs}))
+        return manifest_path
+
+    def test_ValidManifest_LoadManifest_PathsResolvedRelativeToManifest(self):
+        manifest_path = self.write_manifest([{"source": "image.svg", "operation": "extract_all_layers", "output": "layers"}])
+
+        jobs = load_manifest(manifest_path)
+
+        self.assertEqual(1, len(jobs))
+        self.assertEqual("job1", jobs[0].name)
+        self.assertEqual(self.output_dir_path / "image.svg", jobs[0].source)
+        self.assertEqual(self.output_dir_path / "layers", jobs[0].options["output"])
+        self.assertEqual("image", jobs[0].options["base_name"])
+
+    def test_UnknownOperation_LoadManifest_BatchErrorRaised(self):
+        manifest_path = self.write_manifest([{"source": "image.svg", "operation": "unknown", "output": "out.svg"}])
+        with self.assertRaises(BatchError):
+            load_manifest(manifest_path)
+
+    def test_MissingOption_LoadManifest_BatchErrorRaised(self):
+        manifest_path = self.write_manifest([{"source": "image.svg", "operation": "extract_layers", "output": "out.svg"}])
+        with self.assertRaises(BatchError):
+            load_manifest(manifest_path)
+
+    def test_JobsOfSameSource_RunJobs_SourceParsedOnceAndAllJobsExecuted(self):
+        source = str(self.test_image_path)
+        manifest_path = self.write_manifest(
+            [
+                {"name": "eyes", "source": source, "operation": "extract_layers", "layers": ["/face/eyes/right"], "output": "eyes.svg"},
+                {
+                    "name": "red",
+                    "source": source,
+                    "operation": "recolor",
+                    "layers": ["/face/eyes"],
+                    "fill": "#ff0000",
+                    "recursive": True,
+                    "force": True,
+                    "output": "red.svg",
+                },
+                {"name": "hidden", "source": source, "operation": "set_visibility", "layers": {"/outline": False}, "output": "hidden.svg"},
+                {"name": "all", "source": source, "operation": "extract_all_layers", "output": "layers"},
+            ]
+        )
+
+        source_results = run_jobs(load_manifest(manifest_path), workers=1)
+
+        self.assertEqual(1, len(source_results))
+        self.assertEqual(["eyes", "red", "hidden", "all"], [job_result.name for job_result in source_results[0].job_results])
+        self.assertEqual([None] * 4, [job_result.error for job_result in source_results[0].job_results])
+        self.assert_images_from_file_equal(
+            FILE_PATH / "resources/expected_images/test_image_layer_extraction_extracted_single_layer_by_path_with_layer_path_preservation.svg",
+            self.output_dir_path / "eyes.svg",
+        )
+        self.assertIn("fill:#ff0000", (self.output_dir_path / "red.svg").read_text())
+        self.assertNotIn("fill:#ff0000", (self.output_dir_path / "hidden.svg").read_text())
+        self.assertIn("display:none", (self.output_dir_path / "hidden.svg").read_text())
+        self.assertTrue((self.output_dir_path / "layers/test_image_layer_extraction_0_face_nose.svg").exists())
+
+    def test_JobWithUnknownLayer_RunJobsWithWorkerPool_OnlyFailingJobReportsError(self):
+        manifest_path = self.write_manifest(
+            [
+                {"name": "unknown", "source": str(self.test_image_path), "operation": "extract_layers", "layers": ["/unknown"], "output": "a.svg"},
+                {"name": "known", "source": str(self.test_image_path), "operation": "extract_layers", "layers": ["/face"], "output": "b.svg"},
+                {"name": "missing", "source": "missing.svg", "operation": "extract_all_layers", "output": "layers"},
+            ]
+        )
+
+        source_results = run_jobs(load_manifest(manifest_path), workers=2)
+
+        self.assertEqual(2, len(source_results))
+        self.assertIsNotNone(source_results[0].job_results[0].error)
+        self.assertIsNone(source_results[0].job_results[1].error)
+        self.assertIsNotNone(source_results[1].error)
+        self.assertTrue((self.output_dir_path / "b.svg").exists())
+
+    def test_SourceWithMultipleJobsMissing_HandleBatch_AllJobsOfSourceCountedAsFailed(self):
+        manifest_path = self.write_manifest(
+            [
+                {"name": "known", "source": str(self.test_image_path), "operation": "extract_layers", "layers": ["/face"], "output": "a.svg"},
+                {"name": "missing_1", "source": "missing.svg", "operation": "extract_all_layers", "output": "layers"},
+                {"name": "missing_2", "source": "missing.svg", "operation": "extract_layers", "layers": ["/face"], "output": "b.svg"},
+            ]
+        )
+        errors = []
+
+        exit_code = handle_batch(
+            argparse.Namespace(manifest=str(manifest_path), workers=1),
+            CommandContext(log_line=lambda fmt, *args: None, log_error=lambda fmt, *args: errors.append(fmt % args)),
+        )
+
+        self.assertEqual(1, exit_code)
+        self.assertEqual(["2 of 3 job(s) failed"], errors)
+
+
+if __name__ == "__main__":
+    unittest.main()
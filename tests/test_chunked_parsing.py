@@ -0,0 +1,64 @@
+# Copyright (C) 2024 twyleg
+import gzip
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from inkscape_layer_utils.image import Image, parse_svg_buffer
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+TEST_IMAGE_FILE_PATH = FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg"
+
+
+class ChunkedParsingTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(TEST_IMAGE_FILE_PATH, *args, **kwargs)
+
+    def test_Bytes_LoadFromBytes_SameImageAsLoadedFromFile(self):
+        image = Image.load_from_bytes(TEST_IMAGE_FILE_PATH.read_bytes())
+
+        self.assert_image_element_trees_equal(self.test_image.layer_element, image.layer_element)
+        self.assertEqual(self.test_image.get_all_layer_paths(), image.get_all_layer_paths())
+
+    def test_File_LoadFromFileWithProgress_ProgressReportedUpToFileSize(self):
+        progress = []
+
+        Image.load_from_file(TEST_IMAGE_FILE_PATH, progress=lambda parsed_size, total_size: progress.append((parsed_size, total_size)))
+
+        file_size = TEST_IMAGE_FILE_PATH.stat().st_size
+        self.assertEqual((file_size, file_size), progress[-1])
+
+    def test_Bytearray_ParseInSmallChunks_EveryChunkReportedAndTreeParsed(self):
+        data = bytearray(TEST_IMAGE_FILE_PATH.read_bytes())
+        progress = []
+
+        element_tree = parse_svg_buffer(data, lambda parsed_size, total_size: progress.append(parsed_size), chunk_size=1000)
+
+        self.assertEqual(list(range(1000, len(data), 1000)) + [len(data)], progress)
+        self.assertEqual(ET.tostring(self.test_image.element_tree.getroot()), ET.tostring(element_tree.getroot()))
+
+    def test_MultiMemberGzipData_LoadFromBytes_AllMembersDecompressed(self):
+        data = TEST_IMAGE_FILE_PATH.read_bytes()
+        compressed_data = memoryview(gzip.compress(data[:2000]) + gzip.compress(data[2000:]))
+
+        image = Image.load_from_bytes(compressed_data)
+
+        self.assertEqual(self.test_image.get_all_layer_paths(), image.get_all_layer_paths())
+
+    def test_EmptyFile_LoadFromFile_ParseErrorRaised(self):
+        empty_file_path = self.output_dir_path / "empty.svg"
+        empty_file_path.touch()
+
+        with self.assertRaises(ET.ParseError):
+            Image.load_from_file(empty_file_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
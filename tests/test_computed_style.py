@@ -0,0 +1,119 @@
+# Copyright (C) 2024 twyleg
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.image import Image
+from inkscape_layer_utils.style import format_style, parse_style
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+STYLE_TEST_SVG = """<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" id="svg1">
+  <g id="layer1" inkscape:groupmode="layer" inkscape:label="face" style="fill:#ff0000;stroke:#000000;opacity:0.5;">
+    <path id="inherited" d="M 0,0 H 1" />
+    <path id="attribute" fill="#00ff00" d="M 0,0 H 2" />
+    <path id="inline" fill="#00ff00" style="fill:#0000ff" d="M 0,0 H 3" />
+    <path id="none" style="fill:none;stroke:inherit" d="M 0,0 H 4" />
+    <g id="group1" stroke="#333333">
+      <path id="nested" d="M 0,0 H 5" />
+    </g>
+    <g id="layer2" inkscape:groupmode="layer" inkscape:label="eyes">
+      <text id="text1" style="fill:#ff0000"><tspan id="tspan1">eyes</tspan></text>
+    </g>
+  </g>
+</svg>
+"""
+
+
+class ComputedStyleTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.style_image = Image.load_from_string(STYLE_TEST_SVG)
+        self.face_layer = self.style_image.get_layer_by_path("/face")
+
+    def test_StyleWithTrailingSemicolon_Parse_EmptyDeclarationsIgnored(self):
+        style = parse_style("fill:#ff0000; stroke : none;;filter:url(#filter:1);")
+
+        self.assertEqual({"fill": "#ff0000", "stroke": "none", "filter": "url(#filter:1)"}, style)
+        self.assertEqual("fill:#ff0000;stroke:none", format_style({"fill": "#ff0000", "stroke": "none"}))
+
+    def test_Objects_GetComputedStyle_InlineOverridesAttributeOverridesInherited(self):
+        self.assertEqual({"fill": "#ff0000", "stroke": "#000000"}, self.face_layer.objects["inherited"].get_computed_style())
+        self.assertEqual("#00ff00", self.face_layer.objects["attribute"].get_computed_style()["fill"])
+        self.assertEqual("#0000ff", self.face_layer.objects["inline"].get_computed_style()["fill"])
+        self.assertEqual({"fill": "none", "stroke": "#000000"}, self.face_layer.objects["none"].get_computed_style())
+        self.assertEqual({"fill": "#ff0000", "stroke": "#333333"}, self.face_layer.groups["group1"].objects["nested"].get_computed_style())
+        self.assertEqual("0.5", self.face_layer.get_computed_style()["opacity"])
+
+    def test_ComputedStyles_GetTwice_StyleCachedOnceForObjectAndAncestors(self):
+        nested_object = self.face_layer.groups["group1"].objects["nested"]
+
+        computed_style = nested_object.get_computed_style()
+
+        self.assertIs(computed_style, nested_object.get_computed_style())
+        self.assertEqual(4, len(self.style_image.computed_styles))
+
+    def test_CachedStyles_ModifyLayerStyle_DescendantStylesInvalidated(self):
+        nested_object = self.face_layer.groups["group1"].objects["nested"]
+        self.assertEqual("#ff0000", nested_object.get_computed_style()["fill"])
+
+        self.face_layer._make_writable().set("style", "fill:#123456")
+
+        # Only the style of the root layer (the image) stays cached
+        self.assertEqual(1, len(self.style_image.computed_styles))
+        self.assertEqual("#123456", nested_object.get_computed_style()["fill"])
+
+    def test_InheritedAndAttributeFills_FillAllObjects_EffectivelyFilledObjectsRecolored(self):
+        self.face_layer.fill_all_objects("#abcdef", recursive=True)
+
+        self.assertEqual("fill:#abcdef", self.face_layer.objects["inherited"].object_element.get("style"))
+        self.assertEqual("#abcdef", self.face_layer.objects["attribute"].object_element.get("fill"))
+        self.assertEqual("fill:#abcdef", self.face_layer.objects["inline"].object_element.get("style"))
+        self.assertEqual("fill:none;stroke:inherit", self.face_layer.objects["none"].object_element.get("style"))
+        self.assertEqual("#abcdef", self.face_layer.groups["group1"].objects["nested"].get_computed_style()["fill"])
+        text_object = self.face_layer.layers["eyes"].objects["text1"]
+        self.assertEqual("fill:#abcdef", text_object.object_element.get("style"))
+        self.assertIsNone(text_object.objects["tspan1"].object_element.get("style"))
+        self.assertEqual("#abcdef", text_object.objects["tspan1"].get_computed_style()["fill"])
+
+    def test_InheritedAndAttributeFills_FillAllObjectsForced_AllObjectsRecolored(self):
+        self.face_layer.fill_all_objects("#abcdef", force=True, recursive=True)
+
+        self.assertEqual("fill:#abcdef", self.face_layer.objects["inherited"].object_element.get("style"))
+        self.assertEqual("#abcdef", self.face_layer.objects["attribute"].object_element.get("fill"))
+        self.assertEqual("fill:#abcdef", self.face_layer.objects["inline"].object_element.get("style"))
+        self.assertEqual("fill:#abcdef;stroke:inherit", self.face_layer.objects["none"].object_element.get("style"))
+        self.assertEqual("#abcdef", self.face_layer.groups["group1"].objects["nested"].get_computed_style()["fill"])
+        self.assertEqual("#abcdef", self.face_layer.layers["eyes"].objects["text1"].objects["tspan1"].get_computed_style()["fill"])
+
+    def test_ForkedImage_FillAllObjects_OriginalStylesUnchanged(self):
+        self.assertEqual("#ff0000", self.face_layer.objects["inherited"].get_computed_style()["fill"])
+        forked_image = self.style_image.fork()
+
+        forked_image.get_layer_by_path("/face").fill_all_objects("#abcdef")
+
+        self.assertEqual("#abcdef", forked_image.get_layer_by_path("/face").objects["inherited"].get_computed_style()["fill"])
+        self.assertEqual("#ff0000", self.face_layer.objects["inherited"].get_computed_style()["fill"])
+        self.assertIsNone(self.face_layer.objects["inherited"].object_element.get("style"))
+
+    def test_Layer_FindObjectsByStyle_ObjectsWithEffectiveValueFound(self):
+        self.assertEqual(["nested", "inherited"], [object.id for object in self.face_layer.find_objects_by_style("fill", "#ff0000")])
+        self.assertEqual(
+            ["nested", "inherited", "text1", "tspan1"], [object.id for object in self.face_layer.find_objects_by_style("fill", "#ff0000", recursive=True)]
+        )
+        self.assertEqual(["nested"], [object.id for object in self.face_layer.find_objects_by_style("stroke", "#333333")])
+        self.assertEqual(7, len(self.face_layer.find_objects_by_style("fill", recursive=True)))
+
+
+if __name__ == "__main__":
+    unittest.main()
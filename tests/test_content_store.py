@@ -0,0 +1,114 @@
+# Copyright (C) 2024 twyleg
+import gzip
+import json
+import os
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.sprite import SpriteSheet
+from inkscape_layer_utils.store import ContentStore
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class ContentStoreTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def test_TwoIdenticalImages_ExtractAllLayersToStore_EveryLayerStoredOnceAndHardLinked(self):
+        store = ContentStore(self.output_dir_path / "store")
+        output_dir_path = self.output_dir_path / "output"
+
+        first_file_paths = self.test_image.extract_all_layers_to_store(store, output_dir_path, "first")
+        second_file_paths = self.prepare_test_image().extract_all_layers_to_store(store, output_dir_path, "second")
+
+        layer_count = len(self.test_image.get_all_layer_paths())
+        self.assertEqual(layer_count, store.objects_written)
+        self.assertEqual(layer_count, store.objects_reused)
+        self.assertEqual(layer_count, len(list((self.output_dir_path / "store").glob("*/*.svg"))))
+        for layer_path, first_file_path in first_file_paths.items():
+            self.assertTrue(os.path.samefile(first_file_path, second_file_paths[layer_path]))
+
+    def test_Image_ExtractAllLayersToStore_SameContentAsExtractAllLayersToFile(self):
+        extracted_layer_file_paths = self.test_image.extract_all_layers_to_file(self.output_dir_path / "files", "image")
+
+        stored_layer_file_paths = self.test_image.extract_all_layers_to_store(
+            ContentStore(self.output_dir_path / "store"), self.output_dir_path / "links", "image"
+        )
+
+        for layer_path, file_path in extracted_layer_file_paths.items():
+            self.assertEqual(file_path.read_bytes(), stored_layer_file_paths[layer_path].read_bytes())
+
+    def test_StoreWithoutLinks_ExtractAllLayersToStoreCompressed_OnlyManifestWritten(self):
+        store = ContentStore(self.output_dir_path / "store", link=False)
+
+        stored_layer_file_paths = self.test_image.extract_all_layers_to_store(store, self.output_dir_path / "links", "image", compress=True)
+        store.save_manifest(self.output_dir_path / "manifest.json")
+
+        manifest = json.loads((self.output_dir_path / "manifest.json").read_text())
+        self.assertFalse((self.output_dir_path / "links").exists())
+        object_path = store.store_dir / manifest["files"][str(stored_layer_file_paths["/face"])]
+        self.assertEqual(".svgz", object_path.suffix)
+        buffer_path = self.output_dir_path / "face.svg"
+        self.test_image.extract_layer("/face").save(buffer_path)
+        self.assertEqual(buffer_path.read_bytes(), gzip.decompress(object_path.read_bytes()))
+
+    def test_ExistingOutputFile_Put_OutputFileReplacedByLink(self):
+        store = ContentStore(self.output_dir_path / "store")
+        output_file_path = self.output_dir_path / "image.svg"
+        output_file_path.write_text("outdated")
+
+        object_path = store.put(b"<svg />", output_file_path)
+
+        self.assertTrue(os.path.samefile(object_path, output_file_path))
+        self.assertEqual(b"<svg />", output_file_path.read_bytes())
+
+    def test_OutputDirOfStore_ExtractAllLayersToFile_StoredObjectsUnchanged(self):
+        store = ContentStore(self.output_dir_path / "store")
+        output_dir_path = self.output_dir_path / "output"
+        stored_layer_file_paths = self.test_image.extract_all_layers_to_store(store, output_dir_path, "image")
+        object_contents = {object_path: object_path.read_bytes() for object_path in store.store_dir.glob("*/*.svg")}
+
+        self.test_image.get_layer_by_path("/face").fill_all_objects("#123456", force=True, recursive=True)
+        extracted_layer_file_paths = self.test_image.extract_all_layers_to_file(output_dir_path, "image")
+
+        self.assertEqual(stored_layer_file_paths, extracted_layer_file_paths)
+        for object_path, object_content in object_contents.items():
+            self.assertEqual(object_content, object_path.read_bytes())
+        face_file_path = extracted_layer_file_paths["/face/mouth"]
+        self.assertFalse(os.path.samefile(face_file_path, store.store_dir / store.manifest[str(face_file_path)]))
+        self.assertIn(b"#123456", face_file_path.read_bytes())
+
+    def test_StoredOutputFile_SaveSpriteSheet_StoredObjectUnchanged(self):
+        store = ContentStore(self.output_dir_path / "store")
+        output_file_path = self.output_dir_path / "sprite.svg"
+        object_path = store.put(b"<svg />", output_file_path)
+        sprite_sheet = SpriteSheet()
+        sprite_sheet.add_image(self.test_image, "image")
+
+        sprite_sheet.save(output_file_path)
+
+        self.assertEqual(b"<svg />", object_path.read_bytes())
+        self.assertFalse(os.path.samefile(object_path, output_file_path))
+
+    def test_WritableHardLink_SaveImage_WrittenThroughLink(self):
+        file_path = self.output_dir_path / "image.svg"
+        file_path.write_text("outdated")
+        link_path = self.output_dir_path / "link.svg"
+        os.link(file_path, link_path)
+
+        self.test_image.save(link_path)
+
+        self.assertTrue(os.path.samefile(file_path, link_path))
+        self.assertNotEqual("outdated", file_path.read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# Copyright (C) 2024 twyleg
+import argparse
+import unittest
+from pathlib import Path
+from typing import List
+
+from inkscape_layer_utils.commands import add_extract_layers_arguments, handle_extract_layers
+from inkscape_layer_utils.depfile import format_depfile, format_ninja_file
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class DepfileTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def run_extract_layers(self, *argv: str) -> None:
+        parser = argparse.ArgumentParser()
+        add_extract_layers_arguments(parser)
+        args = parser.parse_args(["-o", str(self.output_dir_path / "layers"), *argv, str(self.test_image_path)])
+        self.assertEqual(0, handle_extract_layers(args))
+
+    def expected_output_file_paths(self) -> List[Path]:
+        return [
+            self.output_dir_path / "layers" / f"test_image_layer_extraction_0{suffix}.svg"
+            for suffix in ["", "_background", "_outline", "_face", "_face_mouth", "_face_eyes", "_face_eyes_right", "_face_eyes_left", "_face_nose"]
+        ]
+
+    def test_PathsWithSpecialCharacters_FormatDepfile_PathsEscaped(self):
+        depfile = format_depfile({Path("in put.svg"): [Path("out/in put.svg"), Path("out/in put_$#.svg")]})
+        self.assertEqual("out/in\\ put.svg out/in\\ put_$$\\#.svg: in\\ put.svg\n", depfile)
+
+    def test_PathsWithSpecialCharacters_FormatNinjaFile_PathsEscaped(self):
+        ninja_file = format_ninja_file({Path("c:/in put.svg"): [Path("out/in put.svg")]}, Path("out"))
+        self.assertIn("build out/in$ put.svg: inkscape_layer_utils_extract_layers c$:/in$ put.svg\n  output_dir = out\n", ninja_file)
+
+    def test_DepfileRequested_ExtractLayers_LayersExtractedAndDepfileWritten(self):
+        depfile_path = self.output_dir_path / "layers.d"
+        self.run_extract_layers("--depfile", str(depfile_path))
+
+        for output_file_path in self.expected_output_file_paths():
+            self.assertTrue(output_file_path.exists())
+        self.assertEqual(format_depfile({self.test_image_path: self.expected_output_file_paths()}), depfile_path.read_text())
+
+    def test_DryRunAndNinjaFileRequested_ExtractLayers_NoLayerExtractedAndNinjaFileWritten(self):
+        ninja_file_path = self.output_dir_path / "layers.ninja"
+        self.run_extract_layers("--dry-run", "--ninja", str(ninja_file_path))
+
+        self.assertFalse((self.output_dir_path / "layers").exists())
+        self.assertEqual(
+            format_ninja_file({self.test_image_path: self.expected_output_file_paths()}, self.output_dir_path / "layers"),
+            ninja_file_path.read_text(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# Copyright (C) 2024 twyleg
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from inkscape_layer_utils.cache import ImageCache
+from inkscape_layer_utils.image import Image, ImageFrozenError, LayerUnknownError
+from inkscape_layer_utils.index import KIND_GROUP, KIND_LAYER, KIND_OBJECT
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+INKSCAPE_GROUPMODE = "{http://www.inkscape.org/namespaces/inkscape}groupmode"
+INKSCAPE_LABEL = "{http://www.inkscape.org/namespaces/inkscape}label"
+
+
+class DocumentIndexTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_coloring_0.svg", *args, **kwargs)
+
+    def test_ImageWithMultipleLayers_CreateIndexAndGetListOfLayers_SameListAsWrapperTreeReturned(self):
+        index = self.test_image.create_index()
+        self.assertEqual(self.test_image.get_all_layer_paths(), index.get_all_layer_paths())
+
+    def test_ImageWithMultipleLayers_CreateIndexAndFindLayersByName_SamePathsAsWrapperTreeReturned(self):
+        index = self.test_image.create_index()
+        for layer_name in ["right", "face", "not_existing"]:
+            self.assertEqual(
+                [layer.layer_path for layer in self.test_image.find_layers_by_name(layer_name)],
+                index.find_layers_by_name(layer_name),
+            )
+
+    def test_ImageWithDuplicateLayerLabels_CreateIndex_LastLayerWinsLikeWrapperTree(self):
+        element_tree = ET.parse(self.test_image_path)
+        duplicate_face_layer = ET.SubElement(
+            element_tree.getroot(), "{http://www.w3.org/2000/svg}g", {INKSCAPE_GROUPMODE: "layer", INKSCAPE_LABEL: "face", "id": "duplicate_face"}
+        )
+        ET.SubElement(duplicate_face_layer, "{http://www.w3.org/2000/svg}g", {INKSCAPE_GROUPMODE: "layer", INKSCAPE_LABEL: "nose", "id": "duplicate_nose"})
+        image = Image(element_tree)
+
+        index = image.create_index()
+
+        self.assertEqual(["/", "/background", "/text", "/outline", "/face", "/face/nose"], index.get_all_layer_paths())
+        self.assertEqual(image.get_all_layer_paths(), index.get_all_layer_paths())
+        self.assertEqual(["/face/nose"], index.find_layers_by_name("nose"))
+        self.assertEqual([], index.find_layers_by_name("eyes"))
+        self.assertIs(duplicate_face_layer, index.elements[index.get_layer_index_by_path("/face")])
+
+    def test_ImageWithMultipleLayers_CreateIndex_ElementsClassifiedLikeWrapperTree(self):
+        index = self.test_image.create_index()
+        face_layer = self.test_image.get_layer_by_path("/face/mouth")
+        start, end = index.get_subtree_range("/face/mouth")
+
+        self.assertIs(face_layer.layer_element, index.elements[start])
+        self.assertEqual(KIND_LAYER, index.kinds[start])
+        group_ids = [index.get_id(i) for i in range(start, end) if index.kinds[i] == KIND_GROUP]
+        self.assertEqual(list(face_layer.groups.keys()), group_ids)
+        self.assertTrue(all(index.kinds[i] == KIND_OBJECT for i in index.iter_object_indices("/face/mouth")))
+
+    def test_ImageWithMultipleLayers_GetNonExistingLayerRangeFromIndex_LayerUnknownErrorRaised(self):
+        index = self.test_image.create_index()
+        with self.assertRaises(LayerUnknownError):
+            index.get_subtree_range("/not/existing")
+
+    def test_TestImageWithText_ColorizeTextViaIndex_TextColorized(self):
+        index = self.test_image.create_index()
+        index.set_style_attribute_of_all_objects("/text", "fill", "#FF0000")
+        extracted_single_layer_by_path_with_colorized_text = self.test_image.extract_layer("/text", preserve_layer_paths=True)
+
+        self.assert_images_equal(
+            "resources/expected_images/test_image_coloring_extracted_single_layer_by_path_with_stroke_painted_text.svg",
+            extracted_single_layer_by_path_with_colorized_text,
+        )
+
+    def test_ForkedImage_ColorizeTextViaIndex_OnlyForkColorized(self):
+        original_element_tree = ET.tostring(self.test_image.layer_element)
+        forked_image = self.test_image.fork()
+
+        forked_image.create_index().set_style_attribute_of_all_objects("/text", "fill", "#FF0000")
+
+        self.assertEqual(original_element_tree, ET.tostring(self.test_image.layer_element))
+        self.assert_images_equal(
+            "resources/expected_images/test_image_coloring_extracted_single_layer_by_path_with_stroke_painted_text.svg",
+            forked_image.extract_layer("/text", preserve_layer_paths=True),
+        )
+
+    def test_CachedImage_ColorizeTextViaIndex_NextLoadUnmodified(self):
+        image_cache = ImageCache()
+        image_cache.load(self.test_image_path).create_index().set_style_attribute_of_all_objects("/text", "fill", "#FF0000")
+
+        self.assertEqual(ET.tostring(self.test_image.layer_element), ET.tostring(image_cache.load(self.test_image_path).layer_element))
+
+    def test_FrozenImage_ColorizeTextViaIndex_ImageFrozenErrorRaised(self):
+        index = self.test_image.freeze().create_index()
+
+        with self.assertRaises(ImageFrozenError):
+            index.set_style_attribute_of_all_objects("/text", "fill", "#FF0000")
+
+
+if __name__ == "__main__":
+    unittest.main()
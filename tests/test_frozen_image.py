@@ -0,0 +1,72 @@
+# Copyright (C) 2024 twyleg
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from inkscape_layer_utils.image import ImageFrozenError
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class FrozenImageTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def test_FrozenImage_Modify_ImageFrozenErrorRaisedAndImageUnchanged(self):
+        self.test_image.freeze()
+        layer_paths = self.test_image.get_all_layer_paths()
+
+        with self.assertRaises(ImageFrozenError):
+            self.test_image.get_layer_by_path("/face/mouth").remove_all_objects_and_groups()
+        with self.assertRaises(ImageFrozenError):
+            self.test_image.get_layer_by_path("/outline").set_visibility(False)
+        with self.assertRaises(ImageFrozenError):
+            self.test_image.get_layer_by_path("/background").objects["rect11004"].set_fill_color("#ff0000")
+        with self.assertRaises(ImageFrozenError):
+            self.test_image.remove_layers_if_path_not_matching(["/face"])
+
+        self.assertTrue(self.test_image.frozen)
+        self.assertEqual(layer_paths, self.test_image.get_all_layer_paths())
+        self.assert_image_element_trees_equal(self.prepare_test_image().layer_element, self.test_image.layer_element)
+
+    def test_FrozenImage_ForkAndModify_ForkModifiedAndFrozenImageUnchanged(self):
+        self.test_image.freeze()
+
+        forked_image = self.test_image.fork()
+        forked_image.get_layer_by_path("/background").fill_all_objects("#ff0000")
+
+        self.assertFalse(forked_image.frozen)
+        self.assertIn("fill:#ff0000", forked_image.get_layer_by_path("/background").objects["rect11004"].object_element.attrib["style"])
+        self.assert_image_element_trees_equal(self.prepare_test_image().layer_element, self.test_image.layer_element)
+
+    def test_FrozenImage_ExtractLayersFromThreads_SameImagesAsSequentialExtraction(self):
+        layer_paths = self.test_image.get_all_layer_paths()
+        expected_images = [self.test_image.extract_layer(layer_path) for layer_path in layer_paths]
+        self.test_image.freeze()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            extracted_images = list(executor.map(self.test_image.extract_layer, layer_paths * 8))
+
+        for i, extracted_image in enumerate(extracted_images):
+            self.assert_image_element_trees_equal(expected_images[i % len(layer_paths)].layer_element, extracted_image.layer_element)
+
+    def test_Image_ExtractAllLayersToFileWithThreads_SameFilesAsSequentialExtraction(self):
+        extracted_layer_file_paths = self.test_image.extract_all_layers_to_file(self.output_dir_path / "sequential", "image")
+
+        threaded_layer_file_paths = self.test_image.extract_all_layers_to_file(self.output_dir_path / "threads", "image", threads=4)
+
+        self.assertFalse(self.test_image.frozen)
+        self.assertEqual(list(extracted_layer_file_paths.keys()), list(threaded_layer_file_paths.keys()))
+        for layer_path, file_path in extracted_layer_file_paths.items():
+            self.assertEqual(file_path.read_bytes(), threaded_layer_file_paths[layer_path].read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# Copyright (C) 2024 twyleg
+import gzip
+import os
+import shutil
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.cache import ImageCache
+from inkscape_layer_utils.inventory import estimate_svg_size
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class ImageCacheTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_coloring_0.svg", *args, **kwargs)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.svg_file_paths = []
+        for i in range(3):
+            svg_file_path = self.output_dir_path / f"image_{i}.svg"
+            shutil.copy(self.test_image_path, svg_file_path)
+            self.svg_file_paths.append(svg_file_path)
+        self.image_size = estimate_svg_size(self.test_image.layer_element)
+
+    def test_ImageCached_ModifyLoadedImage_CachedImageUnmodified(self):
+        image_cache = ImageCache()
+        image_cache.load(self.svg_file_paths[0]).find_layers_by_name("text")[0].fill_all_objects("#FF0000")
+
+        self.assert_images_equal("resources/test_images/test_image_coloring_0.svg", image_cache.load(self.svg_file_paths[0]))
+        self.assertEqual(1, len(image_cache))
+
+    def test_ImageCached_ModifyFile_ImageReloaded(self):
+        image_cache = ImageCache()
+        image_cache.load(self.svg_file_paths[0])
+        self.svg_file_paths[0].write_text(self.svg_file_paths[0].read_text().replace('inkscape:label="nose"', 'inkscape:label="beak"'))
+
+        self.assertIn("/face/beak", image_cache.load(self.svg_file_paths[0]).get_all_layer_paths())
+        self.assertEqual(1, len(image_cache))
+
+    def test_CacheSizeForTwoImages_LoadThreeImages_LeastRecentlyUsedImageEvicted(self):
+        image_cache = ImageCache(max_bytes=2 * self.image_size, memory_factor=1.0)
+        image_cache.load(self.svg_file_paths[0])
+        image_cache.load(self.svg_file_paths[1])
+        image_cache.load(self.svg_file_paths[0])
+        image_cache.load(self.svg_file_paths[2])
+
+        self.assertEqual(2, len(image_cache))
+        self.assertEqual(2 * self.image_size, image_cache.size_bytes)
+        self.assertNotIn(str(self.svg_file_paths[1].resolve()), image_cache._entries)
+
+    def test_CompressedImage_Load_SizeEstimatedFromUncompressedSvg(self):
+        compressed_file_path = self.output_dir_path / "image.svgz"
+        compressed_file_path.write_bytes(gzip.compress(self.test_image_path.read_bytes()))
+        image_cache = ImageCache(memory_factor=1.0)
+
+        image_cache.load(compressed_file_path)
+
+        self.assertLess(os.path.getsize(compressed_file_path), self.image_size)
+        self.assertEqual(self.image_size, image_cache.size_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
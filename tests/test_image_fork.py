@@ -0,0 +1,54 @@
+# Copyright (C) 2024 twyleg
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+TEST_IMAGE_PATH = "resources/test_images/test_image_coloring_0.svg"
+
+
+class ImageForkTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / TEST_IMAGE_PATH, *args, **kwargs)
+
+    def test_ForkedImage_ColorizeFork_OriginalUnmodifiedAndUntouchedLayersShared(self):
+        forked_image = self.test_image.fork()
+        forked_image.find_layers_by_name("text")[0].fill_all_objects("#FF0000")
+
+        self.assert_images_equal(TEST_IMAGE_PATH, self.test_image)
+        self.assertIs(self.test_image.get_layer_by_path("/face").layer_element, forked_image.get_layer_by_path("/face").layer_element)
+        self.assertIsNot(self.test_image.get_layer_by_path("/text").layer_element, forked_image.get_layer_by_path("/text").layer_element)
+        self.assert_images_equal(
+            "resources/expected_images/test_image_coloring_extracted_single_layer_by_path_with_stroke_painted_text.svg",
+            forked_image.extract_layer("/text"),
+        )
+
+    def test_ForkedImage_ColorizeOriginal_ForkUnmodified(self):
+        forked_image = self.test_image.fork()
+        self.test_image.get_layer_by_path("/face/eyes/left").fill_all_objects("#000000", True)
+        self.test_image.get_layer_by_path("/face").set_visibility(False)
+        self.test_image.get_layer_by_path("/face/eyes").remove_all_layers()
+
+        self.assert_images_equal(TEST_IMAGE_PATH, forked_image)
+        self.assertNotEqual(ET.tostring(forked_image.layer_element), ET.tostring(self.test_image.layer_element))
+
+    def test_ImageWithForks_ModifyForksIndependently_EachForkContainsOnlyItsOwnModification(self):
+        first_fork = self.test_image.fork()
+        second_fork = first_fork.fork()
+
+        first_fork.get_layer_by_path("/face/eyes/right").set_fill_opacity_of_all_objects(1.0)
+        second_fork.get_layer_by_path("/face/eyes/right").set_stroke_opacity_of_all_objects(1.0)
+
+        self.assertEqual(ET.tostring(self.test_image.layer_element), ET.tostring(ET.parse(self.test_image_path).getroot()))
+        self.assertNotEqual(ET.tostring(first_fork.layer_element), ET.tostring(second_fork.layer_element))
+
+
+if __name__ == "__main__":
+    unittest.main()
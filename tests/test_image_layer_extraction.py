@@ -37,6 +37,9 @@ class Image0TestCase(ImageTestCase):
             self.test_image.get_all_layer_paths(),
         )
 
+    def test_ImageWithMultipleLayers_ScanLayerPaths_SameListOfLayersReturned(self):
+        self.assertEqual(self.test_image.get_all_layer_paths(), Image.scan_layer_paths(self.test_image_path))
+
     def test_ImageWithMultipleLayers_FindExistingLayerByName_LayerReturned(self):
         self.assertEqual("right", self.test_image.find_layers_by_name("right")[0].layer_name)
 
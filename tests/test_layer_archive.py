@@ -0,0 +1,99 @@
+# Copyright (C) 2024 twyleg
+import importlib.util
+import io
+import tarfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from inkscape_layer_utils.archive import ZIP_DATE_TIME, ArchiveError, LayerArchive, get_archive_format
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class LayerArchiveTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def assert_archive_members_equal_to_files(self, members: dict[str, bytes]) -> None:
+        layer_files_dir_path = self.output_dir_path / "layers"
+        extracted_layer_file_paths = self.test_image.extract_all_layers_to_file(layer_files_dir_path, "image")
+        self.assertEqual(sorted(file_path.name for file_path in extracted_layer_file_paths.values()), sorted(members.keys()))
+        for file_path in extracted_layer_file_paths.values():
+            self.assertEqual(file_path.read_bytes(), members[file_path.name])
+
+    def test_ArchiveFileNames_GetArchiveFormat_FormatDetermined(self):
+        self.assertEqual("tar.gz", get_archive_format(Path("layers.tgz")))
+        self.assertEqual("zip", get_archive_format(Path("layers.ZIP")))
+        with self.assertRaises(ArchiveError):
+            get_archive_format(Path("layers.rar"))
+
+    def test_TarGzArchive_ExtractAllLayersToArchive_MembersEqualToExtractedFiles(self):
+        archive_path = self.output_dir_path / "layers.tar.gz"
+        with LayerArchive(archive_path) as archive:
+            member_names = self.test_image.extract_all_layers_to_archive(archive, "image")
+
+        self.assertEqual("image_face_eyes_right.svg", member_names["/face/eyes/right"])
+        with tarfile.open(archive_path) as tar_file:
+            self.assert_archive_members_equal_to_files({member.name: tar_file.extractfile(member).read() for member in tar_file})  # type: ignore[union-attr]
+
+    def test_TarGzArchive_ExtractAllLayersToArchiveTwice_IdenticalArchivesWithoutTimestampsWritten(self):
+        archive_files = [io.BytesIO(), io.BytesIO()]
+        for archive_file in archive_files:
+            with LayerArchive(archive_file, "tar.gz") as archive:
+                self.test_image.extract_all_layers_to_archive(archive, "image")
+
+        self.assertEqual(archive_files[0].getvalue(), archive_files[1].getvalue())
+        # MTIME field of the gzip header
+        self.assertEqual(b"\x00\x00\x00\x00", archive_files[0].getvalue()[4:8])
+        archive_files[0].seek(0)
+        with tarfile.open(fileobj=archive_files[0]) as tar_file:
+            self.assertEqual({0}, {member.mtime for member in tar_file})
+
+    def test_ZipArchive_ExtractAllLayersToArchive_MembersWithFixedTimestampWritten(self):
+        archive_file = io.BytesIO()
+        with LayerArchive(archive_file, "zip") as archive:
+            self.test_image.extract_all_layers_to_archive(archive, "image")
+
+        with zipfile.ZipFile(archive_file) as zip_file:
+            self.assertEqual({ZIP_DATE_TIME}, {zip_info.date_time for zip_info in zip_file.infolist()})
+
+    def test_ZipArchiveOnNonSeekableStream_ExtractAllLayersToArchive_MembersEqualToExtractedFiles(self):
+        class NonSeekableStream(io.RawIOBase):
+            def __init__(self) -> None:
+                self.buffer = io.BytesIO()
+
+            def writable(self) -> bool:
+                return True
+
+            def write(self, data) -> int:  # type: ignore[override]
+                return self.buffer.write(data)
+
+        stream = NonSeekableStream()
+        with LayerArchive(stream, "zip") as archive:  # type: ignore[arg-type]
+            self.test_image.extract_all_layers_to_archive(archive, "image")
+
+        with zipfile.ZipFile(io.BytesIO(stream.buffer.getvalue())) as zip_file:
+            self.assert_archive_members_equal_to_files({name: zip_file.read(name) for name in zip_file.namelist()})
+
+    @unittest.skipUnless(importlib.util.find_spec("zstandard"), "zstandard not installed")
+    def test_TarZstArchive_ExtractAllLayersToArchive_MembersEqualToExtractedFiles(self):
+        import zstandard  # type: ignore[import-not-found]
+
+        archive_path = self.output_dir_path / "layers.tar.zst"
+        with LayerArchive(archive_path) as archive:
+            self.test_image.extract_all_layers_to_archive(archive, "image")
+
+        with open(archive_path, "rb") as archive_file, tarfile.open(fileobj=zstandard.ZstdDecompressor().stream_reader(archive_file), mode="r|") as tar_file:
+            self.assert_archive_members_equal_to_files({member.name: tar_file.extractfile(member).read() for member in tar_file})  # type: ignore[union-attr]
+
+
+if __name__ == "__main__":
+    unittest.main()
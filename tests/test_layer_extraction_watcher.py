@@ -0,0 +1,78 @@
+# Copyright (C) 2024 twyleg
+import shutil
+import time
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.watch import LayerExtractionWatcher, PollingFileWatcher
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class LayerExtractionWatcherTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.svg_file_path = self.output_dir_path / "image.svg"
+        shutil.copy(self.test_image_path, self.svg_file_path)
+        self.layer_output_dir_path = self.output_dir_path / "layers"
+        self.watcher = LayerExtractionWatcher(self.layer_output_dir_path)
+
+    def replace_in_svg_file(self, old: str, new: str) -> None:
+        content = self.svg_file_path.read_text()
+        self.assertIn(old, content)
+        self.svg_file_path.write_text(content.replace(old, new))
+
+    def test_NoPreviousExtraction_Update_AllLayersWritten(self):
+        written_layer_paths = self.watcher.update(self.svg_file_path)
+
+        self.assertEqual(self.test_image.get_all_layer_paths(), written_layer_paths)
+        self.assert_images_from_file_equal(
+            self.layer_output_dir_path / "image_face_eyes_right.svg",
+            FILE_PATH / "resources/expected_images/test_image_layer_extraction_extracted_single_layer_by_path_with_layer_path_preservation.svg",
+        )
+
+    def test_FileUnchanged_Update_NoLayerWritten(self):
+        self.watcher.update(self.svg_file_path)
+        self.assertEqual([], self.watcher.update(self.svg_file_path))
+
+    def test_ObjectOfSingleLayerChanged_Update_OnlyChangedLayerAndRootWritten(self):
+        self.watcher.update(self.svg_file_path)
+        self.replace_in_svg_file('id="path959"', 'id="path959_changed"')
+
+        self.assertEqual(["/", "/face/nose"], self.watcher.update(self.svg_file_path))
+
+    def test_AttributeOfParentLayerChanged_Update_ParentAndAllSublayersWritten(self):
+        self.watcher.update(self.svg_file_path)
+        self.replace_in_svg_file('inkscape:label="eyes"', 'inkscape:label="eyes" style="display:inline"')
+
+        self.assertEqual(["/", "/face/eyes", "/face/eyes/right", "/face/eyes/left"], self.watcher.update(self.svg_file_path))
+
+    def test_LayerRenamed_Update_OutputOfRemovedLayerDeleted(self):
+        self.watcher.update(self.svg_file_path)
+        self.replace_in_svg_file('inkscape:label="nose"', 'inkscape:label="beak"')
+
+        self.assertEqual(["/", "/face/beak"], self.watcher.update(self.svg_file_path))
+        self.assertFalse((self.layer_output_dir_path / "image_face_nose.svg").exists())
+        self.assertTrue((self.layer_output_dir_path / "image_face_beak.svg").exists())
+
+    def test_WatchedFileModified_PollingFileWatcherCheck_ModifiedFileReturned(self):
+        file_watcher = PollingFileWatcher([self.svg_file_path])
+        self.assertEqual([], file_watcher.check())
+
+        time.sleep(0.01)
+        self.replace_in_svg_file('inkscape:label="nose"', 'inkscape:label="beak"')
+        self.assertEqual([self.svg_file_path.resolve()], file_watcher.check())
+
+
+if __name__ == "__main__":
+    unittest.main()
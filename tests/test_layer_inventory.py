@@ -0,0 +1,59 @@
+# Copyright (C) 2024 twyleg
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from inkscape_layer_utils.image import Image
+from inkscape_layer_utils.inventory import create_layer_inventory
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+IMAGE_WITH_EMBEDDED_RASTER = """<svg id="svg1" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+     xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape">
+  <defs id="defs"><linearGradient id="gradient" /><clipPath id="clip" /></defs>
+  <g id="layer1" inkscape:label="photo" inkscape:groupmode="layer">
+    <image id="image1" xlink:href="data:image/png;base64,iVBORw0KGgo=" clip-path="url(#clip)" />
+    <g id="layer2" inkscape:label="overlay" inkscape:groupmode="layer">
+      <g id="group1"><rect id="rect1" style="fill:url(#gradient)" /></g>
+    </g>
+  </g>
+</svg>"""
+
+
+class LayerInventoryTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def test_ImageWithMultipleLayers_CreateInventory_StatisticsOfAllLayersInLayerPathOrder(self):
+        inventory = create_layer_inventory(self.test_image.create_index())
+
+        self.assertEqual(self.test_image.get_all_layer_paths(), [statistics.path for statistics in inventory])
+        nose = inventory[-1]
+        self.assertEqual(("/face/nose", 2, 2, 1), (nose.path, nose.depth, nose.objects, nose.groups))
+        self.assertEqual(["radialGradient946"], inventory[2].referenced_defs)
+
+    def test_ImageWithSublayers_CreateInventory_SubtreeBytesIncludeSublayers(self):
+        inventory = {statistics.path: statistics for statistics in create_layer_inventory(self.test_image.create_index())}
+
+        eyes = inventory["/face/eyes"]
+        self.assertEqual(eyes.bytes + inventory["/face/eyes/right"].subtree_bytes + inventory["/face/eyes/left"].subtree_bytes, eyes.subtree_bytes)
+        self.assertAlmostEqual(len(ET.tostring(self.test_image.element_tree.getroot())), inventory["/"].subtree_bytes, delta=500)
+
+    def test_ImageWithEmbeddedRaster_CreateInventory_RasterBytesAndReferencedDefsOfOwnContent(self):
+        image = Image.load_from_string(IMAGE_WITH_EMBEDDED_RASTER)
+
+        photo, overlay = create_layer_inventory(image.create_index())[1:]
+
+        self.assertEqual((1, 0, 8, ["clip"]), (photo.objects, photo.groups, photo.raster_bytes, photo.referenced_defs))
+        self.assertEqual((1, 1, 0, ["gradient"]), (overlay.objects, overlay.groups, overlay.raster_bytes, overlay.referenced_defs))
+
+
+if __name__ == "__main__":
+    unittest.main()
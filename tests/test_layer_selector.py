@@ -0,0 +1,70 @@
+# Copyright (C) 2024 twyleg
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.selector import LayerSelector, SelectorError
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class LayerSelectorTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def select_layer_paths(self, selector) -> list:
+        return [layer.layer_path for layer in self.test_image.select_layers(selector)]
+
+    def test_Image_SelectLayersWithGlobs_MatchingLayersInDocumentOrder(self):
+        self.assertEqual(["/face", "/face/mouth", "/face/eyes", "/face/eyes/right", "/face/eyes/left", "/face/nose"], self.select_layer_paths("/face/**"))
+        self.assertEqual(["/face/eyes/right", "/face/eyes/left"], self.select_layer_paths("/*/eyes/*"))
+        self.assertEqual(["/face/mouth", "/face/nose"], self.select_layer_paths("/face/?o*"))
+        self.assertEqual(self.test_image.get_all_layer_paths(), self.select_layer_paths("/**"))
+        self.assertEqual(["/"], self.select_layer_paths("/"))
+
+    def test_Image_SelectLayersWithRegexAndNegation_MatchingLayersSelected(self):
+        self.assertEqual(["/outline", "/face/eyes/right"], self.select_layer_paths("re:^(outline|right)$"))
+        self.assertEqual(["/face/eyes", "/face/eyes/right"], self.select_layer_paths(["/face/eyes/**", "!/face/eyes/left"]))
+        self.assertEqual(["/", "/background", "/outline"], self.select_layer_paths("!/face/**"))
+
+    def test_Selector_FilterPaths_SameResultAsSelectOnLayerTree(self):
+        selector = LayerSelector(["/**/e*", "!re:left"])
+
+        self.assertEqual(self.select_layer_paths(selector), selector.filter_paths(self.test_image.get_all_layer_paths()))
+
+    def test_Image_ExtractLayersWithSelector_SelectedLayersExtracted(self):
+        extracted_image = self.test_image.extract_layers(LayerSelector("/face/eyes/*"))
+
+        self.assertEqual(self.test_image.extract_layers(["/face/eyes/right", "/face/eyes/left"]).get_all_layer_paths(), extracted_image.get_all_layer_paths())
+
+    def test_SelectorMatchingSublayers_ExtractLayersWithoutLayerPaths_SublayersNotDuplicated(self):
+        extracted_image = self.test_image.extract_layers(LayerSelector("/face/**"), preserve_layer_paths=False)
+
+        # "/**" matches the face layer itself as well, its sublayers are extracted with it
+        self.assertEqual(self.test_image.extract_layers(["/face"], preserve_layer_paths=False).get_all_layer_paths(), extracted_image.get_all_layer_paths())
+        layer_ids = [element.get("id") for element in extracted_image.layer_element.iter() if element.get("id") is not None]
+        self.assertEqual(len(set(layer_ids)), len(layer_ids))
+
+    def test_Image_FillAllObjectsOfSelectedLayers_OnlySelectedLayersFilled(self):
+        self.test_image.fill_all_objects("#ff0000", force=True, select="/face/eyes/*")
+
+        for layer_path in ["/face/eyes/right", "/face/eyes/left"]:
+            for object in self.test_image.get_layer_by_path(layer_path).objects.values():
+                self.assertIn("fill:#ff0000", object.object_element.attrib["style"])
+        for object in self.test_image.get_layer_by_path("/face/nose").groups["g1146"].objects.values():
+            self.assertNotIn("fill:#ff0000", object.object_element.attrib["style"])
+
+    def test_InvalidSelectors_Compile_SelectorErrorRaised(self):
+        for selector in ["face", "/face/a**", "re:("]:
+            with self.assertRaises(SelectorError):
+                LayerSelector.compile(selector)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# Copyright (C) 2024 twyleg
+import argparse
+import json
+import unittest
+from pathlib import Path
+from typing import List
+
+from inkscape_layer_utils.commands import CommandContext, add_list_layers_arguments, handle_list_layers
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class ListLayersTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def run_list_layers(self, *argv: str) -> List[str]:
+        parser = argparse.ArgumentParser()
+        add_list_layers_arguments(parser)
+        args = parser.parse_args(list(argv))
+
+        self.lines: List[str] = []
+        self.flush_count = 0
+
+        def flush_output() -> None:
+            self.flush_count += 1
+
+        self.exit_code = handle_list_layers(args, CommandContext(print_line=self.lines.append, flush_output=flush_output))
+        return self.lines
+
+    def test_MultipleFiles_ListLayersAsNdjson_OneFlushedRecordPerFile(self):
+        coloring_image_path = FILE_PATH / "resources/test_images/test_image_coloring_0.svg"
+
+        lines = self.run_list_layers("--ndjson", str(self.test_image_path), str(coloring_image_path))
+
+        self.assertEqual(0, self.exit_code)
+        self.assertEqual(2, len(lines))
+        self.assertEqual(2, self.flush_count)
+        self.assertEqual({"file": str(self.test_image_path), "layers": self.test_image.get_all_layer_paths()}, json.loads(lines[0]))
+        self.assertEqual(str(coloring_image_path), json.loads(lines[1])["file"])
+
+    def test_MissingFile_ListLayersAsNdjson_ErrorRecordAndRemainingFilesListed(self):
+        missing_image_path = self.output_dir_path / "missing.svg"
+
+        lines = self.run_list_layers("--ndjson", str(missing_image_path), str(self.test_image_path))
+
+        self.assertEqual(1, self.exit_code)
+        self.assertIn("error", json.loads(lines[0]))
+        self.assertEqual(self.test_image.get_all_layer_paths(), json.loads(lines[1])["layers"])
+
+
+if __name__ == "__main__":
+    unittest.main()
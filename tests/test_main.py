@@ -0,0 +1,63 @@
+# Copyright (C) 2024 twyleg
+import os
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from inkscape_layer_utils.main import fast_path_available, main
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class MainTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def setUp(self) -> None:
+        super().setUp()
+        environ_patcher = mock.patch.dict(os.environ)
+        environ_patcher.start()
+        self.addCleanup(environ_patcher.stop)
+        os.environ.pop("INKSCAPE_LAYER_UTILS_SOCKET", None)
+
+    def test_SubcommandWithoutFrameworkOptions_CheckFastPath_FastPathAvailable(self):
+        self.assertTrue(fast_path_available(["extract_layers", "image.svg"]))
+        self.assertTrue(fast_path_available(["-q", "list_layers", "image.svg"]))
+
+    def test_HelpOrOtherSubcommand_CheckFastPath_FastPathNotAvailable(self):
+        self.assertFalse(fast_path_available([]))
+        self.assertFalse(fast_path_available(["-q"]))
+        self.assertFalse(fast_path_available(["list_layers", "--help"]))
+        self.assertFalse(fast_path_available(["server", "socket"]))
+
+    def test_ExistingFile_RunFastPath_ExitCodeZero(self):
+        with mock.patch("inkscape_layer_utils.application.InkscapeLayerUtils") as application, self.assertRaises(SystemExit) as context:
+            main(["-q", "list_layers", "--ndjson", str(self.test_image_path)])
+
+        self.assertEqual(0, context.exception.code)
+        application.assert_not_called()
+
+    def test_MissingFile_RunFastPath_ExitCodeOfHandler(self):
+        with self.assertRaises(SystemExit) as context:
+            main(["-q", "list_layers", "--ndjson", str(self.output_dir_path / "missing.svg")])
+
+        self.assertEqual(1, context.exception.code)
+
+    def test_FrameworkOptions_RunSlowPath_ExitCodeOfApplication(self):
+        with mock.patch("inkscape_layer_utils.application.InkscapeLayerUtils") as application, self.assertRaises(SystemExit) as context:
+            application.return_value.start.return_value = 3
+            main(["list_layers", "--help"])
+
+        self.assertEqual(3, context.exception.code)
+        application.return_value.start.assert_called_once_with(["list_layers", "--help"])
+
+
+if __name__ == "__main__":
+    unittest.main()
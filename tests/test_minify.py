@@ -0,0 +1,99 @@
+# Copyright (C) 2024 twyleg
+import io
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.image import Image
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class MinifyTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def save_minified(self, image: Image) -> str:
+        file_object = io.BytesIO()
+        image.save_to_file_object(file_object, minify=True)
+        return file_object.getvalue().decode()
+
+    def test_Image_SaveMinified_EditorOnlyContentAndWhitespaceRemoved(self):
+        minified_image = self.save_minified(self.test_image)
+
+        self.assertNotIn("inkscape", minified_image)
+        self.assertNotIn("sodipodi", minified_image)
+        self.assertNotIn("metadata", minified_image)
+        self.assertNotIn("rdf", minified_image)
+        self.assertNotIn("\n", minified_image)
+        self.assertIn('xlink:href="#linearGradient944"', minified_image)
+        self.assertTrue(minified_image.startswith('<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" id="svg8"'))
+
+    def test_Image_SaveMinified_ImageNotModifiedAndObjectsPreserved(self):
+        original_image = io.BytesIO()
+        self.test_image.save_to_file_object(original_image)
+
+        minified_image = Image.load_from_string(self.save_minified(self.test_image))
+
+        unmodified_image = io.BytesIO()
+        self.test_image.save_to_file_object(unmodified_image)
+        self.assertEqual(original_image.getvalue(), unmodified_image.getvalue())
+        self.assertEqual(
+            [element.get("id") for element in self.test_image.element_tree.iter("{http://www.w3.org/2000/svg}path")],
+            [element.get("id") for element in minified_image.element_tree.iter("{http://www.w3.org/2000/svg}path")],
+        )
+
+    def test_ExtractedLayer_SaveMinified_EmptyGroupsOfOtherLayersRemoved(self):
+        minified_image = self.save_minified(self.test_image.extract_layer("/face/eyes/right"))
+
+        self.assertIn('<g id="layer7"><g id="layer3"><g id="layer5"><path', minified_image)
+        for removed_layer_id in ["layer1", "layer2", "layer4", "layer6", "layer8"]:
+            self.assertNotIn(f'id="{removed_layer_id}"', minified_image)
+
+    def test_TextWithWhitespace_SaveMinified_WhitespaceCollapsedWithinText(self):
+        image = Image.load_from_string(
+            '<svg xmlns="http://www.w3.org/2000/svg" id="svg1">\n'
+            '  <text id="text1">\n    <tspan>Hello</tspan> <tspan>World</tspan>\n  </text>\n'
+            '  <text id="text2" xml:space="preserve">a  b</text>\n'
+            '  <g id="g1">\n    <g id="g2" />\n  </g>\n'
+            "</svg>"
+        )
+
+        minified_image = self.save_minified(image)
+
+        self.assertEqual(
+            '<svg xmlns="http://www.w3.org/2000/svg" id="svg1"><text id="text1"> <tspan>Hello</tspan> <tspan>World</tspan> </text><text id="text2" xml:space="preserve">a  b</text></svg>',
+            minified_image,
+        )
+
+    def test_SpecialCharacters_SaveMinified_EscapedLikeElementTree(self):
+        image = Image.load_from_string(
+            '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" id="svg1">'
+            '<text id="text1" font-family="&quot;Open Sans&quot;&#10;&lt;&amp;&gt;">a &lt; b &amp;&amp; c &gt; d \u00e4</text>'
+            '<use xlink:href="#text1" />'
+            "</svg>"
+        )
+
+        minified_image = self.save_minified(image)
+
+        buffer = io.BytesIO()
+        image.element_tree.write(buffer)
+        self.assertEqual(buffer.getvalue().decode("us-ascii"), minified_image)
+
+    def test_Image_ExtractAllLayersToFileMinified_SmallerFilesWritten(self):
+        extracted_layer_file_paths = self.test_image.extract_all_layers_to_file(self.output_dir_path / "plain", "image")
+        minified_layer_file_paths = self.test_image.extract_all_layers_to_file(self.output_dir_path / "minified", "image", minify=True)
+
+        self.assertEqual(extracted_layer_file_paths.keys(), minified_layer_file_paths.keys())
+        for layer_path, minified_layer_file_path in minified_layer_file_paths.items():
+            self.assertLess(minified_layer_file_path.stat().st_size, extracted_layer_file_paths[layer_path].stat().st_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
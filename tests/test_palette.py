@@ -0,0 +1,172 @@
+# Copyright (C) 2024 twyleg
+import argparse
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.commands import add_recolor_arguments, handle_recolor
+from inkscape_layer_utils.image import Image, ImageFrozenError
+from inkscape_layer_utils.palette import ColorTransform, normalize_color, numpy, transform_colors
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+PALETTE_TEST_SVG = """<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" id="svg1">
+  <defs id="defs1">
+    <linearGradient id="gradient1">
+      <stop id="stop1" style="stop-color:#FF0000;stop-opacity:1" offset="0" />
+      <stop id="stop2" stop-color="#333" offset="1" />
+    </linearGradient>
+    <filter id="filter1"><feFlood flood-color="#ff0000" /></filter>
+  </defs>
+  <g id="layer1" inkscape:groupmode="layer" inkscape:label="face" style="fill:#333333">
+    <path id="path1" style="fill:#ff0000;stroke:#333333;stroke-width:1" d="M 0,0 H 1" />
+    <g id="group1">
+      <path id="path2" fill="#F00" stroke="none" d="M 0,0 H 2" />
+      <path d="M 0,0 H 3" style="fill:url(#gradient1)" />
+    </g>
+    <g id="layer2" inkscape:groupmode="layer" inkscape:label="eyes">
+      <path id="path3" style="fill:#0000ff;stroke:#ff0000" d="M 0,0 H 4" />
+    </g>
+  </g>
+</svg>
+"""
+
+
+class PaletteTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.palette_image = Image.load_from_string(PALETTE_TEST_SVG)
+
+    def find(self, image: Image, element_id: str):
+        element = image.layer_element.find(f".//*[@id='{element_id}']")
+        assert element is not None
+        return element
+
+    def test_Colors_Normalize_LowerCaseAndShortHexExpanded(self):
+        self.assertEqual("#ff0000", normalize_color(" #F00 "))
+        self.assertEqual("#ff0000", normalize_color("#FF0000"))
+        self.assertEqual("red", normalize_color("Red"))
+
+    def test_Image_CreateColorIndex_AllUsesIndexed(self):
+        color_index = self.palette_image.create_color_index()
+
+        self.assertEqual({"#ff0000": 5, "#333333": 3, "#0000ff": 1}, color_index.get_color_counts())
+        self.assertEqual(
+            {("stop-color", True), ("flood-color", False), ("fill", True), ("fill", False), ("stroke", True)},
+            {(occurrence.property, occurrence.in_style) for occurrence in color_index.occurrences_by_color["#ff0000"]},
+        )
+
+    def test_Image_SwapColors_AllUsesReplacedAndOtherPropertiesKept(self):
+        swapped_count = self.palette_image.swap_colors({"#f00": "#00aa00", "#333333": "#111111"})
+
+        self.assertEqual(8, swapped_count)
+        self.assertEqual("fill:#00aa00;stroke:#111111;stroke-width:1", self.find(self.palette_image, "path1").get("style"))
+        self.assertEqual("#00aa00", self.find(self.palette_image, "path2").get("fill"))
+        self.assertEqual("none", self.find(self.palette_image, "path2").get("stroke"))
+        self.assertEqual("stop-color:#00aa00;stop-opacity:1", self.find(self.palette_image, "stop1").get("style"))
+        self.assertEqual("#111111", self.find(self.palette_image, "stop2").get("stop-color"))
+        flood = self.palette_image.layer_element.find(".//{http://www.w3.org/2000/svg}feFlood")
+        assert flood is not None
+        self.assertEqual("#00aa00", flood.get("flood-color"))
+        self.assertEqual("fill:#111111", self.find(self.palette_image, "layer1").get("style"))
+
+    def test_ColorIndex_ApplyExchangingColors_ColorsSwappedAtOnceAndIndexUpdated(self):
+        color_index = self.palette_image.create_color_index()
+
+        color_index.apply({"#ff0000": "#0000ff", "#0000ff": "#ff0000"})
+
+        self.assertEqual("fill:#ff0000;stroke:#0000ff", self.find(self.palette_image, "path3").get("style"))
+        self.assertEqual({"#0000ff": 5, "#333333": 3, "#ff0000": 1}, color_index.get_color_counts())
+
+        color_index.apply({"#0000ff": "#ff0000", "#ff0000": "#0000ff"})
+
+        self.assertEqual("fill:#0000ff;stroke:#ff0000", self.find(self.palette_image, "path3").get("style"))
+
+    def test_Layer_SwapColors_OnlyLayerAndSublayersModified(self):
+        self.palette_image.get_layer_by_path("/face/eyes").swap_colors({"#ff0000": "#00aa00"})
+
+        self.assertEqual("fill:#0000ff;stroke:#00aa00", self.find(self.palette_image, "path3").get("style"))
+        self.assertEqual("fill:#ff0000;stroke:#333333;stroke-width:1", self.find(self.palette_image, "path1").get("style"))
+        self.assertEqual("stop-color:#FF0000;stop-opacity:1", self.find(self.palette_image, "stop1").get("style"))
+
+    def test_ForkedImage_SwapColors_OriginalImageUnchanged(self):
+        forked_image = self.palette_image.fork()
+
+        forked_image.swap_colors({"#ff0000": "#00aa00"})
+
+        self.assertEqual("stop-color:#00aa00;stop-opacity:1", self.find(forked_image, "stop1").get("style"))
+        self.assertEqual("stop-color:#FF0000;stop-opacity:1", self.find(self.palette_image, "stop1").get("style"))
+        self.assertEqual("#F00", self.find(self.palette_image, "path2").get("fill"))
+        self.assertEqual("#00aa00", self.find(forked_image, "path2").get("fill"))
+
+    def test_FrozenImage_SwapColors_ImageFrozenErrorRaised(self):
+        self.palette_image.freeze()
+
+        with self.assertRaises(ImageFrozenError):
+            self.palette_image.swap_colors({"#ff0000": "#00aa00"})
+
+    def test_TestImage_SwapColorsAndSave_SavedImageContainsNewColors(self):
+        self.test_image.swap_colors({color: "#123456" for color in self.test_image.create_color_index().get_color_counts()})
+        self.test_image.save(self.output_dir_path / "swapped.svg")
+
+        self.assertEqual({"#123456"}, set(Image.load_from_file(self.output_dir_path / "swapped.svg").create_color_index().get_color_counts()))
+
+    def test_Colors_Transform_HueShiftedDesaturatedAndDarkened(self):
+        colors = ["#ff0000", "#0F0", "red"]
+
+        self.assertEqual(["#ff8000", "#00ff80", "red"], transform_colors(colors, ColorTransform(hue_shift=30), use_numpy=False))
+        self.assertEqual(["#808080", "#808080", "red"], transform_colors(colors, ColorTransform(saturation=-1.0), use_numpy=False))
+        self.assertEqual(["#cc0000", "#00cc00", "red"], transform_colors(colors, ColorTransform(lightness=-0.1), use_numpy=False))
+        self.assertEqual(["#ff0000", "#00ff00", "red"], transform_colors(colors, ColorTransform(), use_numpy=False))
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_RandomColors_TransformWithAndWithoutNumpy_SameResults(self):
+        colors = [f"#{(i * 2654435761) & 0xFFFFFF:06x}" for i in range(10000)]
+        for transform in (ColorTransform(hue_shift=-75.0, saturation=0.2, lightness=-0.1), ColorTransform(saturation=-1.0), ColorTransform()):
+            self.assertEqual(transform_colors(colors, transform, use_numpy=False), transform_colors(colors, transform, use_numpy=True))
+
+    def test_Image_TransformColors_DistinctColorsTransformedAndAllUsesChanged(self):
+        changed_count = self.palette_image.transform_colors(saturation=-1.0)
+
+        self.assertEqual(6, changed_count)
+        self.assertEqual("fill:#808080;stroke:#333333;stroke-width:1", self.find(self.palette_image, "path1").get("style"))
+        self.assertEqual("#808080", self.find(self.palette_image, "path2").get("fill"))
+        self.assertEqual("fill:#808080;stroke:#808080", self.find(self.palette_image, "path3").get("style"))
+
+    def test_NestedLayers_RecolorWithExchangingSwaps_SublayerSwappedOnce(self):
+        input_file_path = self.output_dir_path / "palette.svg"
+        input_file_path.write_text(PALETTE_TEST_SVG)
+        parser = argparse.ArgumentParser()
+        add_recolor_arguments(parser)
+        output_dir_path = self.output_dir_path / "output"
+        output_dir_path.mkdir()
+        args = parser.parse_args(
+            ["--swap", "#ff0000=#0000ff", "--swap", "#0000ff=#ff0000", "-l", "/face/eyes", "-l", "/face", "-o", str(output_dir_path), str(input_file_path)]
+        )
+
+        self.assertEqual(0, handle_recolor(args))
+
+        recolored_image = Image.load_from_file(output_dir_path / "palette.svg")
+        self.assertEqual("fill:#ff0000;stroke:#0000ff", self.find(recolored_image, "path3").get("style"))
+        self.assertEqual("fill:#0000ff;stroke:#333333;stroke-width:1", self.find(recolored_image, "path1").get("style"))
+
+    def test_InvalidSwap_Recolor_ErrorReturned(self):
+        parser = argparse.ArgumentParser()
+        add_recolor_arguments(parser)
+        args = parser.parse_args(["--swap", "#ff0000", "-o", str(self.output_dir_path), str(self.test_image_path)])
+
+        self.assertEqual(1, handle_recolor(args))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# Copyright (C) 2024 twyleg
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.cache import ImageCache
+
+from tests.image_test_case import ImageTestCase
+
+if hasattr(socket, "AF_UNIX"):
+    from inkscape_layer_utils.server import LayerUtilsServer, forward
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets not available")
+class ServerTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_coloring_0.svg", *args, **kwargs)
+
+    def setUp(self) -> None:
+        super().setUp()
+        # Unix socket paths are limited to ~100 characters, so don't use the (potentially long) output directory
+        self.socket_path = Path(tempfile.mkdtemp(prefix="ilu")) / "s.sock"
+        self.server = LayerUtilsServer(self.socket_path, ImageCache())
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+
+    def test_ServerRunning_ForwardListLayers_LayerPathsReturned(self):
+        output, exit_code = forward(self.socket_path, ["list_layers", "--print", self.test_image_path.name], cwd=str(self.test_image_path.parent))
+
+        self.assertEqual(0, exit_code)
+        self.assertEqual(["File: " + str(self.test_image_path)] + [f"  {path}" for path in self.test_image.get_all_layer_paths()], output)
+
+    def test_ServerRunning_ForwardRecolorTwice_CachedImageUnmodifiedAndOutputRecolored(self):
+        for _ in range(2):
+            output, exit_code = forward(
+                self.socket_path, ["recolor", "-l", "/text", "--fill", "#FF0000", "-o", str(self.output_dir_path), str(self.test_image_path)]
+            )
+            self.assertEqual(0, exit_code)
+
+        self.assert_images_equal("resources/test_images/test_image_coloring_0.svg", self.server.image_cache.load(self.test_image_path))
+        recolored_image = self.server.image_cache.load(self.output_dir_path / self.test_image_path.name)
+        self.assert_images_equal(
+            "resources/expected_images/test_image_coloring_extracted_single_layer_by_path_with_stroke_painted_text.svg",
+            recolored_image.extract_layer("/text"),
+        )
+        self.assertEqual(2, len(self.server.image_cache))
+
+    def test_ServerRunning_ForwardInvalidArguments_ErrorReturned(self):
+        output, exit_code = forward(self.socket_path, ["list_layers", "--unknown"])
+
+        self.assertEqual(1, exit_code)
+        self.assertTrue(output[0].startswith("Error:"))
+
+    def test_ServerRunning_ForwardInvalidOptionCombination_ErrorMessageReturned(self):
+        output, exit_code = forward(self.socket_path, ["recolor", "-l", "/text", str(self.test_image_path)])
+
+        self.assertEqual(1, exit_code)
+        self.assertEqual(1, len(output))
+        self.assertIn("[ERROR]", output[0])
+        self.assertIn("Neither --fill, --stroke, --swap nor a color transformation provided!", output[0])
+
+    def test_ServerRunning_ForwardStdioPath_ErrorReturnedAndNoFileWritten(self):
+        output, exit_code = forward(self.socket_path, ["recolor", "--fill", "#FF0000", "-o", "-", str(self.test_image_path)], cwd=str(self.output_dir_path))
+
+        self.assertEqual(1, exit_code)
+        self.assertTrue(output[0].startswith("Error:"))
+        self.assertEqual([], list(self.output_dir_path.iterdir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# Copyright (C) 2024 twyleg
+import pickle
+import shutil
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.cache import SnapshotCache
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class SnapshotCacheTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.svg_file_path = self.output_dir_path / "image.svg"
+        shutil.copy(self.test_image_path, self.svg_file_path)
+        self.snapshot_cache = SnapshotCache(self.output_dir_path / "cache")
+
+    def test_NoSnapshotExisting_LoadIndex_SnapshotWrittenAndIndexReturned(self):
+        index = self.snapshot_cache.load_index(self.svg_file_path)
+
+        self.assertTrue(self.snapshot_cache.get_snapshot_path(self.svg_file_path).exists())
+        self.assertEqual(self.test_image.get_all_layer_paths(), index.get_all_layer_paths())
+        self.assertEqual([], index.elements)
+
+    def test_SnapshotExisting_LoadIndexWithElementTree_IndexWithElementsReturned(self):
+        self.snapshot_cache.load_index(self.svg_file_path)
+        index = self.snapshot_cache.load_index(self.svg_file_path, include_element_tree=True)
+
+        self.assertEqual(self.test_image.get_all_layer_paths(), index.get_all_layer_paths())
+        self.assertEqual("layer6", index.elements[index.get_layer_index_by_path("/background")].get("id"))
+
+    def test_SnapshotOfOtherVersionExisting_LoadIndex_SnapshotRebuilt(self):
+        snapshot_path = self.snapshot_cache.get_snapshot_path(self.svg_file_path)
+        snapshot_path.parent.mkdir()
+        with open(snapshot_path, "wb") as snapshot_file:
+            pickle.dump({"format": 0, "version": "0.0.0"}, snapshot_file)
+            pickle.dump(None, snapshot_file)
+
+        index = self.snapshot_cache.load_index(self.svg_file_path)
+
+        self.assertEqual(self.test_image.get_all_layer_paths(), index.get_all_layer_paths())
+        self.assertIsNotNone(self.snapshot_cache.load_index(self.svg_file_path))
+
+    def test_CorruptSnapshotExisting_LoadIndex_SnapshotRebuilt(self):
+        snapshot_path = self.snapshot_cache.get_snapshot_path(self.svg_file_path)
+        snapshot_path.parent.mkdir()
+        # Damaged pickle, unpickling it raises a TypeError
+        snapshot_path.write_bytes(b"K\x01\x85K\x01R.")
+
+        index = self.snapshot_cache.load_index(self.svg_file_path)
+
+        self.assertEqual(self.test_image.get_all_layer_paths(), index.get_all_layer_paths())
+        self.assertIsNotNone(self.snapshot_cache.load_index(self.svg_file_path))
+
+    def test_SourceFileChanged_LoadIndex_StaleSnapshotReplaced(self):
+        self.snapshot_cache.load_index(self.svg_file_path)
+        self.svg_file_path.write_text(self.svg_file_path.read_text().replace('inkscape:label="nose"', 'inkscape:label="beak"'))
+
+        index = self.snapshot_cache.load_index(self.svg_file_path)
+
+        self.assertIn("/face/beak", index.get_all_layer_paths())
+        self.assertEqual([self.snapshot_cache.get_snapshot_path(self.svg_file_path)], list((self.output_dir_path / "cache").glob("*.pickle")))
+        self.assertIn("/face/beak", self.snapshot_cache.load_index(self.svg_file_path).get_all_layer_paths())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+# Copyright (C) 2024 twyleg
+import json
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from inkscape_layer_utils.image import Image
+from inkscape_layer_utils.sprite import SpriteSheet, get_symbol_id
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+
+class SpriteSheetTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def get_symbol(self, sprite_root: ET.Element, symbol_id: str) -> ET.Element:
+        symbol = sprite_root.find(f"{SVG_NS}symbol[@id='{symbol_id}']")
+        assert symbol is not None
+        return symbol
+
+    def test_Image_AddImage_OneSymbolPerLayerInIndex(self):
+        sprite_sheet = SpriteSheet()
+
+        symbol_ids_by_layer_path = sprite_sheet.add_image(self.test_image, "image")
+
+        self.assertEqual(self.test_image.get_all_layer_paths(), list(symbol_ids_by_layer_path.keys()))
+        self.assertEqual("image_face_eyes_right", symbol_ids_by_layer_path["/face/eyes/right"])
+        self.assertEqual({"image": symbol_ids_by_layer_path}, sprite_sheet.index)
+        self.assertEqual(
+            list(symbol_ids_by_layer_path.values()),
+            [symbol.get("id") for symbol in sprite_sheet.root_element.iter(f"{SVG_NS}symbol")],
+        )
+
+    def test_Image_SaveSpriteSheet_SymbolsContainOwnContentOfLayerWithinAncestorGroups(self):
+        sprite_sheet = SpriteSheet()
+        sprite_sheet.add_image(self.test_image, "image")
+        sprite_sheet.save(self.output_dir_path / "sprite.svg")
+
+        sprite_root = ET.parse(self.output_dir_path / "sprite.svg").getroot()
+
+        eyes_symbol = self.get_symbol(sprite_root, "image_face_eyes")
+        self.assertEqual("0 0 66.145832 66.145835", eyes_symbol.get("viewBox"))
+        self.assertEqual([], list(eyes_symbol.iter(f"{SVG_NS}path")))
+        right_eye_symbol = self.get_symbol(sprite_root, "image_face_eyes_right")
+        self.assertEqual(
+            ["face", "eyes", "right"], [group.get("{http://www.inkscape.org/namespaces/inkscape}label") for group in right_eye_symbol.iter(f"{SVG_NS}g")]
+        )
+        self.assertEqual(["path841-3"], [path.get("id") for path in right_eye_symbol.iter(f"{SVG_NS}path")])
+        root_symbol = self.get_symbol(sprite_root, "image")
+        self.assertEqual(8, len(root_symbol.findall(f"{SVG_NS}use")))
+
+    def test_TwoImagesWithSameDefs_AddImages_DefinitionsSharedAndIdsUnique(self):
+        sprite_sheet = SpriteSheet()
+        sprite_sheet.add_image(self.test_image, "first")
+        sprite_sheet.add_image(self.prepare_test_image(), "second")
+
+        self.assertEqual(["linearGradient944", "radialGradient946"], [definition.get("id") for definition in sprite_sheet.defs_element])
+        ids = [element.get("id") for element in sprite_sheet.root_element.iter() if element.get("id") is not None]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertNotIn("layer7", ids)
+        # Objects of the second image reference the shared definitions
+        self.assertIn("url(#radialGradient946)", ET.tostring(self.get_symbol(sprite_sheet.root_element, "second_outline"), encoding="unicode"))
+
+    def test_TwoImagesWithDifferentDefsOfSameId_AddImages_DefinitionsRenamedAndReferencesUpdated(self):
+        second_image = self.prepare_test_image()
+        second_gradient = second_image.element_tree.getroot().find(f"{SVG_NS}defs/{SVG_NS}linearGradient[@id='linearGradient944']")
+        assert second_gradient is not None
+        second_gradient[0].set("style", "stop-color:#123456;stop-opacity:1")
+        sprite_sheet = SpriteSheet()
+        sprite_sheet.add_image(self.test_image, "first")
+        sprite_sheet.add_image(second_image, "second")
+
+        definition_ids = [definition.get("id") for definition in sprite_sheet.defs_element]
+        self.assertEqual(["linearGradient944", "radialGradient946", "second_linearGradient944", "second_radialGradient946"], definition_ids)
+        renamed_radial_gradient = sprite_sheet.defs_element[3]
+        self.assertEqual("#second_linearGradient944", renamed_radial_gradient.get("{http://www.w3.org/1999/xlink}href"))
+        ids = [element.get("id") for element in sprite_sheet.root_element.iter() if element.get("id") is not None]
+        self.assertEqual(len(set(ids)), len(ids))
+        second_outline = ET.tostring(self.get_symbol(sprite_sheet.root_element, "second_outline"), encoding="unicode")
+        self.assertIn("url(#second_radialGradient946)", second_outline)
+        self.assertNotIn("url(#radialGradient946)", second_outline)
+        # The source image isn't modified
+        self.assertEqual("linearGradient944", second_gradient.get("id"))
+
+    def test_LayerPathsWithSameSymbolId_AddImage_SymbolIdsSuffixed(self):
+        element_tree = ET.parse(self.test_image_path)
+        ET.SubElement(
+            element_tree.getroot(),
+            f"{SVG_NS}g",
+            {
+                "{http://www.inkscape.org/namespaces/inkscape}groupmode": "layer",
+                "{http://www.inkscape.org/namespaces/inkscape}label": "face_eyes",
+                "id": "face_eyes",
+            },
+        )
+        sprite_sheet = SpriteSheet()
+
+        symbol_ids_by_layer_path = sprite_sheet.add_image(Image(element_tree), "image")
+
+        self.assertEqual("image_face_eyes", symbol_ids_by_layer_path["/face/eyes"])
+        self.assertEqual("image_face_eyes_2", symbol_ids_by_layer_path["/face_eyes"])
+        ids = [element.get("id") for element in sprite_sheet.root_element.iter() if element.get("id") is not None]
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_ImageAdded_AddImageWithSameBaseName_ValueErrorRaised(self):
+        sprite_sheet = SpriteSheet()
+        sprite_sheet.add_image(self.test_image, "image")
+
+        with self.assertRaises(ValueError):
+            sprite_sheet.add_image(self.prepare_test_image(), "image")
+        self.assertEqual(["image"], list(sprite_sheet.index.keys()))
+
+    def test_SpriteSheet_SaveIndex_JsonIndexWritten(self):
+        sprite_sheet = SpriteSheet()
+        sprite_sheet.add_image(self.test_image, "image")
+
+        sprite_sheet.save_index(self.output_dir_path / "sprite.json")
+
+        self.assertEqual(sprite_sheet.index, json.loads((self.output_dir_path / "sprite.json").read_text()))
+
+    def test_NamesWithInvalidCharacters_GetSymbolId_ValidId(self):
+        self.assertEqual("_1_image_my_layer", get_symbol_id("1 image", "/my layer"))
+        self.assertEqual("image", get_symbol_id("image", "/"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# Copyright (C) 2024 twyleg
+import argparse
+import io
+import sys
+import unittest
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+from inkscape_layer_utils.commands import add_list_layers_arguments, add_recolor_arguments, handle_list_layers, handle_recolor
+from inkscape_layer_utils.image import Image
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class StdioTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    @staticmethod
+    def parse_args(add_arguments, argv: List[str]) -> argparse.Namespace:
+        parser = argparse.ArgumentParser()
+        add_arguments(parser)
+        return parser.parse_args(argv)
+
+    def test_Image_SaveToFileObject_SameOutputAsSaveToFile(self):
+        output_file_path = self.output_dir_path / "image.svg"
+        self.test_image.save(output_file_path)
+        file_object = io.BytesIO()
+
+        self.test_image.save_to_file_object(file_object)
+
+        self.assertEqual(output_file_path.read_bytes(), file_object.getvalue())
+
+    def test_FileObject_LoadFromFileObject_ImageLoaded(self):
+        with open(self.test_image_path, "rb") as file_object:
+            image = Image.load_from_file_object(file_object)
+        self.assertEqual(self.test_image.get_all_layer_paths(), image.get_all_layer_paths())
+
+    def test_ImageOnStdin_RecolorToStdout_RecoloredImageWrittenToStdout(self):
+        stdin = io.TextIOWrapper(io.BytesIO(self.test_image_path.read_bytes()))
+        stdout = io.TextIOWrapper(io.BytesIO())
+        args = self.parse_args(add_recolor_arguments, ["--fill", "#00ff00", "-l", "/background", "-o", "-", "-"])
+
+        with mock.patch.object(sys, "stdin", stdin), mock.patch.object(sys, "stdout", stdout):
+            self.assertEqual(0, handle_recolor(args))
+
+        self.test_image.get_layer_by_path("/background").fill_all_objects("#00ff00")
+        expected_output = io.BytesIO()
+        self.test_image.save_to_file_object(expected_output)
+        self.assertEqual(expected_output.getvalue(), stdout.buffer.getvalue())
+
+    def test_StdinGivenTwice_ListLayers_ErrorReturned(self):
+        args = self.parse_args(add_list_layers_arguments, ["-", "-"])
+        self.assertEqual(1, handle_list_layers(args))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# Copyright (C) 2024 twyleg
+import gzip
+import io
+import unittest
+from pathlib import Path
+
+from inkscape_layer_utils.image import Image
+
+from tests.image_test_case import ImageTestCase
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+FILE_PATH = Path(__file__).parent
+
+
+class SvgzTestCase(ImageTestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(FILE_PATH / "resources/test_images/test_image_layer_extraction_0.svg", *args, **kwargs)
+
+    def test_Image_SaveCompressed_GzipCompressedFileWithSameContentWritten(self):
+        plain_file_path = self.output_dir_path / "image.svg"
+        compressed_file_path = self.output_dir_path / "image.svgz"
+        self.test_image.save(plain_file_path)
+
+        self.test_image.save(compressed_file_path, compress=True)
+
+        self.assertEqual(plain_file_path.read_bytes(), gzip.decompress(compressed_file_path.read_bytes()))
+
+    def test_Image_SaveCompressedTwice_IdenticalFilesWithoutNameAndTimestampWritten(self):
+        first_file_path = self.output_dir_path / "first.svgz"
+        second_file_path = self.output_dir_path / "second.svgz"
+        file_object = io.BytesIO()
+
+        self.test_image.save(first_file_path, compress=True)
+        self.test_image.save(second_file_path, compress=True)
+        self.test_image.save_to_file_object(file_object, compress=True)
+
+        self.assertEqual(first_file_path.read_bytes(), second_file_path.read_bytes())
+        self.assertEqual(first_file_path.read_bytes(), file_object.getvalue())
+        # No FNAME flag, MTIME zero
+        self.assertEqual(0, first_file_path.read_bytes()[3] & 0x08)
+        self.assertEqual(b"\x00\x00\x00\x00", first_file_path.read_bytes()[4:8])
+
+    def test_CompressedFileWithSvgExtension_LoadFromFile_DetectedByMagicBytesAndLoaded(self):
+        compressed_file_path = self.output_dir_path / "compressed.svg"
+        self.test_image.save(compressed_file_path, compress=True)
+
+        image = Image.load_from_file(compressed_file_path)
+
+        self.assert_image_element_trees_equal(self.test_image.layer_element, image.layer_element)
+        self.assertEqual(self.test_image.get_all_layer_paths(), Image.scan_layer_paths(compressed_file_path))
+
+    def test_CompressedFileObject_LoadFromFileObject_Loaded(self):
+        file_object = io.BytesIO()
+        self.test_image.save_to_file_object(file_object, compress=True, compression_level=1)
+        file_object.seek(0)
+
+        image = Image.load_from_file_object(file_object)
+
+        self.assert_image_element_trees_equal(self.test_image.layer_element, image.layer_element)
+
+    def test_Image_ExtractAllLayersToFileCompressed_SvgzFilesWritten(self):
+        extracted_layer_file_paths = self.test_image.extract_all_layers_to_file(self.output_dir_path, "image", compress=True)
+
+        self.assertEqual(self.output_dir_path / "image_face_eyes_right.svgz", extracted_layer_file_paths["/face/eyes/right"])
+        self.assert_image_element_trees_equal(
+            self.test_image.extract_layer("/face/eyes/right").layer_element,
+            Image.load_from_file(extracted_layer_file_paths["/face/eyes/right"]).layer_element,
+        )
+
+    def test_Image_SaveWithLowerCompressionLevel_LargerFileWritten(self):
+        fast_file_path = self.output_dir_path / "fast.svgz"
+        small_file_path = self.output_dir_path / "small.svgz"
+
+        self.test_image.save(fast_file_path, compress=True, compression_level=1)
+        self.test_image.save(small_file_path, compress=True, compression_level=9)
+
+        self.assertGreater(fast_file_path.stat().st_size, small_file_path.stat().st_size)
+
+
+if __name__ == "__main__":
+    unittest.main()